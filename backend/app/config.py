@@ -35,15 +35,137 @@ class Settings(BaseSettings):
     # ========== AI MODEL SETTINGS ==========
     ai_model: str = "llama-3.3-70b-versatile"
     max_tokens: int = 1000
+    llm_coalescing_enabled: bool = True  # share identical in-flight requests
+    llm_stream_passthrough: bool = True  # forward upstream SSE chunks unparsed
     
+    # ========== LLM ADMISSION CONTROL ==========
+    llm_max_concurrent: int = 8  # concurrent upstream calls per worker
+    llm_max_queue: int = 100  # waiting requests before fast 429
+    llm_max_queue_wait: float = 10.0  # seconds before 503
+    llm_plan_weights: dict = {"pro": 4.0, "free": 1.0, "background": 0.5}
+    voice_agent_plan_type: str = "pro"  # queue class for ElevenLabs agent calls
+    llm_quota_low_watermark: float = 0.2  # start pacing below 20% remaining
+    llm_max_throttle_delay: float = 10.0  # seconds; longer waits fail fast
+    
+    # ========== LLM RESILIENCE ==========
+    llm_connect_timeout: float = 3.0
+    llm_read_timeout: float = 30.0
+    llm_first_token_timeout: float = 8.0  # streaming only
+    llm_max_retries: int = 2
+    llm_retry_base_delay: float = 0.25  # seconds, exponential with jitter
+    llm_retry_max_delay: float = 2.0
+    llm_hedging_enabled: bool = False  # second request after p95 latency
+    llm_hedge_percentile: float = 0.95
+    llm_hedge_min_delay: float = 1.0
+    llm_breaker_failure_threshold: int = 5
+    llm_breaker_reset_timeout: float = 30.0
+    
+    # ========== LLM PROVIDER ROUTING ==========
+    # JSON list of OpenAI-compatible providers; empty = Groq only. e.g.
+    # [{"name": "groq", "base_url": "https://api.groq.com/openai/v1/chat/completions",
+    #   "model": "llama-3.3-70b-versatile", "api_key": "...", "weight": 1.0},
+    #  {"name": "llama-local", "base_url": "http://localhost:8080/v1/chat/completions",
+    #   "model": "llama-3.1-8b", "weight": 0.5},
+    #  {"name": "local", "type": "local", "delay": 0.05}]
+    llm_providers: list = []
+    llm_router_ewma_alpha: float = 0.2  # weight of the newest sample
+    llm_router_error_penalty: float = 10.0  # score multiplier per unit error rate
+    llm_router_default_latency: float = 1.0  # assumed latency before first sample
+    llm_router_explore_rate: float = 0.05  # share of traffic to runner-ups
+    
+    # ========== UPSTREAM HTTP POOL ==========
+    http2_enabled: bool = True
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry: float = 30.0  # seconds
+    http_timeout: float = 30.0
+    http_connect_timeout: float = 5.0
+    
+    # ========== RESPONSE CACHE ==========
+    response_cache_enabled: bool = True
+    response_cache_backend: str = "memory"  # memory, redis
+    response_cache_max_entries: int = 2000
+    response_cache_ttl: float = 3600.0  # seconds
+    redis_url: str = "redis://localhost:6379/0"
+    
+    # ========== CONVERSATION CONTEXT ==========
+    context_token_budget: int = 2000  # tokens of history sent with each turn
+    context_max_messages: int = 40  # recent messages loaded per turn
+    context_summary_trigger: int = 6  # overflow messages before re-summarizing
+    context_summary_max_tokens: int = 300
+
+    # ========== CHAT PERSISTENCE ==========
+    chat_persistence_mode: str = "async"  # sync (write before responding), async (write-behind)
+    chat_write_batch_size: int = 50  # turns per batched transaction
+    chat_write_flush_interval: float = 0.2  # seconds to gather a batch
+    chat_write_max_pending: int = 5000  # queued turns before requests wait on a flush
+    chat_page_size: int = 50  # default page size for chat list endpoints
+    chat_page_max_size: int = 200
+    # Postgres text search dictionary per chat language (Swahili has no
+    # built-in stemmer, so it uses the unstemmed "simple" dictionary)
+    chat_search_dictionaries: dict = {"pidgin": "english", "swahili": "simple"}
+    chat_search_default_dictionary: str = "simple"
+    chat_export_batch_size: int = 500  # rows per export query
+    chat_export_checkpoint_every: int = 1000  # records between resume checkpoints
+
+    # ========== CHAT ARCHIVAL & RETENTION ==========
+    chat_archive_enabled: bool = True  # background archive/purge loop
+    chat_archive_after_days: int = 90  # inactive sessions move to compressed blobs
+    chat_archive_batch_size: int = 100  # sessions per archive pass
+    chat_archive_interval: float = 3600.0  # seconds between passes
+    chat_retention_days: int = 0  # delete sessions inactive this long (0 = keep forever)
+    chat_purge_batch_size: int = 500  # sessions deleted per batch
+    chat_purge_batches_per_second: float = 2.0
+
+    # ========== USAGE ANALYTICS ==========
+    usage_flush_interval: float = 30.0  # seconds between Analytics upserts
+    usage_flush_batch_size: int = 500  # users per upsert statement
+
     # ========== AUDIO SETTINGS ==========
     max_audio_size: int = 10_000_000  # 10MB
+    audio_read_chunk_size: int = 65536  # bytes per upload read while enforcing max_audio_size
+
+    # ========== SPEECH-TO-TEXT ==========
+    google_stt_url: str = "https://speech.googleapis.com/v1/speech:recognize"  # or scripts/stt_standin_server.py
+    stt_segment_concurrency: int = 4  # long audio: segments transcribed at once
+    stt_max_segment_seconds: float = 55.0  # sync recognize accepts up to 60s
+    stt_vad_frame_ms: int = 30
+    stt_vad_silence_db: float = -40.0  # frames quieter than this (dBFS) are silence
+    stt_vad_min_silence_ms: int = 300  # pauses at least this long split segments
+    stt_segment_padding_ms: int = 150  # silence kept around each segment
+
+    # ========== AUDIO PREPROCESSING ==========
+    audio_preprocess_enabled: bool = True  # 16 kHz mono + trim + normalize before STT
+    audio_preprocess_workers: int = 2  # process pool size
+    audio_trim_silence_db: float = -40.0  # leading/trailing frames below this are cut
+    audio_trim_padding_ms: int = 200
+    audio_target_peak_db: float = -1.0
+    audio_max_gain_db: float = 20.0  # don't boost near-silent recordings into noise
+    audio_opus_bitrate: int = 24000  # compressed uploads are re-sent as 16 kHz mono Ogg/Opus
     
     # ========== DATABASE & SECURITY ==========
     database_url: str = ""
+    database_replica_url: str = ""  # optional read-only replica for read endpoints
+    replica_read_your_writes_window: float = 5.0  # seconds a writer keeps reading the primary
+    replica_max_lag: float = 10.0  # seconds behind before reads fail over to the primary
+    replica_health_interval: float = 5.0  # seconds between replica probes
+    db_connection_limit: int = 0  # pool size per client/worker (0 = Prisma default, cpus*2+1)
+    db_pool_timeout: float = 10.0  # seconds to wait for a free pooled connection
+    db_connect_timeout: float = 5.0
+    db_socket_timeout: float = 0  # seconds per query round trip (0 = no limit)
+    db_query_stats_enabled: bool = True  # per-query timing hook
+    db_slow_query_ms: float = 200.0  # log queries slower than this
     secret_key: str = "zeempo_secret_key_change_me_in_production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 43200  # 30 days
+    user_cache_enabled: bool = True  # cache users + decoded tokens in get_current_user
+    user_cache_ttl: float = 60.0  # seconds; bounds staleness across workers
+    user_cache_max_entries: int = 10000
+    token_cache_max_entries: int = 10000
+    bcrypt_rounds: int = 12  # cost factor; older hashes are upgraded on login
+    password_hash_workers: int = 2  # concurrent bcrypt calls per worker
+    password_hash_max_queue: int = 32  # waiting hashes before fast 429
+    password_hash_max_wait: float = 5.0  # seconds before 503
 
     # Stripe Configuration
     stripe_secret_key: str = ""
@@ -177,4 +299,29 @@ User: "Thank you"
 You: "Asante sana! Karibu tena wakati wowote."
 
 Now respond to the person in proper Swahili!
-"""
\ No newline at end of file
+"""
+
+# ============================================================================
+# FALLBACK RESPONSES
+# Sent when the AI provider is down (circuit open / retries exhausted)
+# ============================================================================
+
+PIDGIN_FALLBACK_RESPONSE = "Ah, sorry o! My brain dey slow small right now. Abeg try again for small time, I go dey here."
+
+SWAHILI_FALLBACK_RESPONSE = "Samahani! Nina tatizo kidogo kwa sasa. Tafadhali jaribu tena baada ya muda mfupi."
+
+# ============================================================================
+# CONVERSATION SUMMARY PROMPT
+# Used to fold older turns into a rolling summary for long chats
+# ============================================================================
+
+CONVERSATION_SUMMARY_PROMPT = """You summarize chat conversations between a user and an AI assistant.
+The conversation is in {language}.
+
+Write a short summary (max 150 words) of the conversation so far that keeps:
+- Facts the user shared about themselves (name, location, situation)
+- Questions asked and answers or decisions reached
+- Any open task the assistant is still helping with
+
+Write the summary in plain English. Do not add anything that was not said.
+"""
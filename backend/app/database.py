@@ -1,32 +1,297 @@
 """
 Database Module
-Manages Prisma client connection
+Manages Prisma client connections (primary + optional read replica),
+pool settings and per-query timing
 """
+import asyncio
+import inspect
+import os
+import time
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 from prisma import Prisma
 from functools import lru_cache
 from app.config import get_settings
 
 settings = get_settings()
 
+# Prisma client attributes that are not model accessors
+_CLIENT_QUERY_METHODS = {"query_raw", "query_first", "execute_raw"}
+
+
+def datasource_url(url: str) -> str:
+    """
+    Add pool / timeout parameters from settings to a Postgres URL
+    Parameters already present in the URL win
+    """
+    params = {
+        "connection_limit": settings.db_connection_limit,
+        "pool_timeout": settings.db_pool_timeout,
+        "connect_timeout": settings.db_connect_timeout,
+        "socket_timeout": settings.db_socket_timeout
+    }
+    parts = urlsplit(url)
+    query = dict(parse_qsl(parts.query))
+    for name, value in params.items():
+        if value and name not in query:
+            query[name] = str(int(value)) if float(value).is_integer() else str(value)
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def build_client(url: Optional[str]) -> Prisma:
+    """Prisma client with configured pool size and timeouts"""
+    kwargs = {"connect_timeout": timedelta(seconds=settings.db_connect_timeout)}
+    if url:
+        kwargs["datasource"] = {"url": datasource_url(url)}
+    return Prisma(**kwargs)
+
+
+# ============================================================================
+# QUERY INSTRUMENTATION
+# ============================================================================
+
+class QueryStats:
+    """
+    Per (model, action) query counters, fed by the timing hook
+    Queries slower than DB_SLOW_QUERY_MS are logged
+    """
+
+    def __init__(self, slow_query_ms: float = 200.0):
+        self.slow_query_ms = slow_query_ms
+        self._stats: Dict[str, Dict] = {}
+        self.slow_queries = 0
+
+    def record(self, target: str, model: str, action: str, duration: float, ok: bool):
+        key = f"{model}.{action}"
+        entry = self._stats.get(key)
+        if entry is None:
+            entry = self._stats[key] = {"count": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0}
+        ms = duration * 1000
+        entry["count"] += 1
+        entry["total_ms"] += ms
+        entry["max_ms"] = max(entry["max_ms"], ms)
+        if not ok:
+            entry["errors"] += 1
+        if ms >= self.slow_query_ms:
+            self.slow_queries += 1
+            print(f"Slow Query: {key} on {target} took {ms:.0f}ms")
+
+    def stats(self, top: int = 20) -> Dict:
+        ranked = sorted(self._stats.items(), key=lambda item: item[1]["total_ms"], reverse=True)
+        return {
+            "slow_queries": self.slow_queries,
+            "by_query": {
+                key: {
+                    "count": entry["count"],
+                    "errors": entry["errors"],
+                    "avg_ms": round(entry["total_ms"] / entry["count"], 2),
+                    "max_ms": round(entry["max_ms"], 2),
+                    "total_ms": round(entry["total_ms"], 2)
+                }
+                for key, entry in ranked[:top]
+            }
+        }
+
+
+QueryHook = Callable[[str, str, str, float, bool], None]
+
+
+class _TimedActions:
+    """Wraps one model accessor (e.g. client.chatmessage) to time its actions"""
+
+    def __init__(self, actions, target: str, model: str, hooks: List[QueryHook]):
+        self._actions = actions
+        self._target = target
+        self._model = model
+        self._hooks = hooks
+
+    def __getattr__(self, action: str):
+        method = getattr(self._actions, action)
+        if not inspect.iscoroutinefunction(method):
+            return method
+        return _timed(method, self._target, self._model, action, self._hooks)
+
+
+def _timed(method, target: str, model: str, action: str, hooks: List[QueryHook]):
+    async def call(*args, **kwargs):
+        started = time.perf_counter()
+        ok = False
+        try:
+            result = await method(*args, **kwargs)
+            ok = True
+            return result
+        finally:
+            duration = time.perf_counter() - started
+            for hook in hooks:
+                hook(target, model, action, duration, ok)
+    return call
+
+
+class InstrumentedClient:
+    """
+    Transparent proxy over a Prisma client that reports the model, action
+    and duration of every query to the registered hooks
+    (prisma-client-py has no query middleware of its own)
+    """
+
+    def __init__(self, client: Prisma, target: str, hooks: List[QueryHook]):
+        self._client = client
+        self._target = target
+        self._hooks = hooks
+        self._models: Dict[str, _TimedActions] = {}
+
+    def __getattr__(self, name: str):
+        if name in _CLIENT_QUERY_METHODS:
+            return _timed(getattr(self._client, name), self._target, "raw", name, self._hooks)
+        attr = getattr(self._client, name)
+        if name.startswith("_") or callable(attr):
+            return attr
+        wrapped = self._models.get(name)
+        if wrapped is None:
+            wrapped = self._models[name] = _TimedActions(attr, self._target, name, self._hooks)
+        return wrapped
+
+
+# Seconds the replica is behind; 0 when it has replayed everything it received
+REPLICA_LAG_SQL = """
+    SELECT COALESCE(
+        CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+             ELSE EXTRACT(EPOCH FROM (now() - pg_last_xact_replay_timestamp()))
+        END, 0
+    )::float8 AS "lag"
+"""
+
+
 class Database:
     """
     Singleton Prisma Client manager
+
+    Writes always use `client` (the primary). If DATABASE_REPLICA_URL is set,
+    reader() hands out the replica for read-only endpoints, except:
+    - for users who wrote within the read-your-writes window
+    - while the replica is unreachable or lagging (health monitor)
     """
     def __init__(self):
-        self.client = Prisma()
+        self.query_stats = QueryStats(slow_query_ms=settings.db_slow_query_ms)
+        self.query_hooks: List[QueryHook] = [self.query_stats.record] if settings.db_query_stats_enabled else []
+        self.client = self._instrument(
+            build_client(settings.database_url or os.environ.get("DATABASE_URL")), "primary"
+        )
+        self.replica = (
+            self._instrument(build_client(settings.database_replica_url), "replica")
+            if settings.database_replica_url else None
+        )
+        self._connect_lock = asyncio.Lock()
         self._is_connected = False
+        self._replica_healthy = False
+        self._replica_lag: Optional[float] = None
+        self._recent_writes: Dict[str, float] = {}
+        self._monitor: Optional[asyncio.Task] = None
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self.replica_failovers = 0
+
+    def _instrument(self, client: Prisma, target: str) -> InstrumentedClient:
+        # Queries inside tx()/batch_() are not timed individually
+        return InstrumentedClient(client, target, self.query_hooks)
+
+    def add_query_hook(self, hook: QueryHook):
+        """Register hook(target, model, action, duration_seconds, ok) for every query"""
+        self.query_hooks.append(hook)
 
     async def connect(self):
         """Connect to the database if not already connected"""
-        if not self._is_connected:
+        if self._is_connected:
+            return
+        # Concurrent cold requests wait for the one connect in progress
+        async with self._connect_lock:
+            if self._is_connected:
+                return
             await self.client.connect()
             self._is_connected = True
+            if self.replica is not None:
+                await self.check_replica()
+                self._monitor = asyncio.create_task(self._monitor_replica())
 
     async def disconnect(self):
         """Disconnect from the database"""
-        if self._is_connected:
-            await self.client.disconnect()
-            self._is_connected = False
+        async with self._connect_lock:
+            if self._monitor is not None:
+                self._monitor.cancel()
+                self._monitor = None
+            if self._is_connected:
+                await self.client.disconnect()
+                self._is_connected = False
+            if self.replica is not None and self.replica.is_connected():
+                await self.replica.disconnect()
+                self._replica_healthy = False
+
+    # ------------------------------------------------------------------
+    # Read routing
+    # ------------------------------------------------------------------
+
+    def mark_write(self, user_id: Optional[str]):
+        """Start the read-your-writes window for a user who just wrote"""
+        if not user_id or self.replica is None:
+            return
+        now = time.monotonic()
+        self._recent_writes[user_id] = now
+        if len(self._recent_writes) > 10000:
+            window = settings.replica_read_your_writes_window
+            self._recent_writes = {
+                uid: at for uid, at in self._recent_writes.items() if now - at < window
+            }
+
+    def reader(self, user_id: Optional[str] = None) -> Prisma:
+        """Client to use for a read on behalf of user_id"""
+        if self.replica is None or not self._replica_healthy:
+            self.primary_reads += 1
+            return self.client
+        if user_id:
+            written_at = self._recent_writes.get(user_id)
+            if written_at and time.monotonic() - written_at < settings.replica_read_your_writes_window:
+                self.primary_reads += 1
+                return self.client
+        self.replica_reads += 1
+        return self.replica
+
+    # ------------------------------------------------------------------
+    # Replica health
+    # ------------------------------------------------------------------
+
+    async def check_replica(self) -> bool:
+        """Probe the replica; unreachable or too far behind = unhealthy"""
+        try:
+            if not self.replica.is_connected():
+                await self.replica.connect()
+            rows = await self.replica.query_raw(REPLICA_LAG_SQL)
+            self._replica_lag = float(rows[0]["lag"])
+            healthy = self._replica_lag <= settings.replica_max_lag
+        except Exception as e:
+            print(f"Replica Health Error: {str(e)}")
+            self._replica_lag = None
+            healthy = False
+        if self._replica_healthy and not healthy:
+            self.replica_failovers += 1
+        self._replica_healthy = healthy
+        return healthy
+
+    async def _monitor_replica(self):
+        while True:
+            await asyncio.sleep(settings.replica_health_interval)
+            await self.check_replica()
+
+    def stats(self) -> Dict:
+        return {
+            "replica_configured": self.replica is not None,
+            "replica_healthy": self._replica_healthy,
+            "replica_lag_seconds": self._replica_lag,
+            "replica_reads": self.replica_reads,
+            "primary_reads": self.primary_reads,
+            "replica_failovers": self.replica_failovers,
+            "queries": self.query_stats.stats()
+        }
 
 @lru_cache()
 def get_db():
@@ -43,3 +308,12 @@ async def ensure_db_connection():
     db = get_db()
     await db.connect()
     return db.client
+
+async def ensure_read_connection(user_id: Optional[str] = None):
+    """
+    Connected client for a read-only query
+    The replica when one is configured and healthy, unless user_id wrote recently
+    """
+    db = get_db()
+    await db.connect()
+    return db.reader(user_id)
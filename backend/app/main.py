@@ -2,15 +2,24 @@
 Main FastAPI Application
 Entry point for Zeempo backend
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.config import get_settings
 from app.routes.health import router as health_router
 from app.routes.voice import router as voice_router
 from app.routes.auth import router as auth_router
 from app.routes.chats import router as chat_router
 from app.routes.payments import router as payment_router
+from app.routes.analytics import router as analytics_router
 from app.database import get_db
+from app.services.http_clients import get_http_clients
+from app.services.admission import AdmissionRejected
+from app.services.chat_writer import get_chat_writer
+from app.services.archive_service import get_chat_archiver
+from app.services.usage_tracker import get_usage_tracker
+from app.services.password_hasher import get_password_hasher
+from app.services.audio_preprocessor import get_audio_preprocessor
 
 settings = get_settings()
 
@@ -46,9 +55,22 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-    expose_headers=["X-User-Text", "X-AI-Response", "X-Processing-Time"]
+    expose_headers=["X-User-Text", "X-AI-Response", "X-Processing-Time", "X-Next-Cursor"]
 )
 
+# ============================================================================
+# OVERLOAD HANDLING
+# Upstream LLM queue full / wait timed out -> fast 429/503 with Retry-After
+# ============================================================================
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
 # ============================================================================
 # INCLUDE ROUTERS
 # ============================================================================
@@ -58,6 +80,7 @@ app.include_router(voice_router)   # Voice API endpoints
 app.include_router(auth_router)    # Auth endpoints
 app.include_router(chat_router)     # Chat history endpoints
 app.include_router(payment_router)  # Payments endpoints
+app.include_router(analytics_router)  # Usage analytics endpoints
 
 # ============================================================================
 # STARTUP & SHUTDOWN EVENTS
@@ -69,6 +92,15 @@ async def startup_event():
     # Connect to database
     db = get_db()
     await db.connect()
+    # Open pooled upstream HTTP clients (Groq, ElevenLabs, Google STT)
+    await get_http_clients().startup()
+    # Start the write-behind chat persistence queue
+    await get_chat_writer().start()
+    # Archive inactive sessions / purge past retention in the background
+    if settings.chat_archive_enabled:
+        get_chat_archiver().start()
+    # Flush in-process usage counters to Analytics periodically
+    get_usage_tracker().start()
     print(f"\n{'='*70}")
     print(f"🎙️  {settings.app_name} v{settings.app_version}")
     print(f"{'='*70}")
@@ -82,9 +114,18 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     """Run when server shuts down"""
+    await get_chat_archiver().stop()
+    # Drain queued chat writes before the database goes away
+    await get_chat_writer().stop()
+    # Write usage counted since the last flush
+    await get_usage_tracker().stop()
     # Disconnect from database
     db = get_db()
     await db.disconnect()
+    # Close pooled upstream HTTP clients
+    await get_http_clients().shutdown()
+    get_password_hasher().shutdown()
+    get_audio_preprocessor().shutdown()
     print(f"\n{'='*70}")
     print(f"👋 {settings.app_name} shutting down...")
     print(f"{'='*70}\n")
@@ -15,6 +15,7 @@ class TextMessage(BaseModel):
     """Text message input from user"""
     message: str = Field(..., min_length=1, max_length=1000, description="User's text message")
     language: str = Field("pidgin", description="Target language (pidgin or swahili)")
+    use_cache: bool = Field(True, description="Allow a cached response for repeated messages")
 
 
 class TextToVoiceRequest(BaseModel):
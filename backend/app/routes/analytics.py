@@ -0,0 +1,44 @@
+"""
+Analytics Routes
+Per-user usage (messages and LLM tokens) from the Analytics table plus
+anything counted in this process but not flushed yet
+"""
+from fastapi import APIRouter, Depends
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel
+from app.routes.auth import get_current_user
+from app.database import ensure_read_connection
+from app.services.usage_tracker import get_usage_tracker, to_utc
+
+router = APIRouter(prefix="/api/analytics", tags=["analytics"])
+
+
+class UsageResponse(BaseModel):
+    totalMessages: int
+    tokensUsed: int
+    lastActive: Optional[datetime]
+    pendingMessages: int  # counted here, not flushed to the database yet
+
+
+@router.get("/me", response_model=UsageResponse)
+async def get_my_usage(current_user = Depends(get_current_user)):
+    """
+    Usage for the current user
+    Other workers' unflushed counts show up after their next flush
+    """
+    db = await ensure_read_connection(current_user.id)
+    analytics = await db.analytics.find_unique(where={"userId": current_user.id})
+
+    pending = get_usage_tracker().pending_for(current_user.id)
+    stored_last_active = to_utc(analytics.lastActive) if analytics else None
+    last_active = max(
+        (at for at in (stored_last_active, to_utc(pending["last_active"])) if at is not None),
+        default=None
+    )
+    return UsageResponse(
+        totalMessages=(analytics.totalMessages if analytics else 0) + pending["messages"],
+        tokensUsed=(analytics.tokensUsed if analytics else 0) + pending["tokens"],
+        lastActive=last_active,
+        pendingMessages=pending["messages"]
+    )
@@ -6,7 +6,9 @@ from fastapi import APIRouter, HTTPException, Depends, Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.models import UserRegister, UserLogin, Token, UserResponse, ErrorResponse
 from app.services.auth_service import get_auth_service
-from app.database import ensure_db_connection
+from app.services.password_hasher import get_password_hasher
+from app.services.user_cache import get_user_cache, invalidate_user
+from app.database import get_db, ensure_db_connection, ensure_read_connection
 from app.config import get_settings
 from datetime import datetime
 
@@ -22,12 +24,21 @@ async def get_current_user(token: HTTPAuthorizationCredentials = Security(auth_s
     if not payload:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
     
-    db = await ensure_db_connection()
-    user = await db.user.find_unique(where={"id": payload.get("sub")})
+    user_id = payload.get("sub")
+    user_cache = get_user_cache() if settings.user_cache_enabled else None
+    if user_cache is not None:
+        user = user_cache.get(user_id)
+        if user is not None:
+            return user
+    
+    db = await ensure_read_connection(user_id)
+    user = await db.user.find_unique(where={"id": user_id})
     
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-        
+    
+    if user_cache is not None:
+        user_cache.set(user_id, user)
     return user
 
 @router.post("/register", response_model=Token, responses={400: {"model": ErrorResponse}})
@@ -42,7 +53,7 @@ async def register(user_data: UserRegister):
         raise HTTPException(status_code=400, detail="Dis email don already get owner o!")
     
     # Create new user
-    hashed_password = auth_service.get_password_hash(user_data.password)
+    hashed_password = await auth_service.hash_password(user_data.password)
     user = await db.user.create(
         data={
             "email": user_data.email,
@@ -63,9 +74,22 @@ async def login(login_data: UserLogin):
     auth_service = get_auth_service()
     
     user = await db.user.find_unique(where={"email": login_data.email})
-    if not user or not auth_service.verify_password(login_data.password, user.password):
+    if not user or not await auth_service.check_password(login_data.password, user.password):
         raise HTTPException(status_code=401, detail="Email or password no correct o!")
     
+    # Upgrade hashes made with an older BCRYPT_ROUNDS while we have the password
+    if auth_service.needs_rehash(user.password):
+        try:
+            await db.user.update(
+                where={"id": user.id},
+                data={"password": await auth_service.hash_password(login_data.password)}
+            )
+            get_password_hasher().rehashed += 1
+            invalidate_user(user.id)
+            get_db().mark_write(user.id)
+        except Exception as e:
+            print(f"Password Rehash Error: {str(e)}")
+    
     # Create token
     access_token = auth_service.create_access_token(data={"sub": user.id})
     return {"access_token": access_token, "token_type": "bearer"}
@@ -2,15 +2,65 @@
 Chat History Routes
 Endpoints for managing chat sessions and messages
 """
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
 from app.models import ConversationMessage, ErrorResponse
 from app.routes.auth import get_current_user
-from app.database import ensure_db_connection
+from app.database import ensure_db_connection, ensure_read_connection
+from app.services.chat_writer import get_chat_writer
+from app.services.search_service import get_chat_search_service
+from app.services.export_service import ChatExporter, ExportCheckpoint, stream_export
+from app.services.archive_service import get_chat_archiver
+from app.utils import encode_cursor, decode_cursor
+from app.config import get_settings
 from datetime import datetime
 from pydantic import BaseModel
+import json
 
 router = APIRouter(prefix="/api/chats", tags=["chats"])
+settings = get_settings()
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Keyset page over (updatedAt, id), newest first - served by the
+# ChatSession(userId, updatedAt) index. Only the response fields are selected.
+SESSIONS_FIRST_PAGE_SQL = """
+    SELECT "id", "title", "language", "updatedAt"
+    FROM "ChatSession"
+    WHERE "userId" = $1
+    ORDER BY "updatedAt" DESC, "id" DESC
+    LIMIT $2
+"""
+
+SESSIONS_NEXT_PAGE_SQL = """
+    SELECT "id", "title", "language", "updatedAt"
+    FROM "ChatSession"
+    WHERE "userId" = $1
+      AND ("updatedAt", "id") < ($3::timestamp(3), $4)
+    ORDER BY "updatedAt" DESC, "id" DESC
+    LIMIT $2
+"""
+
+# Keyset pages over (timestamp, id) within a session - served by the
+# ChatMessage(sessionId, timestamp) index. {order} is DESC (newest page
+# first) or ASC (NDJSON export); {op} is the matching comparison.
+MESSAGES_FIRST_PAGE_SQL = """
+    SELECT "id", "role", "content", "timestamp"
+    FROM "ChatMessage"
+    WHERE "sessionId" = $1
+    ORDER BY "timestamp" {order}, "id" {order}
+    LIMIT $2
+"""
+
+MESSAGES_NEXT_PAGE_SQL = """
+    SELECT "id", "role", "content", "timestamp"
+    FROM "ChatMessage"
+    WHERE "sessionId" = $1
+      AND ("timestamp", "id") {op} ($3::timestamp(3), $4)
+    ORDER BY "timestamp" {order}, "id" {order}
+    LIMIT $2
+"""
 
 class ChatSessionResponse(BaseModel):
     id: str
@@ -22,38 +72,237 @@ class ChatHistoryResponse(BaseModel):
     id: str
     messages: List[ConversationMessage]
 
+class ChatSearchResult(BaseModel):
+    id: str
+    sessionId: str
+    title: str
+    role: str
+    timestamp: datetime
+    rank: float
+    highlight: str  # matched words wrapped in <mark></mark>
+
 @router.get("", response_model=List[ChatSessionResponse])
-async def get_sessions(current_user = Depends(get_current_user)):
-    """Get all chat sessions for the current user"""
-    db = await ensure_db_connection()
-    sessions = await db.chatsession.find_many(
-        where={"userId": current_user.id},
-        order={"updatedAt": "desc"}
+async def get_sessions(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=settings.chat_page_max_size),
+    cursor: Optional[str] = None,
+    current_user = Depends(get_current_user)
+):
+    """
+    Get the current user's chat sessions, most recently updated first
+    
+    Paginated: pass the X-Next-Cursor response header back as ?cursor=
+    to get the next page. The header is absent on the last page.
+    """
+    await get_chat_writer().sync_user(current_user.id)
+    db = await ensure_read_connection(current_user.id)
+    page_size = limit or settings.chat_page_size
+    
+    # Fetch one extra row to know whether there is a next page
+    if cursor:
+        try:
+            updated_at, last_id = decode_cursor(cursor, 2)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Dis cursor no correct o!")
+        rows = await db.query_raw(
+            SESSIONS_NEXT_PAGE_SQL, current_user.id, page_size + 1, updated_at, last_id
+        )
+    else:
+        rows = await db.query_raw(SESSIONS_FIRST_PAGE_SQL, current_user.id, page_size + 1)
+    
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last["updatedAt"], last["id"])
+    return rows
+
+@router.get("/search", response_model=List[ChatSearchResult])
+async def search_messages(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: Optional[int] = Query(None, ge=1, le=settings.chat_page_max_size),
+    cursor: Optional[str] = None,
+    current_user = Depends(get_current_user)
+):
+    """
+    Full-text search across the current user's chat messages
+    
+    q uses web search syntax: words, "quoted phrases", -excluded, or.
+    Results are ranked best first; pass the X-Next-Cursor response header
+    back as ?cursor= for the next page.
+    """
+    await get_chat_writer().sync_user(current_user.id)
+    db = await ensure_read_connection(current_user.id)
+    page_size = limit or settings.chat_page_size
+    
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, 2)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Dis cursor no correct o!")
+    
+    rows = await get_chat_search_service().search(
+        db, current_user.id, q, page_size + 1, after
     )
-    return sessions
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last["rank"], last["id"])
+    return rows
+
+
+@router.get("/export")
+async def export_history(
+    format: str = Query("ndjson", pattern="^(ndjson|gzip)$"),
+    cursor: Optional[str] = None,
+    current_user = Depends(get_current_user)
+):
+    """
+    Download all of the current user's sessions and messages
+    
+    Streams NDJSON (or gzip-compressed NDJSON): each session record is
+    followed by its messages. A {"type": "checkpoint", "cursor": ...} line
+    is written periodically - pass the last one back as ?cursor= to resume
+    an interrupted download.
+    """
+    await get_chat_writer().sync_user(current_user.id)
+    db = await ensure_read_connection(current_user.id)
+    
+    checkpoint = None
+    if cursor:
+        try:
+            checkpoint = ExportCheckpoint.decode(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Dis cursor no correct o!")
+    
+    compress = format == "gzip"
+    filename = "zeempo-chats.ndjson" + (".gz" if compress else "")
+    return StreamingResponse(
+        stream_export(
+            ChatExporter(db, batch_size=settings.chat_export_batch_size),
+            user_id=current_user.id,
+            checkpoint=checkpoint,
+            compress=compress,
+            checkpoint_every=settings.chat_export_checkpoint_every
+        ),
+        media_type="application/gzip" if compress else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+async def _fetch_messages(db, session_id: str, limit: int, after: Optional[List] = None, newest_first: bool = True):
+    """
+    One keyset page of a session's messages
+    
+    Args:
+        after: (timestamp, id) of the last message of the previous page
+        newest_first: Walk backwards in time (history pages) or forwards (export)
+    """
+    order, op = ("DESC", "<") if newest_first else ("ASC", ">")
+    if after:
+        return await db.query_raw(
+            MESSAGES_NEXT_PAGE_SQL.format(order=order, op=op),
+            session_id, limit, after[0], after[1]
+        )
+    return await db.query_raw(MESSAGES_FIRST_PAGE_SQL.format(order=order), session_id, limit)
+
+
+def _page_archived(messages: List[dict], limit: int, after: Optional[List] = None, newest_first: bool = True):
+    """_fetch_messages over an archived session's (oldest-first) messages"""
+    ordered = list(reversed(messages)) if newest_first else messages
+    if after:
+        key = (after[0], after[1])
+        if newest_first:
+            ordered = [msg for msg in ordered if (msg["timestamp"], msg["id"]) < key]
+        else:
+            ordered = [msg for msg in ordered if (msg["timestamp"], msg["id"]) > key]
+    return ordered[:limit]
+
+
+def _message_line(row: dict) -> bytes:
+    """One NDJSON line for a message row"""
+    return (json.dumps({
+        "role": row["role"],
+        "content": row["content"],
+        "timestamp": row["timestamp"]
+    }, ensure_ascii=False) + "\n").encode("utf-8")
+
 
 @router.get("/{session_id}", response_model=ChatHistoryResponse)
-async def get_history(session_id: str, current_user = Depends(get_current_user)):
-    """Get message history for a specific session"""
-    db = await ensure_db_connection()
+async def get_history(
+    session_id: str,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=settings.chat_page_max_size),
+    cursor: Optional[str] = None,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    current_user = Depends(get_current_user)
+):
+    """
+    Get message history for a specific session
+    
+    json (default): the newest page of messages, oldest-to-newest within
+    the page. Pass the X-Next-Cursor response header back as ?cursor= to
+    get the page of older messages before it.
+    
+    ndjson: the whole session streamed one message per line, oldest first,
+    read page by page so memory stays flat however long the session is.
+    """
+    await get_chat_writer().sync_session(session_id)
+    db = await ensure_read_connection(current_user.id)
     
     # Ensure session exists and belongs to user
-    session = await db.chatsession.find_unique(
-        where={"id": session_id},
-        include={"messages": {"order_by": {"timestamp": "asc"}}}
-    )
+    session = await db.chatsession.find_unique(where={"id": session_id})
     
     if not session or session.userId != current_user.id:
         raise HTTPException(status_code=404, detail="Chat no exist o!")
+    
+    page_size = limit or settings.chat_page_size
+    
+    # Archived sessions are served straight from their compressed blob
+    if session.archivedAt:
+        archived = await get_chat_archiver().load_messages(db, session_id)
+        async def fetch(limit, after=None, newest_first=True):
+            return _page_archived(archived, limit, after, newest_first)
+    else:
+        async def fetch(limit, after=None, newest_first=True):
+            return await _fetch_messages(db, session_id, limit, after, newest_first)
+    
+    if format == "ndjson":
+        async def message_stream():
+            after = None
+            while True:
+                rows = await fetch(page_size, after, newest_first=False)
+                for row in rows:
+                    yield _message_line(row)
+                if len(rows) < page_size:
+                    return
+                after = [rows[-1]["timestamp"], rows[-1]["id"]]
         
+        return StreamingResponse(message_stream(), media_type="application/x-ndjson")
+    
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, 2)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Dis cursor no correct o!")
+    
+    # Fetch one extra row to know whether there are older messages
+    rows = await fetch(page_size + 1, after)
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        oldest = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(oldest["timestamp"], oldest["id"])
+    
     return {
         "id": session.id,
         "messages": [
             ConversationMessage(
-                role=msg.role,
-                content=msg.content,
-                timestamp=msg.timestamp
-            ) for msg in session.messages
+                role=row["role"],
+                content=row["content"],
+                timestamp=row["timestamp"]
+            ) for row in reversed(rows)
         ]
     }
 
@@ -61,6 +310,7 @@ async def get_history(session_id: str, current_user = Depends(get_current_user))
 async def delete_session(session_id: str, current_user = Depends(get_current_user)):
     """Delete a chat session"""
     db = await ensure_db_connection()
+    await get_chat_writer().sync_session(session_id)
     
     # Ensure session exists and belongs to user
     session = await db.chatsession.find_unique(where={"id": session_id})
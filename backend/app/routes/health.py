@@ -5,6 +5,19 @@ Simple endpoints to verify service is running
 from fastapi import APIRouter
 from app.models import HealthResponse
 from app.config import get_settings
+from app.services.response_cache import get_response_cache
+from app.services.request_coalescer import get_request_coalescer
+from app.services.admission import get_admission_controller
+from app.services.rate_limiter import upstream_quota_stats
+from app.services.resilience import circuit_breaker_stats
+from app.services.llm_router import get_llm_router
+from app.services.chat_writer import get_chat_writer
+from app.services.user_cache import get_user_cache, get_token_cache
+from app.services.archive_service import get_chat_archiver
+from app.services.usage_tracker import get_usage_tracker
+from app.services.password_hasher import get_password_hasher
+from app.services.audio_preprocessor import get_audio_preprocessor
+from app.database import get_db
 
 router = APIRouter(tags=["health"])
 settings = get_settings()
@@ -28,6 +41,31 @@ async def health_check():
     )
 
 
+@router.get("/health/metrics")
+async def metrics():
+    """
+    Runtime metrics for the AI pipeline
+    
+    Returns counters from in-process components (cache hit rate etc.)
+    """
+    return {
+        "response_cache": get_response_cache().stats(),
+        "request_coalescer": get_request_coalescer().stats(),
+        "admission": get_admission_controller().stats(),
+        "upstream_quota": upstream_quota_stats(),
+        "circuit_breakers": circuit_breaker_stats(),
+        "llm_providers": get_llm_router().stats(),
+        "chat_writer": get_chat_writer().stats(),
+        "user_cache": get_user_cache().stats(),
+        "token_cache": get_token_cache().stats(),
+        "chat_archive": get_chat_archiver().stats(),
+        "usage": get_usage_tracker().stats(),
+        "password_hasher": get_password_hasher().stats(),
+        "audio_preprocessor": get_audio_preprocessor().stats(),
+        "database": get_db().stats()
+    }
+
+
 @router.get("/")
 async def root():
     """
@@ -42,10 +80,13 @@ async def root():
         "description": "AI platform for Nigerian/Ghanaian Pidgin English",
         "endpoints": {
             "GET /health": "Health check",
+            "GET /health/metrics": "Runtime metrics",
             "POST /api/voice-to-voice": "Voice input → Voice output in Pidgin",
             "POST /api/text-to-pidgin": "Text input → Pidgin text response",
+            "POST /api/text-to-pidgin/stream": "Text input → Pidgin response streamed as SSE",
             "POST /api/pidgin-to-voice": "Pidgin text → Voice output",
             "GET /api/voices": "List available voices",
+            "GET /api/analytics/me": "Your message and token usage",
             "GET /docs": "Interactive API documentation",
             "GET /redoc": "API documentation (ReDoc style)"
         },
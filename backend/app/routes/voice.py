@@ -4,13 +4,21 @@ Main endpoints for voice-to-voice, text-to-pidgin, and pidgin-to-voice
 """
 from fastapi import APIRouter, File, UploadFile, HTTPException
 from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from datetime import datetime
 import time
+import json
 import io
 
 from app.models import TextMessage, PidginResponse, TextToVoiceRequest
 from app.services import get_stt_service, get_ai_service, get_tts_service
-from app.utils import validate_audio_file, audio_bytes_to_io
+from app.services.ai_service import FallbackResponse
+from app.services.context_service import get_context_builder
+from app.services.admission import get_admission_controller, AdmissionRejected
+from app.services.chat_writer import get_chat_writer, ChatTurn, new_session_id
+from app.services.archive_service import get_chat_archiver
+from app.services.usage_tracker import get_usage_tracker, track_usage, begin_usage
+from app.utils import validate_audio_file, audio_bytes_to_io, sse_data
 from app.config import get_settings
 from app.database import ensure_db_connection
 from app.routes.auth import get_current_user
@@ -69,10 +77,10 @@ async def voice_to_voice(audio: UploadFile = File(...)):
 #     start_time = time.time()
 #     
 #     try:
-#         # STEP 1: Validate audio file
+#         # STEP 1: Validate audio file (size is enforced while reading in STEP 2)
 #         is_valid, error_msg = validate_audio_file(
 #             audio.content_type, 
-#             audio.size, 
+#             None, 
 #             settings.max_audio_size
 #         )
 #         
@@ -114,6 +122,8 @@ async def voice_to_voice(audio: UploadFile = File(...)):
 #         
 #     except HTTPException:
 #         raise
+#     except AudioRejected as e:
+#         raise HTTPException(status_code=e.status_code, detail=str(e))
 #     except Exception as e:
 #         raise HTTPException(
 #             status_code=500, 
@@ -121,6 +131,41 @@ async def voice_to_voice(audio: UploadFile = File(...)):
 #         )
 
 
+async def _resolve_session(db, message: TextMessage, session_id: Optional[str], current_user):
+    """
+    Find the chat session for a text turn, or reserve an id for a new one
+    
+    New sessions are not written here - they go out in the same batch as
+    the turn's messages (see ChatWriter)
+    
+    Returns:
+        Tuple of (session_id, conversation history for the LLM,
+        new session fields or None if the session already exists)
+    """
+    if not session_id:
+        new_session = {
+            "title": message.message[:30] + "...",
+            "language": message.language
+        }
+        return new_session_id(), [], new_session
+    
+    # Make sure turns still queued for this session are visible
+    await get_chat_writer().sync_session(session_id)
+    
+    # Verify session belongs to user
+    session = await db.chatsession.find_unique(where={"id": session_id})
+    if not session or session.userId != current_user.id:
+        raise HTTPException(status_code=404, detail="Yarn session no dey!")
+    
+    # Conversation picked up again - bring archived messages back
+    if session.archivedAt:
+        await get_chat_archiver().rehydrate(db, session)
+    
+    # Load earlier turns (before saving this one) within the token budget
+    history = await get_context_builder().build_context(db, session)
+    return session_id, history, None
+
+
 @router.post("/text-to-pidgin", response_model=PidginResponse)
 async def text_to_pidgin(
     message: TextMessage, 
@@ -135,52 +180,37 @@ async def text_to_pidgin(
     
     try:
         # 1. Handle Session
-        if not session_id:
-            # Create a new session if none provided
-            session = await db.chatsession.create(
-                data={
-                    "title": message.message[:30] + "...",
-                    "userId": current_user.id,
-                    "language": message.language
-                }
-            )
-            session_id = session.id
-        else:
-            # Verify session belongs to user
-            session = await db.chatsession.find_unique(where={"id": session_id})
-            if not session or session.userId != current_user.id:
-                raise HTTPException(status_code=404, detail="Yarn session no dey!")
-
-        # 2. Save User Message
-        await db.chatmessage.create(
-            data={
-                "role": "user",
-                "content": message.message,
-                "sessionId": session_id
-            }
+        received_at = datetime.now()
+        session_id, history, new_session = await _resolve_session(
+            db, message, session_id, current_user
         )
 
-        # 3. Generate AI response
+        # 2. Generate AI response
         ai_service = get_ai_service()
-        ai_response = await ai_service.generate_ai_response(
-            message.message, 
-            language=message.language
-        )
-        
-        # 4. Save AI Response
-        await db.chatmessage.create(
-            data={
-                "role": "assistant",
-                "content": ai_response,
-                "sessionId": session_id
-            }
-        )
+        with track_usage() as usage:
+            ai_response = await ai_service.generate_ai_response(
+                message.message, 
+                language=message.language,
+                conversation_history=history,
+                use_cache=message.use_cache,
+                plan_type=current_user.planType
+            )
+        get_usage_tracker().record(current_user.id, "text_to_pidgin", usage)
         
-        # Update session timestamp
-        await db.chatsession.update(
-            where={"id": session_id},
-            data={"updatedAt": datetime.now()}
-        )
+        # 3. Save both messages + session touch in one batch (write-behind in async mode)
+        if isinstance(ai_response, FallbackResponse):
+            # AI was down - nothing to keep; a new session was never created
+            if new_session:
+                session_id = None
+        else:
+            await get_chat_writer().save_turn(ChatTurn(
+                session_id=session_id,
+                user_id=current_user.id,
+                user_content=message.message,
+                assistant_content=ai_response,
+                user_timestamp=received_at,
+                new_session=new_session
+            ))
         
         processing_time = time.time() - start_time
         
@@ -191,6 +221,8 @@ async def text_to_pidgin(
             session_id=session_id # Need to update PidginResponse model
         )
         
+    except (HTTPException, AdmissionRejected):
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -198,6 +230,132 @@ async def text_to_pidgin(
         )
 
 
+def _sse_event(data: dict) -> str:
+    """Format one Server-Sent Event"""
+    return f"data: {json.dumps(data)}\n\n"
+
+
+@router.post("/text-to-pidgin/stream", response_class=StreamingResponse)
+async def text_to_pidgin_stream(
+    message: TextMessage,
+    session_id: Optional[str] = None,
+    current_user = Depends(get_current_user)
+):
+    """
+    Streaming (SSE) version of text-to-pidgin
+    
+    Tokens are sent as they arrive from the AI; the turn (user message +
+    assembled assistant message) is saved after the stream completes.
+    
+    Events (each a JSON "data:" line):
+        {"type": "start", "session_id": ..., "language": ...}
+        {"type": "token", "content": ...}          (repeated)
+        {"type": "end", "session_id": ..., "time_to_first_token": ..., "processing_time": ...,
+         "fallback": ...}
+        {"type": "error", "session_id": ..., "message": ...}   (instead of end)
+    
+    If the AI is down the canned fallback is sent as the only token, with
+    "fallback": true on the end event; that turn is not saved (and a new
+    session is not created, so session_id is null). If the AI fails
+    mid-reply an error event replaces the end event and nothing is saved.
+    """
+    start_time = time.time()
+    db = await ensure_db_connection()
+    
+    # Reject before the stream starts - once it has, we can't send a 429
+    get_admission_controller().check_capacity(current_user.planType)
+    
+    received_at = datetime.now()
+    try:
+        session_id, history, new_session = await _resolve_session(
+            db, message, session_id, current_user
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"AI no work o: {str(e)}"
+        )
+    
+    ai_service = get_ai_service()
+    messages = ai_service.build_messages(message.message, message.language, history)
+    parts = []
+    fallback = False
+    failed = False
+    
+    async def event_generator():
+        nonlocal fallback, failed
+        yield _sse_event({
+            "type": "start",
+            "session_id": session_id,
+            "language": message.language
+        })
+        
+        first_token_time = None
+        # Not a with-block: a generator finalized from another task
+        # can't reset the ContextVar (see begin_usage)
+        usage = begin_usage()
+        try:
+            async for content in ai_service.generate_ai_response_stream(
+                messages,
+                plan_type=current_user.planType,
+                language=message.language
+            ):
+                if first_token_time is None:
+                    first_token_time = time.time() - start_time
+                if isinstance(content, FallbackResponse):
+                    fallback = True
+                else:
+                    parts.append(content)
+                yield _sse_event({"type": "token", "content": content})
+        except Exception:
+            # Broke off mid-reply: a truncated answer must not look complete
+            failed = True
+        finally:
+            # Count tokens even if the client went away mid-stream
+            get_usage_tracker().record(current_user.id, "text_to_pidgin", usage)
+        
+        if failed:
+            yield _sse_event({
+                "type": "error",
+                "session_id": None if new_session else session_id,
+                "message": "AI cut off for middle of di answer, abeg try again."
+            })
+            return
+        
+        yield _sse_event({
+            "type": "end",
+            "session_id": None if fallback and new_session else session_id,
+            "time_to_first_token": first_token_time,
+            "processing_time": time.time() - start_time,
+            "fallback": fallback
+        })
+    
+    async def persist_response():
+        # Runs after the last event has been sent
+        if not parts or failed:
+            return
+        try:
+            await get_chat_writer().save_turn(ChatTurn(
+                session_id=session_id,
+                user_id=current_user.id,
+                user_content=message.message,
+                assistant_content="".join(parts).strip(),
+                user_timestamp=received_at,
+                new_session=new_session
+            ))
+        except Exception as e:
+            print(f"Stream Persist Error: {str(e)}")
+    
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(persist_response)
+    )
+
+
 # ============================================================================
 # VOICE ENDPOINTS - TEMPORARILY DISABLED
 # These endpoints require Text-to-Speech service which is currently disabled
@@ -254,6 +412,12 @@ class ChatCompletionRequest(BaseModel):
     class Config:
         extra = "allow"
 
+SSE_DONE_EVENT = sse_data(b"[DONE]")
+SSE_STREAM_ERROR_EVENT = sse_data(json.dumps({
+    "error": {"message": "Upstream stream failed mid-response", "type": "upstream_error"}
+}).encode())
+
+
 @router.post("/v1/chat/completions")
 async def custom_llm_chat(request: ChatCompletionRequest):
     """
@@ -280,28 +444,66 @@ async def custom_llm_chat(request: ChatCompletionRequest):
         from app.config import PIDGIN_SYSTEM_PROMPT
         messages_dicts.insert(0, {"role": "system", "content": PIDGIN_SYSTEM_PROMPT})
 
-    async def event_generator():
-        stream = ai_service.generate_ai_response_stream(messages_dicts)
-        
-        async for content in stream:
-            # Format as OpenAI Stream Response
-            chunk_data = {
-                "id": "chatcmpl-123",
-                "object": "chat.completion.chunk",
-                "created": int(time.time()),
-                "model": request.model,
-                "choices": [
-                    {
-                        "index": 0,
-                        "delta": {"content": content},
-                        "finish_reason": None
+    # Reject before the stream starts - once it has, we can't send a 429
+    get_admission_controller().check_capacity(settings.voice_agent_plan_type)
+
+    if settings.llm_stream_passthrough:
+        # Forward upstream chunks as-is: no per-token json.loads/json.dumps
+        async def event_generator():
+            # Not a with-block: a generator finalized from another task
+            # can't reset the ContextVar (see begin_usage)
+            usage = begin_usage()
+            try:
+                stream = ai_service.generate_ai_response_stream(
+                    messages_dicts,
+                    plan_type=settings.voice_agent_plan_type,
+                    raw=True
+                )
+                async for data in stream:
+                    yield sse_data(data)
+            except Exception:
+                # Broke off mid-reply: OpenAI-style error, no [DONE]
+                yield SSE_STREAM_ERROR_EVENT
+                return
+            finally:
+                # No user on this endpoint: process totals only
+                get_usage_tracker().record(None, "voice_agent", usage)
+            yield SSE_DONE_EVENT
+    else:
+        async def event_generator():
+            # Not a with-block: a generator finalized from another task
+            # can't reset the ContextVar (see begin_usage)
+            usage = begin_usage()
+            try:
+                stream = ai_service.generate_ai_response_stream(
+                    messages_dicts,
+                    plan_type=settings.voice_agent_plan_type
+                )
+                    
+                async for content in stream:
+                    # Format as OpenAI Stream Response
+                    chunk_data = {
+                        "id": "chatcmpl-123",
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": request.model,
+                        "choices": [
+                            {
+                                "index": 0,
+                                "delta": {"content": content},
+                                "finish_reason": None
+                            }
+                        ]
                     }
-                ]
-            }
-            yield f"data: {json.dumps(chunk_data)}\n\n"
-            
-        # Send [DONE] message
-        yield "data: [DONE]\n\n"
+                    yield f"data: {json.dumps(chunk_data)}\n\n"
+            except Exception:
+                yield SSE_STREAM_ERROR_EVENT
+                return
+            finally:
+                get_usage_tracker().record(None, "voice_agent", usage)
+                
+            # Send [DONE] message
+            yield "data: [DONE]\n\n"
 
     return StreamingResponse(event_generator(), media_type="text/event-stream")
 
@@ -5,6 +5,7 @@ Business logic layer for STT, AI, and TTS
 from .stt_service import STTService, get_stt_service
 from .ai_service import AIService, get_ai_service
 from .tts_service import TTSService, get_tts_service
+from .http_clients import HTTPClientRegistry, get_http_clients, get_http_client
 
 __all__ = [
     'STTService',
@@ -12,5 +13,8 @@ __all__ = [
     'TTSService',
     'get_stt_service',
     'get_ai_service',
-    'get_tts_service'
+    'get_tts_service',
+    'HTTPClientRegistry',
+    'get_http_clients',
+    'get_http_client'
 ]
\ No newline at end of file
@@ -0,0 +1,201 @@
+"""
+Admission Controller
+Bounds concurrent upstream LLM calls and queues the rest,
+weighted by the user's plan ("pro" users get more of the slots than "free")
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Optional
+from app.config import get_settings
+
+settings = get_settings()
+
+DEFAULT_PLAN = "free"
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a request can't get an upstream slot in time
+    Routes turn this into a 429/503 with a Retry-After header
+    """
+
+    def __init__(self, message: str, status_code: int = 503, retry_after: int = 1):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Bounded slots + weighted wait queue (stride scheduling per plan)
+
+    Each plan has its own FIFO queue. When a slot frees up, the plan with
+    the lowest "pass" value goes next and its pass advances by 1/weight,
+    so a plan with weight 4 is served ~4x as often as one with weight 1
+    while nobody starves.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 8,
+        max_queue: int = 100,
+        max_wait: float = 10.0,
+        weights: Optional[Dict[str, float]] = None
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.weights = weights or {"pro": 4.0, "free": 1.0}
+        self._active = 0
+        self._queues: Dict[str, Deque[asyncio.Future]] = {}
+        self._pass: Dict[str, float] = {}
+        self._virtual_time = 0.0
+        self._avg_hold = 1.0  # EWMA of slot hold time (seconds)
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.total_wait = 0.0
+
+    def _plan(self, plan_type: Optional[str]) -> str:
+        """Map a user's planType to a known queue"""
+        plan = (plan_type or DEFAULT_PLAN).lower()
+        return plan if plan in self.weights else DEFAULT_PLAN
+
+    @property
+    def queued(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def retry_after(self) -> int:
+        """Estimated seconds until a new request could be served"""
+        backlog = self.queued + 1
+        return max(1, math.ceil(self._avg_hold * backlog / self.max_concurrent))
+
+    def check_capacity(self, plan_type: Optional[str] = None):
+        """
+        Fail fast (without waiting) when the wait queue is already full
+        Use before starting a streaming response
+        """
+        if self._active >= self.max_concurrent and self.queued >= self.max_queue:
+            self.rejected += 1
+            raise AdmissionRejected(
+                "Too many people dey yarn now, abeg try again small time.",
+                status_code=429,
+                retry_after=self.retry_after()
+            )
+
+    async def acquire(self, plan_type: Optional[str] = None):
+        """
+        Wait for an upstream slot
+
+        Raises:
+            AdmissionRejected: 429 if the queue is full, 503 if the wait times out
+        """
+        if self._active < self.max_concurrent and self.queued == 0:
+            self._active += 1
+            self.admitted += 1
+            return
+
+        self.check_capacity(plan_type)
+
+        plan = self._plan(plan_type)
+        queue = self._queues.setdefault(plan, deque())
+        if not queue:
+            # A plan coming back from idle can't bank credit from the past
+            self._pass[plan] = max(self._pass.get(plan, 0.0), self._virtual_time)
+        waiter = asyncio.get_running_loop().create_future()
+        queue.append(waiter)
+        started = time.monotonic()
+
+        try:
+            await asyncio.wait_for(waiter, timeout=self.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # Granted at the same moment we gave up - hand the slot back
+                self.release()
+            elif waiter in queue:
+                queue.remove(waiter)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.timed_out += 1
+            raise AdmissionRejected(
+                "Server too busy now o, abeg try again small time.",
+                status_code=503,
+                retry_after=self.retry_after()
+            )
+
+        self.admitted += 1
+        self.total_wait += time.monotonic() - started
+
+    def release(self):
+        """Return a slot and hand it to the next waiter, if any"""
+        self._active -= 1
+        while self._active < self.max_concurrent:
+            waiter = self._next_waiter()
+            if waiter is None:
+                break
+            self._active += 1
+            waiter.set_result(None)
+
+    def _next_waiter(self) -> Optional[asyncio.Future]:
+        """Pick the next live waiter by lowest pass value"""
+        while True:
+            candidates = [plan for plan, queue in self._queues.items() if queue]
+            if not candidates:
+                return None
+            plan = min(candidates, key=lambda p: self._pass.get(p, 0.0))
+            waiter = self._queues[plan].popleft()
+            if waiter.done():
+                continue  # Timed out or cancelled while queued
+            self._virtual_time = self._pass.get(plan, 0.0)
+            self._pass[plan] = self._virtual_time + 1.0 / self.weights.get(plan, 1.0)
+            return waiter
+
+    @asynccontextmanager
+    async def slot(self, plan_type: Optional[str] = None):
+        """Hold an upstream slot for the duration of the block"""
+        await self.acquire(plan_type)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            held = time.monotonic() - started
+            self._avg_hold = 0.9 * self._avg_hold + 0.1 * held
+            self.release()
+
+    def stats(self) -> Dict:
+        """Queue depth and wait metrics for monitoring"""
+        return {
+            "max_concurrent": self.max_concurrent,
+            "active": self._active,
+            "queued": {plan: len(queue) for plan, queue in self._queues.items()},
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "avg_wait_seconds": round(self.total_wait / self.admitted, 4) if self.admitted else 0.0,
+            "avg_hold_seconds": round(self._avg_hold, 4)
+        }
+
+
+# ============================================================================
+# SINGLETON INSTANCE
+# ============================================================================
+
+_admission_controller = None
+
+def get_admission_controller() -> AdmissionController:
+    """
+    Get admission controller singleton instance
+    Creates instance on first call, reuses afterwards
+    """
+    global _admission_controller
+    if _admission_controller is None:
+        _admission_controller = AdmissionController(
+            max_concurrent=settings.llm_max_concurrent,
+            max_queue=settings.llm_max_queue,
+            max_wait=settings.llm_max_queue_wait,
+            weights=settings.llm_plan_weights
+        )
+    return _admission_controller
@@ -1,15 +1,35 @@
 """
 AI Service - Using Groq (Free and Fast!)
 Handles Pidgin English response generation using Groq API
+(or any OpenAI-compatible provider configured in LLM_PROVIDERS)
 """
-import httpx
 import os
-from app.config import get_settings, PIDGIN_SYSTEM_PROMPT, SWAHILI_SYSTEM_PROMPT
+from app.config import (
+    get_settings,
+    PIDGIN_SYSTEM_PROMPT,
+    SWAHILI_SYSTEM_PROMPT,
+    CONVERSATION_SUMMARY_PROMPT,
+    PIDGIN_FALLBACK_RESPONSE,
+    SWAHILI_FALLBACK_RESPONSE
+)
+from app.services.response_cache import get_response_cache, make_cache_key
+from app.services.request_coalescer import get_request_coalescer, make_request_key
+from app.services.admission import get_admission_controller
+from app.services.llm_router import get_llm_router, GROQ_CHAT_COMPLETIONS_URL
+from app.services.resilience import UpstreamError, CircuitOpenError
+from app.utils.sse import chat_completion_chunk
 from typing import List, Dict
 
 settings = get_settings()
 
 
+class FallbackResponse(str):
+    """
+    Canned reply used when the AI provider is unavailable
+    A plain str to display, but not a real answer - don't persist or cache it
+    """
+
+
 class AIService:
     """
     AI service using Groq
@@ -18,18 +38,21 @@ class AIService:
     
     def __init__(self):
         self.api_key = settings.groq_api_key
-        if not self.api_key:
+        if not self.api_key and not settings.llm_providers:
             raise ValueError("GROQ_API_KEY environment variable not set")
             
-        self.base_url = "https://api.groq.com/openai/v1/chat/completions"
+        self.base_url = GROQ_CHAT_COMPLETIONS_URL
         self.model = settings.ai_model
         self.max_tokens = settings.max_tokens if hasattr(settings, 'max_tokens') else 1000
+        self.router = get_llm_router()
     
     async def generate_ai_response(
         self, 
         user_message: str, 
         language: str = "pidgin",
-        conversation_history: List[Dict] = None
+        conversation_history: List[Dict] = None,
+        use_cache: bool = True,
+        plan_type: str = None
     ) -> str:
         """
         Generate AI response using Groq
@@ -39,13 +62,61 @@ class AIService:
             language: Target language ('pidgin' or 'swahili')
             conversation_history: Previous conversation messages (optional)
                                 Format: [{"role": "user", "content": "..."}, ...]
+            use_cache: Set False to bypass the response cache for this call
+            plan_type: User's plan ('pro' or 'free') for upstream queueing
             
         Returns:
             AI response string in target language
             
         Raises:
             ValueError: If API key not configured
-            Exception: If API call fails
+            AdmissionRejected: If no upstream slot is available in time
+            UpstreamError: If Groq rejects the request (non-retryable)
+        
+        If Groq is down (circuit open or retries exhausted) a canned
+        FallbackResponse in the target language is returned instead
+        (never cached).
+        """
+        messages = self.build_messages(user_message, language, conversation_history)
+        
+        # Exact-match cache only applies to context-free turns
+        cache = get_response_cache()
+        cache_key = None
+        if use_cache and cache.enabled and not conversation_history:
+            cache_key = make_cache_key(language, user_message, self.model, self.max_tokens)
+            cached = await cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        # Call Groq API
+        try:
+            pidgin_response = await self._chat_completion(messages, plan_type=plan_type)
+        except UpstreamError as e:
+            if not (isinstance(e, CircuitOpenError) or e.retryable):
+                raise
+            print(f"AI Service Fallback: {str(e)}")
+            return self.fallback_response(language)
+        
+        if cache_key:
+            await cache.set(cache_key, pidgin_response)
+        return pidgin_response
+
+    def build_messages(
+        self,
+        user_message: str,
+        language: str = "pidgin",
+        conversation_history: List[Dict] = None
+    ) -> List[Dict]:
+        """
+        Build the full message list: system prompt, history, user message
+        
+        Args:
+            user_message: User's input message
+            language: Target language ('pidgin' or 'swahili')
+            conversation_history: Previous conversation messages (optional)
+            
+        Returns:
+            Messages in chat-completion format
         """
         # Select system prompt based on language
         system_prompt = SWAHILI_SYSTEM_PROMPT if language.lower() == "swahili" else PIDGIN_SYSTEM_PROMPT
@@ -64,86 +135,149 @@ class AIService:
             "role": "user",
             "content": user_message
         })
+        return messages
+
+    async def summarize_conversation(
+        self,
+        messages: List[Dict],
+        previous_summary: str = "",
+        language: str = "pidgin"
+    ) -> str:
+        """
+        Fold older conversation turns into a short rolling summary
         
-        # Call Groq API
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    self.base_url,
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": self.model,
-                        "messages": messages,
-                        "max_tokens": self.max_tokens,
-                        "temperature": 0.7  # Slightly creative
-                    }
-                )
-                
-                if response.status_code != 200:
-                    raise Exception(f"Groq API Error: {response.text}")
-                
-                result = response.json()
-                pidgin_response = result["choices"][0]["message"]["content"]
-                return pidgin_response.strip()
-                
-        except Exception as e:
-            raise Exception(f"AI Service Error: {str(e)}")
+        Args:
+            messages: Turns to fold in, oldest first
+                      Format: [{"role": "user", "content": "..."}, ...]
+            previous_summary: Summary of turns before these (optional)
+            language: Conversation language ('pidgin' or 'swahili')
+            
+        Returns:
+            Updated summary string
+        """
+        transcript = "\n".join(f"{msg['role']}: {msg['content']}" for msg in messages)
+        prompt = (
+            f"Previous summary:\n{previous_summary or '(none)'}\n\n"
+            f"New conversation turns:\n{transcript}\n\n"
+            "Write an updated summary of the whole conversation so far."
+        )
+        return await self._chat_completion(
+            [
+                {"role": "system", "content": CONVERSATION_SUMMARY_PROMPT.format(language=language)},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=settings.context_summary_max_tokens,
+            temperature=0.2,
+            plan_type="background"
+        )
+
+    async def _chat_completion(
+        self,
+        messages: List[Dict],
+        max_tokens: int = None,
+        temperature: float = 0.7,  # Slightly creative
+        plan_type: str = None
+    ) -> str:
+        """
+        Get one chat completion via the provider router
+        
+        Args:
+            messages: Full message list including system prompt
+            max_tokens: Completion limit (defaults to settings)
+            temperature: Sampling temperature
+            plan_type: Queue class for admission control
+            
+        Returns:
+            Stripped completion text
+            
+        Raises:
+            CircuitOpenError: If every provider's circuit breaker is open
+            UpstreamError: If the call failed on every provider
+        """
+        payload = self._build_payload(messages, max_tokens, temperature)
+        # Identical concurrent requests share one upstream call
+        return await get_request_coalescer().run(
+            make_request_key(payload),
+            lambda: self._admitted(plan_type, lambda: self.router.complete(payload))
+        )
+
+    @staticmethod
+    def fallback_response(language: str = "pidgin") -> FallbackResponse:
+        """Canned reply used when the AI provider is unavailable"""
+        if language.lower() == "swahili":
+            return FallbackResponse(SWAHILI_FALLBACK_RESPONSE)
+        return FallbackResponse(PIDGIN_FALLBACK_RESPONSE)
+
+    def _build_payload(
+        self,
+        messages: List[Dict],
+        max_tokens: int = None,
+        temperature: float = 0.7
+    ) -> Dict:
+        """Build the chat completions request body"""
+        return {
+            "model": self.model,
+            "messages": messages,
+            "max_tokens": max_tokens or self.max_tokens,
+            "temperature": temperature
+        }
+
+    async def _admitted(self, plan_type: str, call):
+        """Run an upstream call once the admission controller grants a slot"""
+        async with get_admission_controller().slot(plan_type):
+            return await call()
 
     async def generate_ai_response_stream(
         self, 
-        messages: List[Dict]
+        messages: List[Dict],
+        temperature: float = 0.7,
+        plan_type: str = None,
+        language: str = "pidgin",
+        raw: bool = False
     ):
         """
         Stream AI response using Groq
+        Identical concurrent streams share one upstream stream
         
         Args:
             messages: Full conversation history including system prompt
+            temperature: Sampling temperature
+            plan_type: Queue class for admission control
+            language: Language of the canned fallback if Groq is down
+            raw: Yield upstream chat.completion.chunk JSON bytes unparsed
+                 (for OpenAI-compatible passthrough) instead of text
             
         Yields:
-            Chunks of generated text
+            Chunks of generated text (or raw chunk bytes); if Groq is down
+            before anything was sent, a single FallbackResponse (text mode)
+            
+        Raises:
+            Exception: If the stream fails after the first chunk was yielded
         """
+        payload = self._build_payload(messages, temperature=temperature)
+        started = False
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                async with client.stream(
-                    "POST",
-                    self.base_url,
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": self.model,
-                        "messages": messages,
-                        "max_tokens": self.max_tokens,
-                        "temperature": 0.7,
-                        "stream": True
-                    }
-                ) as response:
-                    if response.status_code != 200:
-                        error_content = await response.aread()
-                        raise Exception(f"Groq API Error: {error_content.decode()}")
-
-                    async for line in response.aiter_lines():
-                        if line.startswith("data: "):
-                            data = line[6:]
-                            if data == "[DONE]":
-                                break
+            async for content in get_request_coalescer().stream(
+                make_request_key({**payload, "raw": raw}),
+                lambda: self._admitted_stream(plan_type, payload, raw)
+            ):
+                started = True
+                yield content
                             
-                            try:
-                                import json
-                                chunk = json.loads(data)
-                                content = chunk["choices"][0]["delta"].get("content", "")
-                                if content:
-                                    yield content
-                            except:
-                                continue
-                                
         except Exception as e:
             print(f"Stream Error: {str(e)}")
-            yield f"Error: {str(e)}"
+            if started:
+                # The reply is cut short - let the caller report it, not end cleanly
+                raise
+            # Nothing sent yet - answer with the fallback instead of an error
+            fallback = self.fallback_response(language)
+            yield chat_completion_chunk(fallback, self.model) if raw else fallback
+
+    async def _admitted_stream(self, plan_type: str, payload: Dict, raw: bool = False):
+        """Hold an upstream slot for the whole life of a stream"""
+        async with get_admission_controller().slot(plan_type):
+            async for content in self.router.stream(payload, raw=raw):
+                yield content
     
     def generate_pidgin_response_sync(
         self, 
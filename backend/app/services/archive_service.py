@@ -0,0 +1,264 @@
+"""
+Chat Archive Service
+Moves inactive sessions' messages out of ChatMessage into one compressed
+ArchivedSession blob per session, and purges sessions past retention
+
+Archived sessions stay listed (the ChatSession row is kept). History reads
+are served from the blob; a new turn in an archived session restores its
+messages to ChatMessage first (rehydrate).
+"""
+import asyncio
+import json
+import zlib
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from prisma import Base64
+from app.config import get_settings
+from app.database import get_db, ensure_db_connection
+
+settings = get_settings()
+
+
+class _SessionChanged(Exception):
+    """Session was touched while we were archiving it - roll back"""
+
+
+def compress_messages(messages: List[Dict]) -> bytes:
+    """zlib-compressed JSON list of messages"""
+    raw = json.dumps(messages, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return zlib.compress(raw, 9)
+
+
+def decompress_messages(data: bytes) -> List[Dict]:
+    """Inverse of compress_messages; messages are oldest first"""
+    return json.loads(zlib.decompress(data))
+
+
+class ChatArchiver:
+    """
+    Background archival + retention purge for chat sessions
+    """
+
+    def __init__(
+        self,
+        archive_after_days: int = 90,
+        archive_batch_size: int = 100,
+        retention_days: int = 0,
+        purge_batch_size: int = 500,
+        purge_batches_per_second: float = 2.0,
+        interval: float = 3600.0
+    ):
+        self.archive_after_days = archive_after_days
+        self.archive_batch_size = archive_batch_size
+        self.retention_days = retention_days
+        self.purge_batch_size = purge_batch_size
+        self.purge_batches_per_second = purge_batches_per_second
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self.sessions_archived = 0
+        self.sessions_rehydrated = 0
+        self.sessions_purged = 0
+        self.raw_bytes = 0
+        self.compressed_bytes = 0
+
+    # ------------------------------------------------------------------
+    # Archive
+    # ------------------------------------------------------------------
+
+    async def archive_session(self, db, session) -> bool:
+        """
+        Archive one session's messages in a single transaction
+
+        Returns:
+            False if the session changed meanwhile (nothing archived)
+        """
+        rows = await db.chatmessage.find_many(
+            where={"sessionId": session.id},
+            order=[{"timestamp": "asc"}, {"id": "asc"}]
+        )
+        messages = [
+            {
+                "id": row.id,
+                "role": row.role,
+                "content": row.content,
+                "timestamp": row.timestamp.isoformat()
+            }
+            for row in rows
+        ]
+        data = compress_messages(messages)
+        raw_size = sum(len(message["content"]) for message in messages)
+
+        try:
+            async with db.tx() as tx:
+                # Keep updatedAt as-is (list order) and bail if it moved
+                changed = await tx.chatsession.update_many(
+                    where={"id": session.id, "updatedAt": session.updatedAt, "archivedAt": None},
+                    data={"archivedAt": datetime.now(), "updatedAt": session.updatedAt}
+                )
+                if not changed:
+                    raise _SessionChanged()
+                await tx.archivedsession.create(
+                    data={
+                        "sessionId": session.id,
+                        "data": Base64.encode(data),
+                        "messageCount": len(messages),
+                        "rawBytes": raw_size
+                    }
+                )
+                # Only the rows we read - anything newer stays hot
+                await tx.chatmessage.delete_many(
+                    where={"id": {"in": [message["id"] for message in messages]}}
+                )
+        except _SessionChanged:
+            return False
+
+        self.sessions_archived += 1
+        self.raw_bytes += raw_size
+        self.compressed_bytes += len(data)
+        return True
+
+    async def archive_once(self, db) -> int:
+        """Archive one batch of inactive sessions; returns how many"""
+        cutoff = datetime.now() - timedelta(days=self.archive_after_days)
+        sessions = await db.chatsession.find_many(
+            where={"archivedAt": None, "updatedAt": {"lt": cutoff}},
+            order={"updatedAt": "asc"},
+            take=self.archive_batch_size
+        )
+        archived = 0
+        for session in sessions:
+            if await self.archive_session(db, session):
+                archived += 1
+        return archived
+
+    # ------------------------------------------------------------------
+    # Read / rehydrate
+    # ------------------------------------------------------------------
+
+    async def load_messages(self, db, session_id: str) -> List[Dict]:
+        """Archived messages of a session, oldest first ([] if not archived)"""
+        archive = await db.archivedsession.find_unique(where={"sessionId": session_id})
+        if not archive:
+            return []
+        return decompress_messages(archive.data.decode())
+
+    async def rehydrate(self, db, session):
+        """Move an archived session's messages back into ChatMessage"""
+        messages = await self.load_messages(db, session.id)
+        async with db.tx() as tx:
+            if messages:
+                await tx.chatmessage.create_many(
+                    data=[
+                        {
+                            "id": message["id"],
+                            "role": message["role"],
+                            "content": message["content"],
+                            "timestamp": datetime.fromisoformat(message["timestamp"]),
+                            "sessionId": session.id
+                        }
+                        for message in messages
+                    ],
+                    skip_duplicates=True
+                )
+            await tx.archivedsession.delete_many(where={"sessionId": session.id})
+            await tx.chatsession.update(
+                where={"id": session.id},
+                data={"archivedAt": None, "updatedAt": session.updatedAt}
+            )
+        get_db().mark_write(session.userId)
+        self.sessions_rehydrated += 1
+
+    # ------------------------------------------------------------------
+    # Retention purge
+    # ------------------------------------------------------------------
+
+    async def purge_once(self, db, max_batches: int = 100) -> int:
+        """
+        Delete sessions (with their messages and archives) not updated for
+        retention_days, in rate-limited batches; returns how many
+        """
+        if not self.retention_days:
+            return 0
+        cutoff = datetime.now() - timedelta(days=self.retention_days)
+        purged = 0
+        for _ in range(max_batches):
+            sessions = await db.chatsession.find_many(
+                where={"updatedAt": {"lt": cutoff}},
+                take=self.purge_batch_size
+            )
+            if not sessions:
+                break
+            # Messages and archives go with the session (onDelete: Cascade)
+            purged += await db.chatsession.delete_many(
+                where={"id": {"in": [session.id for session in sessions]}}
+            )
+            if len(sessions) < self.purge_batch_size:
+                break
+            # Spread deletes out so vacuum/replication keep up
+            await asyncio.sleep(1.0 / self.purge_batches_per_second)
+        self.sessions_purged += purged
+        return purged
+
+    # ------------------------------------------------------------------
+    # Background loop
+    # ------------------------------------------------------------------
+
+    async def run_once(self, db):
+        """One archival pass (until no inactive sessions are left) + purge"""
+        while await self.archive_once(db) >= self.archive_batch_size:
+            await asyncio.sleep(0)
+        await self.purge_once(db)
+
+    async def _run(self):
+        while True:
+            try:
+                db = await ensure_db_connection()
+                await self.run_once(db)
+            except Exception as e:
+                print(f"Chat Archive Error: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict:
+        return {
+            "sessions_archived": self.sessions_archived,
+            "sessions_rehydrated": self.sessions_rehydrated,
+            "sessions_purged": self.sessions_purged,
+            "compression_ratio": round(self.raw_bytes / self.compressed_bytes, 2) if self.compressed_bytes else None
+        }
+
+
+# ============================================================================
+# SINGLETON INSTANCE
+# ============================================================================
+
+_chat_archiver = None
+
+def get_chat_archiver() -> ChatArchiver:
+    """
+    Get chat archiver singleton instance
+    Creates instance on first call, reuses afterwards
+    """
+    global _chat_archiver
+    if _chat_archiver is None:
+        _chat_archiver = ChatArchiver(
+            archive_after_days=settings.chat_archive_after_days,
+            archive_batch_size=settings.chat_archive_batch_size,
+            retention_days=settings.chat_retention_days,
+            purge_batch_size=settings.chat_purge_batch_size,
+            purge_batches_per_second=settings.chat_purge_batches_per_second,
+            interval=settings.chat_archive_interval
+        )
+    return _chat_archiver
@@ -0,0 +1,131 @@
+"""
+Audio Preprocessor
+Decodes uploads and runs the NumPy preprocessing pipeline (16 kHz mono
+LINEAR16, silence trim, level normalize) in a process pool before STT
+"""
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+import numpy as np
+from app.config import get_settings
+from app.utils.audio_utils import (
+    TARGET_SAMPLE_RATE,
+    decode_audio,
+    ffmpeg_available,
+    preprocess_pcm
+)
+from app.utils.audio_sniff import AudioInfo
+
+settings = get_settings()
+
+
+class AudioPreprocessor:
+    """
+    Keeps the CPU work off the event loop (and out of the GIL) in a small
+    process pool, and reports per-request and cumulative savings
+    """
+
+    def __init__(self, workers: int = 2):
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.requests = 0
+        self.silent = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.seconds_in = 0.0
+        self.seconds_out = 0.0
+        self.cpu_ms = 0.0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: workers don't inherit the event loop / open sockets
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    def can_decode(self, info: AudioInfo) -> bool:
+        """16-bit WAV is read directly; anything else needs ffmpeg"""
+        return info.encoding == "LINEAR16" or (info.format != "wav" and ffmpeg_available())
+
+    async def process(self, audio_data, audio_format: str) -> Tuple[np.ndarray, Dict]:
+        """
+        Decode + preprocess one upload
+
+        Returns:
+            (16 kHz mono int16 samples - empty if the upload was all silence,
+             report with durations, LINEAR16 size and savings)
+
+        Raises:
+            AudioRejected: If the audio can't be decoded
+        """
+        samples, sample_rate = await decode_audio(audio_data, audio_format)
+        pcm, report = await asyncio.get_running_loop().run_in_executor(
+            self._get_pool(),
+            preprocess_pcm,
+            samples,
+            sample_rate,
+            settings.audio_trim_silence_db,
+            settings.audio_trim_padding_ms,
+            settings.audio_target_peak_db,
+            settings.audio_max_gain_db
+        )
+        report["input_bytes"] = len(audio_data)
+        report["linear16_bytes"] = len(pcm) * 2
+        report["trimmed_seconds"] = round(report["input_seconds"] - report["output_seconds"], 3)
+
+        self.requests += 1
+        self.silent += len(pcm) == 0
+        self.bytes_in += len(audio_data)
+        self.seconds_in += report["input_seconds"]
+        self.seconds_out += report["output_seconds"]
+        self.cpu_ms += report["cpu_ms"]
+        return pcm, report
+
+    def record_upload(self, report: Dict, bytes_sent: int):
+        """Count what was actually sent upstream for a processed request"""
+        report["bytes_sent"] = bytes_sent
+        report["bytes_saved"] = report["input_bytes"] - bytes_sent
+        self.bytes_out += bytes_sent
+        print(
+            f"Audio Preprocess: {report['input_seconds']}s {report['input_channels']}ch "
+            f"{report['input_sample_rate']}Hz -> {report['output_seconds']}s mono "
+            f"{TARGET_SAMPLE_RATE}Hz, {report['input_bytes']} -> {bytes_sent} bytes "
+            f"({report['cpu_ms']}ms CPU)"
+        )
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> Dict:
+        return {
+            "workers": self.workers,
+            "requests": self.requests,
+            "silent_skipped": self.silent,
+            "bytes_in": self.bytes_in,
+            "bytes_sent": self.bytes_out,
+            "seconds_in": round(self.seconds_in, 3),
+            "seconds_out": round(self.seconds_out, 3),
+            "avg_cpu_ms": round(self.cpu_ms / self.requests, 2) if self.requests else 0.0
+        }
+
+
+# ============================================================================
+# SINGLETON INSTANCE
+# ============================================================================
+
+_audio_preprocessor = None
+
+def get_audio_preprocessor() -> AudioPreprocessor:
+    """
+    Get audio preprocessor singleton instance
+    Creates instance on first call, reuses afterwards
+    """
+    global _audio_preprocessor
+    if _audio_preprocessor is None:
+        _audio_preprocessor = AudioPreprocessor(workers=settings.audio_preprocess_workers)
+    return _audio_preprocessor
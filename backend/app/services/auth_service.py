@@ -5,8 +5,9 @@ Handles JWT tokens and password security
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-import bcrypt
 from app.config import get_settings
+from app.services.user_cache import get_token_cache
+from app.services.password_hasher import get_password_hasher, hash_password, check_password
 
 settings = get_settings()
 
@@ -17,18 +18,28 @@ class AuthService:
     
     @staticmethod
     def verify_password(plain_password: str, hashed_password: str) -> bool:
-        """Check if plain password matches hash"""
-        password_bytes = plain_password.encode('utf-8')
-        hash_bytes = hashed_password.encode('utf-8')
-        return bcrypt.checkpw(password_bytes, hash_bytes)
+        """Check if plain password matches hash (blocking - use check_password in handlers)"""
+        return check_password(plain_password, hashed_password)
 
     @staticmethod
     def get_password_hash(password: str) -> str:
-        """Generate bcrypt hash for password"""
-        password_bytes = password.encode('utf-8')
-        salt = bcrypt.gensalt()
-        hashed = bcrypt.hashpw(password_bytes, salt)
-        return hashed.decode('utf-8')
+        """Generate bcrypt hash for password (blocking - use hash_password in handlers)"""
+        return hash_password(password, settings.bcrypt_rounds)
+
+    @staticmethod
+    async def check_password(plain_password: str, hashed_password: str) -> bool:
+        """Check a password on the bcrypt pool, off the event loop"""
+        return await get_password_hasher().verify(plain_password, hashed_password)
+
+    @staticmethod
+    async def hash_password(password: str) -> str:
+        """Hash a password on the bcrypt pool, off the event loop"""
+        return await get_password_hasher().hash(password)
+
+    @staticmethod
+    def needs_rehash(hashed_password: str) -> bool:
+        """True if the stored hash's cost differs from BCRYPT_ROUNDS"""
+        return get_password_hasher().needs_rehash(hashed_password)
 
     @staticmethod
     def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -45,12 +56,19 @@ class AuthService:
 
     @staticmethod
     def verify_token(token: str) -> Optional[dict]:
-        """Decode and verify JWT token"""
+        """Decode and verify JWT token (memoized until the token expires)"""
+        token_cache = get_token_cache() if settings.user_cache_enabled else None
+        if token_cache is not None:
+            payload = token_cache.get(token)
+            if payload is not None:
+                return payload
         try:
             payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-            return payload
         except JWTError:
             return None
+        if token_cache is not None:
+            token_cache.set(token, payload)
+        return payload
 
 def get_auth_service() -> AuthService:
     """Get auth service singleton"""
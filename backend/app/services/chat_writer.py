@@ -0,0 +1,311 @@
+"""
+Chat Writer
+Persists chat turns (session + user message + assistant message + session
+touch) in one batched transaction, off the request's critical path
+
+Durability modes (CHAT_PERSISTENCE_MODE):
+- "sync":  write the turn's batch before the response is returned
+- "async": queue the turn and flush in bulk from a background worker
+           (write-behind); the queue is drained on shutdown
+"""
+import asyncio
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from prisma.errors import DataError
+from app.config import get_settings
+from app.database import get_db, ensure_db_connection
+
+settings = get_settings()
+
+
+def new_session_id() -> str:
+    """Generate a session id up front so a new session can be batched too"""
+    return "c" + uuid.uuid4().hex[:24]
+
+
+class ChatTurn:
+    """One user message + AI response, ready to be written"""
+
+    def __init__(
+        self,
+        session_id: str,
+        user_id: str,
+        user_content: str,
+        assistant_content: str,
+        user_timestamp: datetime,
+        assistant_timestamp: Optional[datetime] = None,
+        new_session: Optional[Dict] = None
+    ):
+        self.session_id = session_id
+        self.user_id = user_id
+        self.user_content = user_content
+        self.assistant_content = assistant_content
+        self.user_timestamp = user_timestamp
+        self.assistant_timestamp = assistant_timestamp or datetime.now()
+        self.new_session = new_session  # {"title": ..., "language": ...} if not created yet
+        self.attempts = 0
+
+
+class ChatWriter:
+    """
+    Batched, optionally write-behind persistence for chat turns
+    """
+
+    def __init__(
+        self,
+        mode: str = "async",
+        batch_size: int = 50,
+        flush_interval: float = 0.2,
+        max_pending: int = 5000,
+        max_attempts: int = 3
+    ):
+        self.mode = mode
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self._pending: List[ChatTurn] = []
+        self._pending_sessions: Counter = Counter()
+        self._pending_users: Counter = Counter()
+        self._wakeup = asyncio.Event()
+        self._write_lock = asyncio.Lock()
+        self._worker: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.turns_written = 0
+        self.batches_written = 0
+        self.write_errors = 0
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def start(self):
+        """Start the background flusher (async mode only)"""
+        self._stopping = False
+        if self.mode == "async" and self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Drain every queued turn, then stop the flusher"""
+        self._stopping = True
+        self._wakeup.set()
+        if self._worker is not None:
+            await self._worker
+            self._worker = None
+        # Failed turns are re-queued until max_attempts, so this terminates
+        while self._pending:
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Chat Writer Error: {str(e)}")
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    async def save_turn(self, turn: ChatTurn):
+        """
+        Persist a turn according to the durability mode
+        In async mode this returns immediately unless the queue is full
+        """
+        if self.mode != "async" or self._worker is None or self._stopping:
+            await self._write([turn])
+            return
+
+        self._pending.append(turn)
+        self._pending_sessions[turn.session_id] += 1
+        self._pending_users[turn.user_id] += 1
+        # Replica reads must wait for the primary from the moment it's queued
+        get_db().mark_write(turn.user_id)
+        if len(self._pending) >= self.max_pending:
+            # Backpressure: the database is falling behind
+            await self.flush()
+        else:
+            self._wakeup.set()
+
+    async def flush(self):
+        """
+        Write everything queued so far
+
+        A batch rejected for its data (constraint violation, missing row...)
+        is split until the bad turns are isolated, so one poisoned turn can't
+        hold back everyone else's. Any other error (database unreachable)
+        stops the flush with the unwritten turns still queued.
+
+        Raises:
+            Exception: If any turn failed; failed turns stay queued for the
+            next flush until they have failed max_attempts times
+        """
+        retry: List[ChatTurn] = []
+        error: Optional[Exception] = None
+        try:
+            while self._pending:
+                batch = self._pending[:self.batch_size]
+                del self._pending[:self.batch_size]
+                written: List[ChatTurn] = []
+                try:
+                    failed, batch_error = await self._write_isolated(batch, written)
+                except Exception:
+                    # Not the turns' fault - re-queue what's left as is
+                    self._settle(written, [turn for turn in batch if turn not in written], retry)
+                    raise
+                self._settle(written, failed, retry)
+                error = batch_error or error
+        finally:
+            self._pending[:0] = retry
+        if error is not None:
+            raise error
+
+    async def _write_isolated(
+        self,
+        turns: List[ChatTurn],
+        written: List[ChatTurn]
+    ) -> Tuple[List[ChatTurn], Optional[Exception]]:
+        """
+        Write turns, bisecting while the database rejects their data
+        Turns that made it are appended to written
+
+        Returns:
+            (turns that failed on their own, last DataError or None)
+
+        Raises:
+            Exception: Anything but a DataError, unsplit
+        """
+        try:
+            await self._write(turns)
+            written.extend(turns)
+            return [], None
+        except DataError as e:
+            if len(turns) == 1:
+                return turns, e
+        # Earlier half first: it may create sessions the later half uses
+        middle = len(turns) // 2
+        failed, error = await self._write_isolated(turns[:middle], written)
+        failed_late, error_late = await self._write_isolated(turns[middle:], written)
+        return failed + failed_late, error_late or error
+
+    def _settle(self, written: List[ChatTurn], failed: List[ChatTurn], retry: List[ChatTurn]):
+        """Forget written turns; re-queue failed ones until max_attempts"""
+        for turn in written:
+            self._forget(turn)
+        for turn in failed:
+            turn.attempts += 1
+            if turn.attempts < self.max_attempts:
+                retry.append(turn)
+            else:
+                print(f"Chat Writer Error: dropping turn for session {turn.session_id}")
+                self._forget(turn)
+
+    async def sync_session(self, session_id: str):
+        """Read-your-writes: flush first if this session has queued turns"""
+        if self._pending_sessions.get(session_id):
+            await self.flush()
+
+    async def sync_user(self, user_id: str):
+        """Read-your-writes: flush first if this user has queued turns"""
+        if self._pending_users.get(user_id):
+            await self.flush()
+
+    def _forget(self, turn: ChatTurn):
+        self._pending_sessions[turn.session_id] -= 1
+        if self._pending_sessions[turn.session_id] <= 0:
+            del self._pending_sessions[turn.session_id]
+        self._pending_users[turn.user_id] -= 1
+        if self._pending_users[turn.user_id] <= 0:
+            del self._pending_users[turn.user_id]
+
+    async def _write(self, turns: List[ChatTurn]):
+        """Write a batch of turns in a single transaction"""
+        db = await ensure_db_connection()
+        touched: Dict[str, datetime] = {}
+        async with self._write_lock:
+            try:
+                async with db.batch_() as batcher:
+                    for turn in turns:
+                        if turn.new_session:
+                            batcher.chatsession.create(
+                                data={
+                                    "id": turn.session_id,
+                                    "userId": turn.user_id,
+                                    **turn.new_session
+                                }
+                            )
+                        batcher.chatmessage.create(
+                            data={
+                                "role": "user",
+                                "content": turn.user_content,
+                                "sessionId": turn.session_id,
+                                "timestamp": turn.user_timestamp
+                            }
+                        )
+                        batcher.chatmessage.create(
+                            data={
+                                "role": "assistant",
+                                "content": turn.assistant_content,
+                                "sessionId": turn.session_id,
+                                "timestamp": turn.assistant_timestamp
+                            }
+                        )
+                        touched[turn.session_id] = turn.assistant_timestamp
+                    # One updatedAt touch per session, however many turns it had
+                    for session_id, timestamp in touched.items():
+                        batcher.chatsession.update(
+                            where={"id": session_id},
+                            data={"updatedAt": timestamp}
+                        )
+            except Exception:
+                self.write_errors += 1
+                raise
+        self.turns_written += len(turns)
+        self.batches_written += 1
+        # Writers read their own session from the primary for a while
+        for turn in turns:
+            get_db().mark_write(turn.user_id)
+
+    async def _run(self):
+        """Background flusher: batch up turns for flush_interval, then write"""
+        while not self._stopping:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if not self._stopping:
+                # Give concurrent requests a moment to join this batch
+                await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Chat Writer Error: {str(e)}")
+                # Retry what's left on the next pass
+                self._wakeup.set()
+
+    def stats(self) -> Dict:
+        return {
+            "mode": self.mode,
+            "pending": len(self._pending),
+            "turns_written": self.turns_written,
+            "batches_written": self.batches_written,
+            "write_errors": self.write_errors
+        }
+
+
+# ============================================================================
+# SINGLETON INSTANCE
+# ============================================================================
+
+_chat_writer = None
+
+def get_chat_writer() -> ChatWriter:
+    """
+    Get chat writer singleton instance
+    Creates instance on first call, reuses afterwards
+    """
+    global _chat_writer
+    if _chat_writer is None:
+        _chat_writer = ChatWriter(
+            mode=settings.chat_persistence_mode,
+            batch_size=settings.chat_write_batch_size,
+            flush_interval=settings.chat_write_flush_interval,
+            max_pending=settings.chat_write_max_pending
+        )
+    return _chat_writer
@@ -0,0 +1,169 @@
+"""
+Conversation Context Service
+Builds token-budgeted chat history for the LLM from stored ChatMessage rows
+Older turns are folded into a rolling summary cached on the ChatSession
+"""
+import asyncio
+from typing import List, Dict, Set
+from app.config import get_settings
+from app.services.ai_service import get_ai_service
+
+settings = get_settings()
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token estimate for budgeting (~4 characters per token)
+    Good enough for Llama tokenizers on Pidgin/Swahili/English text
+    """
+    return len(text) // 4 + 1
+
+
+def message_tokens(message: Dict) -> int:
+    """Token estimate for one chat message, including role overhead"""
+    return estimate_tokens(message["content"]) + 4
+
+
+class ContextBuilder:
+    """
+    Token-budgeted conversation context builder
+    Keeps prompt size bounded no matter how long a session runs
+    """
+
+    def __init__(
+        self,
+        token_budget: int = None,
+        max_messages: int = None,
+        summary_trigger: int = None
+    ):
+        self.token_budget = token_budget or settings.context_token_budget
+        self.max_messages = max_messages or settings.context_max_messages
+        self.summary_trigger = summary_trigger or settings.context_summary_trigger
+        self._summarizing: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def build_context(self, db, session) -> List[Dict]:
+        """
+        Build conversation history for the next turn
+
+        Args:
+            db: Connected Prisma client
+            session: ChatSession record for the conversation
+
+        Returns:
+            Messages in chat-completion format, oldest first
+            Starts with a system summary message when earlier turns were folded
+        """
+        # Turns already folded into the summary are never sent again
+        where = {"sessionId": session.id}
+        if session.summarizedUntil is not None:
+            where["timestamp"] = {"gt": session.summarizedUntil}
+        recent = await db.chatmessage.find_many(
+            where=where,
+            order={"timestamp": "desc"},
+            take=self.max_messages
+        )
+
+        summary = session.summary or ""
+        summary_message = None
+        budget = self.token_budget
+        if summary:
+            summary_message = {
+                "role": "system",
+                "content": f"Summary of the earlier conversation: {summary}"
+            }
+            budget -= message_tokens(summary_message)
+        if not recent:
+            return [summary_message] if summary_message else []
+
+        # Walk newest -> oldest, keeping whatever fits in the budget
+        window = []
+        overflow = []
+        for msg in recent:
+            turn = {"role": msg.role, "content": msg.content}
+            if not overflow and message_tokens(turn) <= budget:
+                window.append(turn)
+                budget -= message_tokens(turn)
+            else:
+                overflow.append(msg)
+
+        # Never start the window on an assistant turn
+        window.reverse()
+        kept = len(window)
+        while window and window[0]["role"] != "user":
+            window.pop(0)
+        kept_messages = recent[:kept][::-1][kept - len(window):]
+
+        # Turns that fell out of the window (all unsummarized, see query)
+        unsummarized = recent[len(kept_messages):]
+        # A full page means older, unloaded rows may be unsummarized too
+        page_full = len(recent) == self.max_messages
+        needs_summary = page_full or len(unsummarized) >= self.summary_trigger
+        if needs_summary and kept_messages:
+            self._schedule_summary(db, session, cutoff=kept_messages[0].timestamp)
+
+        if summary_message:
+            return [summary_message] + window
+        return window
+
+    def _schedule_summary(self, db, session, cutoff):
+        """Refresh the rolling summary in the background, once per session"""
+        if session.id in self._summarizing:
+            return
+        self._summarizing.add(session.id)
+        task = asyncio.create_task(self._refresh_summary(db, session, cutoff))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _refresh_summary(self, db, session, cutoff):
+        """
+        Fold every turn between the last summary and the current window
+        (exclusive cutoff) into the session's rolling summary
+        """
+        try:
+            where = {"sessionId": session.id, "timestamp": {"lt": cutoff}}
+            if session.summarizedUntil is not None:
+                where["timestamp"]["gt"] = session.summarizedUntil
+            # Fold in batches so one huge backlog can't blow the summary prompt
+            pending = await db.chatmessage.find_many(
+                where=where,
+                order={"timestamp": "asc"},
+                take=self.max_messages
+            )
+            if not pending:
+                return
+
+            summary = await get_ai_service().summarize_conversation(
+                [{"role": msg.role, "content": msg.content} for msg in pending],
+                previous_summary=session.summary or "",
+                language=session.language
+            )
+            await db.chatsession.update(
+                where={"id": session.id},
+                data={
+                    "summary": summary,
+                    "summarizedUntil": pending[-1].timestamp
+                }
+            )
+        except Exception as e:
+            # Summary is an optimization - the next turn will retry
+            print(f"Context Summary Error: {str(e)}")
+        finally:
+            self._summarizing.discard(session.id)
+
+
+# ============================================================================
+# SINGLETON INSTANCE
+# ============================================================================
+
+_context_builder = None
+
+def get_context_builder() -> ContextBuilder:
+    """
+    Get context builder singleton instance
+    Creates instance on first call, reuses afterwards
+    """
+    global _context_builder
+    if _context_builder is None:
+        _context_builder = ContextBuilder()
+    return _context_builder
@@ -0,0 +1,226 @@
+"""
+Chat Export Service
+Streams ChatSession + ChatMessage rows as NDJSON in fixed memory, with a
+resumable checkpoint (used by GET /api/chats/export and scripts/export_chats.py)
+
+Records, in session id order, each session followed by its messages:
+    {"type": "session", "id": ..., "userId": ..., "title": ..., ...}
+    {"type": "message", "id": ..., "sessionId": ..., "role": ..., ...}
+"""
+import json
+import zlib
+from typing import AsyncIterator, Dict, List, Optional
+from app.config import get_settings
+from app.utils import encode_cursor, decode_cursor
+from app.services.archive_service import get_chat_archiver
+
+settings = get_settings()
+
+SESSIONS_SQL = """
+    SELECT "id", "userId", "title", "language", "summary", "createdAt", "updatedAt", "archivedAt"
+    FROM "ChatSession"
+    WHERE ($1::text IS NULL OR "userId" = $1)
+      AND "id" > $2
+    ORDER BY "id"
+    LIMIT $3
+"""
+
+# Keyset over (sessionId, timestamp, id) - the ChatMessage(sessionId, timestamp) index
+MESSAGES_SQL = """
+    SELECT "id", "sessionId", "role", "content", "timestamp"
+    FROM "ChatMessage"
+    WHERE "sessionId" = ANY($1::text[])
+      AND ("sessionId", "timestamp", "id") > ($2, $3::timestamp(3), $4)
+    ORDER BY "sessionId", "timestamp", "id"
+    LIMIT $5
+"""
+
+SESSION_START = "-infinity"  # timestamp before every message of a session
+
+
+class ExportCheckpoint:
+    """
+    Position after the last record written
+
+    session_id: last session whose header was written ("" = nothing yet)
+    message_timestamp / message_id: last message written for that session
+    """
+
+    def __init__(self, session_id: str = "", message_timestamp: Optional[str] = None, message_id: str = ""):
+        self.session_id = session_id
+        self.message_timestamp = message_timestamp
+        self.message_id = message_id
+
+    def encode(self) -> str:
+        return encode_cursor(self.session_id, self.message_timestamp, self.message_id)
+
+    @classmethod
+    def decode(cls, cursor: str) -> "ExportCheckpoint":
+        """
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        session_id, message_timestamp, message_id = decode_cursor(cursor, 3)
+        return cls(session_id, message_timestamp, message_id)
+
+    def to_dict(self) -> Dict:
+        return {
+            "session_id": self.session_id,
+            "message_timestamp": self.message_timestamp,
+            "message_id": self.message_id
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ExportCheckpoint":
+        return cls(data["session_id"], data.get("message_timestamp"), data.get("message_id", ""))
+
+
+class ChatExporter:
+    """
+    Walks sessions and messages in keyset batches so memory use depends on
+    batch_size only, never on how much history there is
+    """
+
+    def __init__(self, db, batch_size: int = 500):
+        self.db = db
+        self.batch_size = batch_size
+        self.checkpoint = ExportCheckpoint()
+
+    async def _messages(self, session_ids: List[str], after: List) -> AsyncIterator[Dict]:
+        """All messages of the given sessions after the (sessionId, timestamp, id) key"""
+        while True:
+            rows = await self.db.query_raw(
+                MESSAGES_SQL, session_ids, after[0], after[1], after[2], self.batch_size
+            )
+            for row in rows:
+                yield row
+            if len(rows) < self.batch_size:
+                return
+            last = rows[-1]
+            after = [last["sessionId"], last["timestamp"], last["id"]]
+
+    async def _archived_messages(self, session_id: str, after_timestamp: str = "", after_id: str = "") -> AsyncIterator[Dict]:
+        """Messages of an archived session after the (timestamp, id) key"""
+        key = (after_timestamp, after_id)
+        for message in await get_chat_archiver().load_messages(self.db, session_id):
+            if (message["timestamp"], message["id"]) > key:
+                yield {**message, "sessionId": session_id}
+
+    async def _session_records(self, session: Dict) -> AsyncIterator[Dict]:
+        """A session header, plus its messages if they live in the archive"""
+        self.checkpoint = ExportCheckpoint(session["id"])
+        yield {"type": "session", **session}
+        if session.get("archivedAt"):
+            async for message in self._archived_messages(session["id"]):
+                yield self._message_written(message)
+
+    def _message_written(self, message: Dict) -> Dict:
+        self.checkpoint = ExportCheckpoint(message["sessionId"], message["timestamp"], message["id"])
+        return {"type": "message", **message}
+
+    async def records(
+        self,
+        user_id: Optional[str] = None,
+        checkpoint: Optional[ExportCheckpoint] = None
+    ) -> AsyncIterator[Dict]:
+        """
+        Yield export records; self.checkpoint always points just past the
+        last record yielded
+
+        Args:
+            user_id: Only this user's sessions (None = everyone)
+            checkpoint: Resume after this position
+        """
+        self.checkpoint = checkpoint or ExportCheckpoint()
+
+        # Finish the session we stopped in the middle of
+        if self.checkpoint.session_id:
+            current = self.checkpoint
+            after = [
+                current.session_id,
+                current.message_timestamp or SESSION_START,
+                current.message_id
+            ]
+            async for message in self._messages([current.session_id], after):
+                yield self._message_written(message)
+            async for message in self._archived_messages(
+                current.session_id, current.message_timestamp or "", current.message_id
+            ):
+                yield self._message_written(message)
+            self.checkpoint = ExportCheckpoint(current.session_id, "infinity")
+
+        last_session_id = self.checkpoint.session_id
+        while True:
+            sessions = await self.db.query_raw(
+                SESSIONS_SQL, user_id, last_session_id, self.batch_size
+            )
+            if not sessions:
+                return
+
+            # One message walk per batch of sessions, merged with the headers.
+            # Both queries sort by the same column in the database, so headers
+            # are emitted up to each message's session by equality, not by
+            # comparing ids in Python (collations differ)
+            session_ids = [session["id"] for session in sessions]
+            index = 0
+            async for message in self._messages(session_ids, [session_ids[0], SESSION_START, ""]):
+                if self.checkpoint.session_id != message["sessionId"]:
+                    while sessions[index]["id"] != message["sessionId"]:
+                        async for record in self._session_records(sessions[index]):
+                            yield record
+                        index += 1
+                    async for record in self._session_records(sessions[index]):
+                        yield record
+                    index += 1
+                yield self._message_written(message)
+            for session in sessions[index:]:
+                async for record in self._session_records(session):
+                    yield record
+
+            last_session_id = session_ids[-1]
+            if len(sessions) < self.batch_size:
+                return
+
+
+def ndjson_line(record: Dict) -> bytes:
+    """One NDJSON line"""
+    return (json.dumps(record, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+
+
+async def stream_export(
+    exporter: ChatExporter,
+    user_id: Optional[str] = None,
+    checkpoint: Optional[ExportCheckpoint] = None,
+    compress: bool = False,
+    checkpoint_every: int = 1000
+) -> AsyncIterator[bytes]:
+    """
+    Export as NDJSON bytes (gzip-compressed if compress=True)
+
+    Every checkpoint_every records a {"type": "checkpoint", "cursor": ...}
+    line is written; pass the last cursor received back to resume.
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    buffer = []
+    count = 0
+
+    def emit(lines: List[bytes]) -> bytes:
+        data = b"".join(lines)
+        if compressor is not None:
+            # Sync flush so the client has every complete line we've sent
+            return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        return data
+
+    async for record in exporter.records(user_id, checkpoint):
+        buffer.append(ndjson_line(record))
+        count += 1
+        if count % checkpoint_every == 0:
+            buffer.append(ndjson_line({"type": "checkpoint", "cursor": exporter.checkpoint.encode()}))
+            yield emit(buffer)
+            buffer = []
+
+    buffer.append(ndjson_line({"type": "checkpoint", "cursor": exporter.checkpoint.encode(), "done": True}))
+    data = emit(buffer)
+    if compressor is not None:
+        data += compressor.flush()
+    yield data
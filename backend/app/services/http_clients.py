@@ -0,0 +1,99 @@
+"""
+Upstream HTTP Client Registry
+Long-lived pooled httpx clients shared by the AI, STT and TTS services
+One client per upstream so each gets its own keep-alive pool
+"""
+import httpx
+from typing import Dict
+from app.config import get_settings
+
+settings = get_settings()
+
+# Upstreams we talk to - one pooled client each
+GROQ = "groq"
+ELEVENLABS = "elevenlabs"
+GOOGLE_STT = "google_stt"
+
+UPSTREAMS = (GROQ, ELEVENLABS, GOOGLE_STT)
+
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional 'h2' package (installed via httpx[http2])"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class HTTPClientRegistry:
+    """
+    Registry of long-lived httpx.AsyncClient instances
+    Opened on app startup, closed on shutdown
+    """
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def _build_client(self) -> httpx.AsyncClient:
+        """Create a pooled client using the configured limits"""
+        limits = httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry
+        )
+        timeout = httpx.Timeout(
+            settings.http_timeout,
+            connect=settings.http_connect_timeout
+        )
+        return httpx.AsyncClient(
+            http2=settings.http2_enabled and _http2_available(),
+            limits=limits,
+            timeout=timeout
+        )
+
+    async def startup(self):
+        """Open one client per upstream"""
+        for name in UPSTREAMS:
+            self.get(name)
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        """
+        Get the pooled client for an upstream
+        Creates it lazily so scripts that skip the startup hook still work
+        """
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client = self._build_client()
+            self._clients[name] = client
+        return client
+
+    async def shutdown(self):
+        """Close every client and drop its connection pool"""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            if not client.is_closed:
+                await client.aclose()
+
+
+# ============================================================================
+# SINGLETON INSTANCE
+# ============================================================================
+
+_http_clients = None
+
+def get_http_clients() -> HTTPClientRegistry:
+    """
+    Get HTTP client registry singleton instance
+    Creates instance on first call, reuses afterwards
+    """
+    global _http_clients
+    if _http_clients is None:
+        _http_clients = HTTPClientRegistry()
+    return _http_clients
+
+
+def get_http_client(name: str) -> httpx.AsyncClient:
+    """Shortcut for get_http_clients().get(name)"""
+    return get_http_clients().get(name)
@@ -0,0 +1,323 @@
+"""
+LLM Providers
+OpenAI-compatible chat completion backends (Groq, self-hosted llama.cpp /
+vLLM servers, ...) plus a local stand-in provider for tests
+"""
+import asyncio
+import json
+import random
+import time
+from abc import ABC, abstractmethod
+import httpx
+from typing import AsyncIterator, Dict, Optional
+from app.config import get_settings
+from app.services.http_clients import get_http_client
+from app.services.rate_limiter import get_upstream_quota
+from app.services.resilience import ResilientCaller, UpstreamError, backoff_delay
+from app.services.usage_tracker import report_usage, chunk_usage, raw_chunk_usage
+from app.utils.sse import SSEByteParser, DONE, chat_completion_chunk
+
+settings = get_settings()
+
+
+def estimate_payload_tokens(payload: Dict) -> int:
+    """Rough prompt + completion token count for quota throttling"""
+    prompt_chars = sum(len(msg["content"]) for msg in payload["messages"])
+    return prompt_chars // 4 + payload["max_tokens"]
+
+
+class LLMProvider(ABC):
+    """
+    Base class for a chat completion backend
+
+    Subclasses implement complete() and stream(); this class adds
+    retries/circuit breaking and tracks moving averages of latency and
+    error rate that the router uses to pick a provider.
+    """
+
+    def __init__(self, name: str, model: str, weight: float = 1.0):
+        self.name = name
+        self.model = model
+        self.weight = weight
+        self.resilient = ResilientCaller(name)
+        self.ewma_latency: Optional[float] = None  # seconds
+        self.ewma_error_rate = 0.0
+        self.requests = 0
+        self.failures = 0
+
+    @abstractmethod
+    async def complete(self, payload: Dict) -> str:
+        """Send one blocking completion request"""
+
+    @abstractmethod
+    def stream(self, payload: Dict, raw: bool = False) -> AsyncIterator:
+        """
+        Open one streaming completion request (an async generator)
+        Yields text deltas, or (raw=True) each upstream chunk's JSON bytes
+        """
+
+    # ------------------------------------------------------------------
+    # Health tracking
+    # ------------------------------------------------------------------
+
+    def record(self, latency: Optional[float], ok: bool):
+        """Update moving averages after a call (latency=None on failure)"""
+        alpha = settings.llm_router_ewma_alpha
+        self.requests += 1
+        if not ok:
+            self.failures += 1
+        self.ewma_error_rate = (1 - alpha) * self.ewma_error_rate + alpha * (0.0 if ok else 1.0)
+        if latency is not None:
+            if self.ewma_latency is None:
+                self.ewma_latency = latency
+            else:
+                self.ewma_latency = (1 - alpha) * self.ewma_latency + alpha * latency
+
+    def score(self) -> float:
+        """Lower is better: latency inflated by error rate, scaled by weight"""
+        latency = self.ewma_latency if self.ewma_latency is not None else settings.llm_router_default_latency
+        penalty = 1.0 + settings.llm_router_error_penalty * self.ewma_error_rate
+        return latency * penalty / max(self.weight, 0.001)
+
+    @property
+    def available(self) -> bool:
+        """False while the circuit breaker is open"""
+        breaker = self.resilient.breaker
+        if breaker.state != breaker.OPEN:
+            return True
+        return time.monotonic() - breaker.opened_at >= breaker.reset_timeout
+
+    # ------------------------------------------------------------------
+    # Resilient calls
+    # ------------------------------------------------------------------
+
+    async def call(self, payload: Dict) -> str:
+        """Blocking completion with retries, hedging and circuit breaking"""
+        return await self.resilient.call(lambda: self.complete(payload))
+
+    async def call_stream(self, payload: Dict, raw: bool = False) -> AsyncIterator:
+        """
+        Stream with a first-token timeout, retrying (with jitter) only
+        before the first token - once text is flowing we can't replay it
+        """
+        breaker = self.resilient.breaker
+        max_retries = self.resilient.max_retries
+        for attempt in range(max_retries + 1):
+            breaker.allow()
+            stream = self.stream(payload, raw=raw)
+            try:
+                first = await asyncio.wait_for(
+                    stream.__anext__(),
+                    timeout=settings.llm_first_token_timeout
+                )
+            except StopAsyncIteration:
+                breaker.record_success()
+                return
+            except (UpstreamError, asyncio.TimeoutError) as e:
+                await stream.aclose()
+                retryable = isinstance(e, asyncio.TimeoutError) or e.retryable
+                if not retryable:
+                    breaker.record_success()
+                    raise
+                breaker.record_failure()
+                if attempt == max_retries:
+                    raise UpstreamError(f"{self.name} stream failed: {e!r}", retryable=True)
+                self.resilient.retries += 1
+                await asyncio.sleep(backoff_delay(
+                    attempt, settings.llm_retry_base_delay, settings.llm_retry_max_delay
+                ))
+                continue
+            except BaseException:
+                # Never leave a half-open probe in flight (see ResilientCaller.call)
+                breaker.release_probe()
+                await stream.aclose()
+                raise
+
+            breaker.record_success()
+            yield first
+            async for content in stream:
+                yield content
+            return
+
+    def stats(self) -> Dict:
+        return {
+            "model": self.model,
+            "weight": self.weight,
+            "ewma_latency_seconds": round(self.ewma_latency, 4) if self.ewma_latency is not None else None,
+            "ewma_error_rate": round(self.ewma_error_rate, 4),
+            "requests": self.requests,
+            "failures": self.failures,
+            "score": round(self.score(), 4),
+            **self.resilient.stats()
+        }
+
+
+class OpenAICompatibleProvider(LLMProvider):
+    """
+    Any backend speaking the OpenAI /chat/completions API
+    (Groq, llama.cpp server, vLLM, Ollama's OpenAI endpoint, ...)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        base_url: str,
+        model: str,
+        api_key: str = "",
+        weight: float = 1.0
+    ):
+        super().__init__(name, model, weight)
+        self.base_url = base_url
+        self.api_key = api_key
+        self.timeout = httpx.Timeout(
+            settings.llm_read_timeout,
+            connect=settings.llm_connect_timeout
+        )
+
+    def _headers(self) -> Dict:
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        return headers
+
+    async def complete(self, payload: Dict) -> str:
+        """Send one blocking completion request"""
+        quota = get_upstream_quota(self.name)
+        await quota.throttle(estimate_payload_tokens(payload))
+        try:
+            client = get_http_client(self.name)
+            response = await client.post(
+                self.base_url,
+                headers=self._headers(),
+                json={**payload, "model": self.model},
+                timeout=self.timeout
+            )
+        except httpx.TimeoutException as e:
+            raise UpstreamError(f"{self.name} API timeout: {e!r}", retryable=True)
+        except httpx.TransportError as e:
+            raise UpstreamError(f"{self.name} API connection error: {e!r}", retryable=True)
+        quota.update(response.headers, response.status_code)
+
+        if response.status_code != 200:
+            raise UpstreamError.from_status(self.name, response.status_code, response.text)
+
+        result = response.json()
+        report_usage(result.get("usage"))
+        return result["choices"][0]["message"]["content"].strip()
+
+    async def stream(self, payload: Dict, raw: bool = False) -> AsyncIterator:
+        """
+        Open one streaming completion request
+        Yields text deltas, or (raw=True) each upstream chunk's JSON bytes
+        untouched so it can be forwarded without a parse/serialize round trip
+        """
+        quota = get_upstream_quota(self.name)
+        await quota.throttle(estimate_payload_tokens(payload))
+        client = get_http_client(self.name)
+        try:
+            async with client.stream(
+                "POST",
+                self.base_url,
+                headers=self._headers(),
+                json={**payload, "model": self.model, "stream": True},
+                timeout=self.timeout
+            ) as response:
+                quota.update(response.headers, response.status_code)
+                if response.status_code != 200:
+                    error_content = await response.aread()
+                    raise UpstreamError.from_status(
+                        self.name, response.status_code, error_content.decode()
+                    )
+
+                parser = SSEByteParser()
+                async for raw_chunk in response.aiter_bytes():
+                    for data in parser.feed(raw_chunk):
+                        if data == DONE:
+                            return
+                        if raw:
+                            report_usage(raw_chunk_usage(data))
+                            yield data
+                            continue
+
+                        try:
+                            chunk = json.loads(data)
+                            report_usage(chunk_usage(chunk))
+                            content = chunk["choices"][0]["delta"].get("content", "")
+                            if content:
+                                yield content
+                        except:
+                            continue
+        except httpx.TimeoutException as e:
+            raise UpstreamError(f"{self.name} API timeout: {e!r}", retryable=True)
+        except httpx.TransportError as e:
+            raise UpstreamError(f"{self.name} API connection error: {e!r}", retryable=True)
+
+
+class LocalProvider(LLMProvider):
+    """
+    In-process stand-in provider for tests and offline development
+    Echoes the last user message after an optional delay, and can be told
+    to fail a fraction of calls to exercise failover
+    """
+
+    def __init__(
+        self,
+        name: str = "local",
+        model: str = "local-echo",
+        weight: float = 1.0,
+        delay: float = 0.0,
+        failure_rate: float = 0.0,
+        reply_prefix: str = "Na you talk say: "
+    ):
+        super().__init__(name, model, weight)
+        self.delay = delay
+        self.failure_rate = failure_rate
+        self.reply_prefix = reply_prefix
+
+    def _reply(self, payload: Dict) -> str:
+        user_turns = [msg["content"] for msg in payload["messages"] if msg["role"] == "user"]
+        return self.reply_prefix + (user_turns[-1] if user_turns else "")
+
+    def _maybe_fail(self):
+        if self.failure_rate and random.random() < self.failure_rate:
+            raise UpstreamError(f"{self.name} simulated failure", status_code=503, retryable=True)
+
+    async def complete(self, payload: Dict) -> str:
+        await asyncio.sleep(self.delay)
+        self._maybe_fail()
+        return self._reply(payload)
+
+    async def stream(self, payload: Dict, raw: bool = False) -> AsyncIterator:
+        await asyncio.sleep(self.delay)
+        self._maybe_fail()
+        for word in self._reply(payload).split(" "):
+            yield chat_completion_chunk(word + " ", self.model) if raw else word + " "
+
+
+def build_provider(config: Dict) -> LLMProvider:
+    """
+    Build a provider from one LLM_PROVIDERS entry, e.g.
+    {"name": "groq", "type": "openai", "base_url": "...", "model": "...",
+     "api_key": "...", "weight": 1.0}
+    {"name": "local", "type": "local", "delay": 0.05}
+    """
+    kind = config.get("type", "openai")
+    name = config["name"]
+    weight = float(config.get("weight", 1.0))
+    if kind == "local":
+        return LocalProvider(
+            name=name,
+            model=config.get("model", "local-echo"),
+            weight=weight,
+            delay=float(config.get("delay", 0.0)),
+            failure_rate=float(config.get("failure_rate", 0.0))
+        )
+    if kind == "openai":
+        return OpenAICompatibleProvider(
+            name=name,
+            base_url=config["base_url"],
+            model=config.get("model", settings.ai_model),
+            api_key=config.get("api_key", ""),
+            weight=weight
+        )
+    raise ValueError(f"Unknown LLM provider type: {kind}")
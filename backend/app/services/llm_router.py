@@ -0,0 +1,140 @@
+"""
+LLM Router
+Sends each request to the provider with the best recent latency and
+error rate, failing over to the next one when a provider is down
+"""
+import random
+import time
+from typing import AsyncIterator, Dict, List
+from app.config import get_settings
+from app.services.admission import AdmissionRejected
+from app.services.http_clients import GROQ
+from app.services.llm_providers import LLMProvider, build_provider
+from app.services.resilience import UpstreamError, CircuitOpenError
+
+settings = get_settings()
+
+GROQ_CHAT_COMPLETIONS_URL = "https://api.groq.com/openai/v1/chat/completions"
+
+
+def _should_fail_over(error: Exception) -> bool:
+    """Provider-side trouble moves on to the next provider; bad requests don't"""
+    if isinstance(error, (CircuitOpenError, AdmissionRejected)):
+        return True
+    return isinstance(error, UpstreamError) and error.retryable
+
+
+class LLMRouter:
+    """
+    Latency-aware router over several OpenAI-compatible providers
+
+    Providers are ranked by score (EWMA latency x error penalty / weight).
+    A small share of traffic is sent to a random runner-up so providers
+    that were slow once get re-measured instead of being starved forever.
+    """
+
+    def __init__(self, providers: List[LLMProvider], explore_rate: float = 0.05):
+        if not providers:
+            raise ValueError("LLM router needs at least one provider")
+        self.providers = providers
+        self.explore_rate = explore_rate
+
+    def ranked(self) -> List[LLMProvider]:
+        """Providers in the order they should be tried"""
+        healthy = [provider for provider in self.providers if provider.available]
+        # Everything is down - still try in score order (breakers fail fast)
+        candidates = healthy or list(self.providers)
+        ordered = sorted(candidates, key=lambda provider: provider.score())
+        if len(ordered) > 1 and random.random() < self.explore_rate:
+            explore = ordered.pop(random.randrange(1, len(ordered)))
+            ordered.insert(0, explore)
+        return ordered
+
+    async def complete(self, payload: Dict) -> str:
+        """
+        Blocking completion on the best provider, failing over on errors
+
+        Raises:
+            UpstreamError / AdmissionRejected: From the last provider tried
+        """
+        last_error = None
+        for provider in self.ranked():
+            started = time.monotonic()
+            try:
+                text = await provider.call(payload)
+            except (UpstreamError, AdmissionRejected) as e:
+                if not _should_fail_over(e):
+                    raise
+                if not isinstance(e, (CircuitOpenError, AdmissionRejected)):
+                    provider.record(None, ok=False)
+                last_error = e
+                continue
+            provider.record(time.monotonic() - started, ok=True)
+            return text
+        raise last_error
+
+    async def stream(self, payload: Dict, raw: bool = False) -> AsyncIterator:
+        """
+        Stream from the best provider; fail over only before the first token
+        Latency for streams is time to first token
+        raw=True yields upstream chunk JSON bytes instead of text deltas
+        """
+        last_error = None
+        for provider in self.ranked():
+            started = time.monotonic()
+            stream = provider.call_stream(payload, raw=raw)
+            try:
+                first = await stream.__anext__()
+            except StopAsyncIteration:
+                provider.record(time.monotonic() - started, ok=True)
+                return
+            except (UpstreamError, AdmissionRejected) as e:
+                if not _should_fail_over(e):
+                    raise
+                if not isinstance(e, (CircuitOpenError, AdmissionRejected)):
+                    provider.record(None, ok=False)
+                last_error = e
+                continue
+
+            provider.record(time.monotonic() - started, ok=True)
+            yield first
+            async for content in stream:
+                yield content
+            return
+        raise last_error
+
+    def stats(self) -> Dict:
+        return {provider.name: provider.stats() for provider in self.providers}
+
+
+def default_provider_configs() -> List[Dict]:
+    """LLM_PROVIDERS from settings, or just Groq when none are configured"""
+    if settings.llm_providers:
+        return settings.llm_providers
+    return [{
+        "name": GROQ,
+        "type": "openai",
+        "base_url": GROQ_CHAT_COMPLETIONS_URL,
+        "model": settings.ai_model,
+        "api_key": settings.groq_api_key
+    }]
+
+
+# ============================================================================
+# SINGLETON INSTANCE
+# ============================================================================
+
+_llm_router = None
+
+def get_llm_router() -> LLMRouter:
+    """
+    Get LLM router singleton instance
+    Creates instance on first call, reuses afterwards
+    """
+    global _llm_router
+    if _llm_router is None:
+        _llm_router = LLMRouter(
+            [build_provider(config) for config in default_provider_configs()],
+            explore_rate=settings.llm_router_explore_rate
+        )
+    return _llm_router
@@ -0,0 +1,144 @@
+"""
+Password Hasher
+Runs bcrypt in a small dedicated thread pool so hashing never blocks the
+event loop, with a bounded wait queue so login storms can't starve chat traffic
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+import bcrypt
+from app.config import get_settings
+from app.services.admission import AdmissionRejected
+
+settings = get_settings()
+
+
+def hash_password(password: str, rounds: int) -> str:
+    """bcrypt hash with the given cost (blocking)"""
+    salt = bcrypt.gensalt(rounds=rounds)
+    return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+
+
+def check_password(plain_password: str, hashed_password: str) -> bool:
+    """bcrypt verify (blocking)"""
+    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+
+def hash_cost(hashed_password: str) -> int:
+    """Cost factor of a "$2b$12$..." hash (0 if it can't be read)"""
+    try:
+        return int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return 0
+
+
+class PasswordHasher:
+    """
+    bcrypt off the event loop
+
+    At most `workers` hashes run at once (bcrypt releases the GIL, so they
+    run in parallel with request handling). Up to max_queue more wait for a
+    worker; beyond that, or after max_wait seconds, callers get a fast
+    429/503 (AdmissionRejected) instead of piling up.
+    """
+
+    def __init__(self, workers: int = 2, max_queue: int = 32, max_wait: float = 5.0, rounds: int = 12):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.rounds = rounds
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._slots = asyncio.Semaphore(workers)
+        self._active = 0
+        self._waiting = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.rehashed = 0
+        self.total_wait = 0.0
+        self.total_run = 0.0
+
+    async def _run(self, fn, *args):
+        if self._active + self._waiting >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise AdmissionRejected(
+                "Too many people dey login now, abeg try again small time.",
+                status_code=429,
+                retry_after=1
+            )
+
+        started = time.monotonic()
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.max_wait)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise AdmissionRejected(
+                "Server too busy now o, abeg try again small time.",
+                status_code=503,
+                retry_after=1
+            )
+        finally:
+            self._waiting -= 1
+
+        ran_at = time.monotonic()
+        self.total_wait += ran_at - started
+        self._active += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self._active -= 1
+            self._slots.release()
+            self.completed += 1
+            self.total_run += time.monotonic() - ran_at
+
+    async def hash(self, password: str) -> str:
+        """Hash with the configured cost"""
+        return await self._run(hash_password, password, self.rounds)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(check_password, plain_password, hashed_password)
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """True if the hash was made with a different cost than configured"""
+        return hash_cost(hashed_password) != self.rounds
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+    def stats(self) -> Dict:
+        return {
+            "workers": self.workers,
+            "rounds": self.rounds,
+            "active": self._active,
+            "queued": self._waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "rehashed": self.rehashed,
+            "avg_wait_ms": round(self.total_wait / self.completed * 1000, 2) if self.completed else 0.0,
+            "avg_run_ms": round(self.total_run / self.completed * 1000, 2) if self.completed else 0.0
+        }
+
+
+# ============================================================================
+# SINGLETON INSTANCE
+# ============================================================================
+
+_password_hasher = None
+
+def get_password_hasher() -> PasswordHasher:
+    """
+    Get password hasher singleton instance
+    Creates instance on first call, reuses afterwards
+    """
+    global _password_hasher
+    if _password_hasher is None:
+        _password_hasher = PasswordHasher(
+            workers=settings.password_hash_workers,
+            max_queue=settings.password_hash_max_queue,
+            max_wait=settings.password_hash_max_wait,
+            rounds=settings.bcrypt_rounds
+        )
+    return _password_hasher
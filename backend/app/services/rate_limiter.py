@@ -0,0 +1,209 @@
+"""
+Upstream Rate Limiter
+Tracks each provider's remaining request/token quota from its x-ratelimit-*
+response headers (Groq/OpenAI style) and throttles ahead of time instead of
+waiting for a 429
+"""
+import asyncio
+import re
+import time
+from typing import Dict, Mapping, Optional, Tuple
+from app.config import get_settings
+from app.services.admission import AdmissionRejected
+
+settings = get_settings()
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+
+def parse_reset_duration(value: Optional[str]) -> Optional[float]:
+    """
+    Parse Groq reset durations into seconds
+    e.g. "2m59.56s" -> 179.56, "7.66s" -> 7.66, "450ms" -> 0.45
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_RE.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def _parse_int(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+class _Bucket:
+    """Remaining quota for one dimension (requests or tokens)"""
+
+    def __init__(self):
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset_at: Optional[float] = None  # monotonic deadline
+
+    def update(self, limit, remaining, reset_seconds, now: float):
+        if limit is not None:
+            self.limit = limit
+        if remaining is not None:
+            self.remaining = remaining
+        if reset_seconds is not None:
+            self.reset_at = now + reset_seconds
+
+    def refresh(self, now: float):
+        """Quota is back to full once the reset window passes"""
+        if self.reset_at is not None and now >= self.reset_at:
+            self.remaining = self.limit
+            self.reset_at = None
+
+    def stats(self, now: float) -> Dict:
+        return {
+            "limit": self.limit,
+            "remaining": self.remaining,
+            "reset_in_seconds": round(max(0.0, self.reset_at - now), 3) if self.reset_at else None
+        }
+
+
+class UpstreamQuota:
+    """
+    Shared quota state for the blocking and streaming Groq paths
+
+    - update(): record x-ratelimit-* headers from every response
+    - throttle(): wait before sending when quota is running low, spreading
+      the remaining requests evenly over the rest of the reset window
+    """
+
+    def __init__(self, low_watermark: float = 0.2, max_delay: float = 10.0):
+        self.low_watermark = low_watermark
+        self.max_delay = max_delay
+        self.requests = _Bucket()
+        self.tokens = _Bucket()
+        self._blocked_until = 0.0
+        self._next_slot = 0.0
+        self.throttled = 0
+        self.total_delay = 0.0
+        self.rate_limited = 0
+
+    def update(self, headers: Mapping[str, str], status_code: int = 200):
+        """Record quota headers from an upstream response"""
+        now = time.monotonic()
+        self.requests.update(
+            _parse_int(headers.get("x-ratelimit-limit-requests")),
+            _parse_int(headers.get("x-ratelimit-remaining-requests")),
+            parse_reset_duration(headers.get("x-ratelimit-reset-requests")),
+            now
+        )
+        self.tokens.update(
+            _parse_int(headers.get("x-ratelimit-limit-tokens")),
+            _parse_int(headers.get("x-ratelimit-remaining-tokens")),
+            parse_reset_duration(headers.get("x-ratelimit-reset-tokens")),
+            now
+        )
+        if status_code == 429:
+            self.rate_limited += 1
+            retry_after = parse_reset_duration(headers.get("retry-after")) or 1.0
+            self._blocked_until = max(self._blocked_until, now + retry_after)
+
+    def _delay_for(self, tokens: int, now: float) -> Tuple[float, Optional[float]]:
+        """
+        How long the next request should wait (0 if it can go now)
+        Side-effect free: returns (delay, pacing slot to claim or None)
+        """
+        self.requests.refresh(now)
+        self.tokens.refresh(now)
+        delay = max(0.0, self._blocked_until - now)
+        next_slot = None
+
+        # Out of tokens for this request - wait for the token window
+        if self.tokens.remaining is not None and self.tokens.remaining < tokens and self.tokens.reset_at:
+            delay = max(delay, self.tokens.reset_at - now)
+
+        bucket = self.requests
+        if bucket.remaining is not None and bucket.reset_at:
+            window = bucket.reset_at - now
+            if bucket.remaining <= 0:
+                delay = max(delay, window)
+            elif bucket.limit and bucket.remaining < bucket.limit * self.low_watermark:
+                # Running low - pace what's left across the reset window
+                interval = window / bucket.remaining
+                slot = max(now, self._next_slot)
+                next_slot = slot + interval
+                delay = max(delay, slot - now)
+        return delay, next_slot
+
+    async def throttle(self, tokens: int = 0):
+        """
+        Wait until sending a request of ~tokens is within quota
+
+        Raises:
+            AdmissionRejected: If the required wait exceeds max_delay
+        """
+        now = time.monotonic()
+        delay, next_slot = self._delay_for(tokens, now)
+        if delay > self.max_delay:
+            # Rejected calls reserve nothing
+            raise AdmissionRejected(
+                "AI don reach im limit for now, abeg try again small time.",
+                status_code=503,
+                retry_after=max(1, int(delay + 0.999))
+            )
+
+        # Reserve quota optimistically so concurrent callers see it go down
+        if next_slot is not None:
+            self._next_slot = next_slot
+        if self.requests.remaining is not None:
+            self.requests.remaining -= 1
+        if self.tokens.remaining is not None:
+            self.tokens.remaining -= tokens
+
+        if delay <= 0:
+            return
+        self.throttled += 1
+        self.total_delay += delay
+        await asyncio.sleep(delay)
+
+    def stats(self) -> Dict:
+        """Current quota state for monitoring"""
+        now = time.monotonic()
+        return {
+            "requests": self.requests.stats(now),
+            "tokens": self.tokens.stats(now),
+            "blocked_for_seconds": round(max(0.0, self._blocked_until - now), 3),
+            "throttled": self.throttled,
+            "total_delay_seconds": round(self.total_delay, 3),
+            "rate_limited": self.rate_limited
+        }
+
+
+# ============================================================================
+# REGISTRY
+# ============================================================================
+
+_upstream_quotas: Dict[str, UpstreamQuota] = {}
+
+def get_upstream_quota(name: str = "groq") -> UpstreamQuota:
+    """
+    Get the quota tracker for an upstream provider
+    Creates one per provider on first call, reuses afterwards
+    """
+    quota = _upstream_quotas.get(name)
+    if quota is None:
+        quota = UpstreamQuota(
+            low_watermark=settings.llm_quota_low_watermark,
+            max_delay=settings.llm_max_throttle_delay
+        )
+        _upstream_quotas[name] = quota
+    return quota
+
+
+def upstream_quota_stats() -> Dict:
+    """Quota state of every upstream for monitoring"""
+    return {name: quota.stats() for name, quota in _upstream_quotas.items()}
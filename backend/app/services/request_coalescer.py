@@ -0,0 +1,182 @@
+"""
+Request Coalescer
+Single-flight de-duplication for identical in-flight LLM requests
+Concurrent callers with the same payload share one upstream call (or stream)
+"""
+import asyncio
+import hashlib
+import json
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+from app.config import get_settings
+
+settings = get_settings()
+
+
+def make_request_key(payload: Dict) -> str:
+    """
+    Hash the effective request payload
+    (system prompt, history, message, model, temperature, max_tokens)
+    """
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class _Broadcast:
+    """Buffered chunks of one upstream stream, replayed to every subscriber"""
+
+    def __init__(self):
+        self.chunks: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self.changed = asyncio.Condition()
+        self.pump: Optional[asyncio.Task] = None
+
+
+class RequestCoalescer:
+    """
+    Single-flight layer for upstream AI calls
+    - run(): one shared awaitable result per key
+    - stream(): one shared upstream stream fanned out to every subscriber
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._streams: Dict[str, _Broadcast] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def run(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn() once for all concurrent callers with the same key
+
+        Args:
+            key: Request key from make_request_key()
+            fn: Zero-arg coroutine factory making the upstream call
+
+        Returns:
+            The shared result (exceptions are shared too)
+        """
+        self.calls += 1
+        if not self.enabled:
+            return await fn()
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(self._inflight, key, done))
+        else:
+            self.coalesced += 1
+
+        # Shield so one caller disconnecting doesn't cancel everyone else
+        return await asyncio.shield(task)
+
+    async def stream(
+        self,
+        key: str,
+        fn: Callable[[], AsyncIterator[str]]
+    ) -> AsyncIterator[str]:
+        """
+        Subscribe to a shared upstream stream
+        Late subscribers get the chunks buffered so far, then live chunks
+
+        Args:
+            key: Request key from make_request_key()
+            fn: Zero-arg factory returning the upstream async iterator
+
+        Yields:
+            Chunks of generated text
+        """
+        self.calls += 1
+        if not self.enabled:
+            async for chunk in fn():
+                yield chunk
+            return
+
+        broadcast = self._streams.get(key)
+        if broadcast is None:
+            broadcast = _Broadcast()
+            self._streams[key] = broadcast
+            broadcast.pump = asyncio.ensure_future(self._pump(key, broadcast, fn))
+        else:
+            self.coalesced += 1
+
+        broadcast.subscribers += 1
+        position = 0
+        try:
+            while True:
+                async with broadcast.changed:
+                    await broadcast.changed.wait_for(
+                        lambda: position < len(broadcast.chunks) or broadcast.done
+                    )
+                    pending = broadcast.chunks[position:]
+                    finished = broadcast.done
+
+                for chunk in pending:
+                    yield chunk
+                position += len(pending)
+
+                if finished and position >= len(broadcast.chunks):
+                    if broadcast.error is not None:
+                        raise broadcast.error
+                    return
+        finally:
+            broadcast.subscribers -= 1
+            # Nobody is listening any more - stop pulling tokens upstream
+            if broadcast.subscribers == 0 and not broadcast.done:
+                # Unlist it now so a new request starts a fresh stream instead
+                # of joining one that is being torn down
+                self._forget(self._streams, key, broadcast)
+                broadcast.pump.cancel()
+
+    async def _pump(self, key: str, broadcast: _Broadcast, fn):
+        """Read the upstream stream once and publish every chunk"""
+        try:
+            async for chunk in fn():
+                async with broadcast.changed:
+                    broadcast.chunks.append(chunk)
+                    broadcast.changed.notify_all()
+        except asyncio.CancelledError:
+            broadcast.error = Exception("Upstream stream cancelled")
+        except Exception as e:
+            broadcast.error = e
+        finally:
+            self._forget(self._streams, key, broadcast)
+            async with broadcast.changed:
+                broadcast.done = True
+                broadcast.changed.notify_all()
+
+    @staticmethod
+    def _forget(registry: Dict, key: str, value):
+        """Drop a finished entry unless a newer one replaced it"""
+        if registry.get(key) is value:
+            del registry[key]
+
+    def stats(self) -> Dict:
+        """Coalescing counters for monitoring"""
+        return {
+            "enabled": self.enabled,
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight),
+            "inflight_streams": len(self._streams)
+        }
+
+
+# ============================================================================
+# SINGLETON INSTANCE
+# ============================================================================
+
+_request_coalescer = None
+
+def get_request_coalescer() -> RequestCoalescer:
+    """
+    Get request coalescer singleton instance
+    Creates instance on first call, reuses afterwards
+    """
+    global _request_coalescer
+    if _request_coalescer is None:
+        _request_coalescer = RequestCoalescer(enabled=settings.llm_coalescing_enabled)
+    return _request_coalescer
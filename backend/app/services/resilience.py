@@ -0,0 +1,273 @@
+"""
+Resilience Helpers
+Retries with jitter, hedged requests and per-upstream circuit breakers
+for calls to the AI providers
+"""
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+from app.config import get_settings
+
+settings = get_settings()
+
+T = TypeVar("T")
+
+# HTTP statuses worth retrying - everything else is the caller's fault
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+class UpstreamError(Exception):
+    """
+    Failed call to an upstream provider
+    retryable=True for transport errors, timeouts and 429/5xx
+    """
+
+    def __init__(self, message: str, status_code: Optional[int] = None, retryable: bool = False):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retryable = retryable
+
+    @classmethod
+    def from_status(cls, upstream: str, status_code: int, body: str) -> "UpstreamError":
+        return cls(
+            f"{upstream} API Error ({status_code}): {body}",
+            status_code=status_code,
+            retryable=status_code in RETRYABLE_STATUS_CODES
+        )
+
+
+class CircuitOpenError(UpstreamError):
+    """Raised without calling upstream while its circuit breaker is open"""
+
+    def __init__(self, upstream: str, retry_in: float):
+        super().__init__(f"{upstream} circuit open, retry in {retry_in:.1f}s", retryable=False)
+        self.retry_in = retry_in
+
+
+# ============================================================================
+# CIRCUIT BREAKER
+# ============================================================================
+
+class CircuitBreaker:
+    """
+    Per-upstream circuit breaker
+    closed -> (N consecutive failures) -> open -> (reset timeout) -> half-open
+    half-open lets one probe through; success closes, failure re-opens
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self.rejected = 0
+
+    def allow(self):
+        """
+        Check the breaker before calling upstream
+
+        Raises:
+            CircuitOpenError: If the upstream is considered down
+        """
+        if self.state == self.CLOSED:
+            return
+        elapsed = time.monotonic() - self.opened_at
+        if self.state == self.OPEN and elapsed >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+        if self.state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return
+        self.rejected += 1
+        raise CircuitOpenError(self.name, max(0.0, self.reset_timeout - elapsed))
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def release_probe(self):
+        """
+        The call ended without an upstream verdict (cancelled, throttled
+        locally, ...): let the next call probe, but count nothing
+        """
+        if self.state == self.HALF_OPEN:
+            self._probe_in_flight = False
+
+    def stats(self) -> Dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "rejected": self.rejected
+        }
+
+
+# ============================================================================
+# LATENCY TRACKING (for hedging)
+# ============================================================================
+
+class LatencyTracker:
+    """Sliding window of recent call latencies"""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Latency at percentile p (0-1), None until we have enough samples"""
+        if len(self._samples) < 20:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(p * len(ordered)))
+        return ordered[index]
+
+
+# ============================================================================
+# RETRY + HEDGE
+# ============================================================================
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+async def hedged(fn: Callable[[], Awaitable[T]], hedge_after: Optional[float]) -> T:
+    """
+    Run fn(); if it hasn't finished after hedge_after seconds, start a
+    second identical call and return whichever succeeds first
+    """
+    if hedge_after is None:
+        return await fn()
+
+    primary = asyncio.ensure_future(fn())
+    done, _ = await asyncio.wait({primary}, timeout=hedge_after)
+    if done:
+        return primary.result()
+
+    backup = asyncio.ensure_future(fn())
+    pending = {primary, backup}
+    error = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+class ResilientCaller:
+    """
+    Retry + hedge + circuit breaker around one upstream's blocking calls
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.breaker = get_circuit_breaker(name)
+        self.latency = LatencyTracker()
+        self.max_retries = settings.llm_max_retries
+        self.retries = 0
+        self.hedges = 0
+
+    def hedge_after(self) -> Optional[float]:
+        """Hedge delay from recent p95 latency, or None if hedging is off"""
+        if not settings.llm_hedging_enabled:
+            return None
+        p95 = self.latency.percentile(settings.llm_hedge_percentile)
+        if p95 is None:
+            return None
+        return max(settings.llm_hedge_min_delay, p95)
+
+    async def call(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Call upstream with retries on retryable failures
+
+        Raises:
+            CircuitOpenError: If the breaker is open
+            UpstreamError: If every attempt failed
+        """
+        for attempt in range(self.max_retries + 1):
+            self.breaker.allow()
+            started = time.monotonic()
+            hedge_after = self.hedge_after()
+            try:
+                result = await hedged(fn, hedge_after)
+            except UpstreamError as e:
+                if not e.retryable:
+                    # Upstream answered - it's alive, the request was bad
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                if attempt == self.max_retries:
+                    raise
+                self.retries += 1
+                await asyncio.sleep(backoff_delay(
+                    attempt, settings.llm_retry_base_delay, settings.llm_retry_max_delay
+                ))
+                continue
+            except BaseException:
+                # Throttle rejections, cancellation, malformed responses...:
+                # not the upstream's fault, but a half-open probe must end
+                self.breaker.release_probe()
+                raise
+
+            elapsed = time.monotonic() - started
+            if hedge_after is not None and elapsed > hedge_after:
+                self.hedges += 1
+            self.latency.record(elapsed)
+            self.breaker.record_success()
+            return result
+
+    def stats(self) -> Dict:
+        return {
+            "breaker": self.breaker.stats(),
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "p95_seconds": self.latency.percentile(0.95)
+        }
+
+
+# ============================================================================
+# REGISTRY
+# ============================================================================
+
+_circuit_breakers: Dict[str, CircuitBreaker] = {}
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """Get (or create) the circuit breaker for an upstream"""
+    breaker = _circuit_breakers.get(name)
+    if breaker is None:
+        breaker = CircuitBreaker(
+            name,
+            failure_threshold=settings.llm_breaker_failure_threshold,
+            reset_timeout=settings.llm_breaker_reset_timeout
+        )
+        _circuit_breakers[name] = breaker
+    return breaker
+
+
+def circuit_breaker_stats() -> Dict:
+    """State of every circuit breaker for monitoring"""
+    return {name: breaker.stats() for name, breaker in _circuit_breakers.items()}
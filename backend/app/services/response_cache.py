@@ -0,0 +1,191 @@
+"""
+LLM Response Cache
+Exact-match cache for AI responses so repeated openers ("How far?", "Habari")
+skip the Groq round trip entirely
+"""
+import hashlib
+import json
+import re
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional, Dict
+from app.config import get_settings
+
+settings = get_settings()
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_EDGE_PUNCTUATION = " \t\n.,!?;:'\"…"
+
+
+def normalize_message(message: str) -> str:
+    """
+    Normalize a user message for exact-match lookup
+    Lowercases, collapses whitespace and trims edge punctuation
+    e.g. "  How far?? " -> "how far"
+    """
+    normalized = _WHITESPACE_RE.sub(" ", message.lower())
+    return normalized.strip(_EDGE_PUNCTUATION)
+
+
+def make_cache_key(language: str, message: str, model: str, max_tokens: int) -> str:
+    """Build the cache key from (language, normalized message, model, max_tokens)"""
+    raw = json.dumps(
+        [language.lower(), normalize_message(message), model, max_tokens],
+        ensure_ascii=False
+    )
+    return "zeempo:llm:" + hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# ============================================================================
+# BACKENDS
+# ============================================================================
+
+class CacheBackend(ABC):
+    """
+    Interface for cache storage
+    Subclass this to share the cache between workers
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: str, ttl: float):
+        ...
+
+    @abstractmethod
+    async def clear(self):
+        ...
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """
+    Bounded per-process cache with LRU eviction and TTL
+    """
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str, ttl: float):
+        self._entries[key] = (value, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Shared cache backed by Redis so several workers reuse the same entries
+    Eviction is left to Redis (configure maxmemory-policy allkeys-lru)
+    """
+
+    def __init__(self, url: str):
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise ValueError("Redis cache backend needs the 'redis' package. Run: pip install redis")
+        self._redis = redis.from_url(url, decode_responses=True)
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self._redis.get(key)
+
+    async def set(self, key: str, value: str, ttl: float):
+        await self._redis.set(key, value, ex=max(1, int(ttl)))
+
+    async def clear(self):
+        async for key in self._redis.scan_iter(match="zeempo:llm:*"):
+            await self._redis.delete(key)
+
+
+# ============================================================================
+# CACHE
+# ============================================================================
+
+class ResponseCache:
+    """
+    Response cache with hit/miss counters over a pluggable backend
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float = 3600.0, enabled: bool = True):
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[str]:
+        """Look up a cached response, counting hits and misses"""
+        try:
+            value = await self.backend.get(key)
+        except Exception as e:
+            # A broken cache must never break chat
+            print(f"Response Cache Error: {str(e)}")
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: str):
+        """Store a response for the configured TTL"""
+        try:
+            await self.backend.set(key, value, self.ttl)
+        except Exception as e:
+            print(f"Response Cache Error: {str(e)}")
+
+    def stats(self) -> Dict:
+        """Hit/miss counters for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+# ============================================================================
+# SINGLETON INSTANCE
+# ============================================================================
+
+_response_cache = None
+
+def get_response_cache() -> ResponseCache:
+    """
+    Get response cache singleton instance
+    Backend is chosen by RESPONSE_CACHE_BACKEND ('memory' or 'redis')
+    """
+    global _response_cache
+    if _response_cache is None:
+        if settings.response_cache_backend == "redis":
+            backend = RedisCacheBackend(settings.redis_url)
+        else:
+            backend = InMemoryCacheBackend(settings.response_cache_max_entries)
+        _response_cache = ResponseCache(
+            backend,
+            ttl=settings.response_cache_ttl,
+            enabled=settings.response_cache_enabled
+        )
+    return _response_cache
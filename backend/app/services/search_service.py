@@ -0,0 +1,179 @@
+"""
+Chat Search Service
+Postgres full-text search over ChatMessage.content
+
+Each message's "searchVector" (GIN-indexed, see schema.prisma) is filled by
+a trigger using the text-search dictionary configured for its session's
+language (CHAT_SEARCH_DICTIONARIES). Run scripts/setup_chat_search.py after
+`prisma db push` or whenever the dictionaries change.
+"""
+import re
+from typing import Dict, List, Optional
+from app.config import get_settings
+
+settings = get_settings()
+
+_DICTIONARY_RE = re.compile(r"^[a-z_][a-z0-9_]*$")
+
+HIGHLIGHT_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=20, MinWords=5"
+
+SEARCH_SQL = """
+WITH q AS (
+    SELECT {tsquery} AS query
+),
+page AS (
+    SELECT m."id", m."sessionId", m."role", m."content", m."timestamp",
+           s."title", s."language",
+           round(ts_rank_cd(m."searchVector", q.query)::numeric, 6) AS "rank"
+    FROM "ChatMessage" m
+    JOIN "ChatSession" s ON s."id" = m."sessionId"
+    CROSS JOIN q
+    WHERE s."userId" = $1
+      AND m."searchVector" @@ q.query{cursor_filter}
+    ORDER BY "rank" DESC, m."id" DESC
+    LIMIT $2
+)
+SELECT page."id", page."sessionId", page."title", page."role", page."timestamp",
+       page."rank"::float8 AS "rank",
+       ts_headline({headline_config}, page."content", q.query, '{options}') AS "highlight"
+FROM page CROSS JOIN q
+ORDER BY page."rank" DESC, page."id" DESC
+"""
+
+# rank is computed in the SELECT list, so the keyset filter repeats it
+CURSOR_FILTER_SQL = """
+      AND (round(ts_rank_cd(m."searchVector", q.query)::numeric, 6), m."id") < ($4::numeric, $5)"""
+
+
+class ChatSearchService:
+    """
+    Ranked, highlighted, keyset-paginated search of a user's messages
+    """
+
+    def __init__(self, dictionaries: Dict[str, str], default_dictionary: str = "simple"):
+        # Dictionary names are interpolated into SQL, so only allow identifiers
+        for name in list(dictionaries.values()) + [default_dictionary]:
+            if not _DICTIONARY_RE.match(name):
+                raise ValueError(f"Invalid text search dictionary: {name}")
+        for language in dictionaries:
+            if not _DICTIONARY_RE.match(language):
+                raise ValueError(f"Invalid chat language: {language}")
+        self.dictionaries = dictionaries
+        self.default_dictionary = default_dictionary
+
+    def _all_dictionaries(self) -> List[str]:
+        return list(dict.fromkeys(list(self.dictionaries.values()) + [self.default_dictionary]))
+
+    def _language_config(self, language_column: str) -> str:
+        """SQL expression picking the dictionary for a session language"""
+        cases = " ".join(
+            f"WHEN '{language}' THEN '{dictionary}'::regconfig"
+            for language, dictionary in self.dictionaries.items()
+        )
+        return f"(CASE {language_column} {cases} ELSE '{self.default_dictionary}'::regconfig END)"
+
+    def _tsquery(self) -> str:
+        """
+        The search text parsed with every configured dictionary, OR'ed so a
+        query matches Pidgin/English (stemmed) and Swahili (unstemmed) rows
+        """
+        return " || ".join(
+            f"websearch_to_tsquery('{dictionary}', $3)" for dictionary in self._all_dictionaries()
+        )
+
+    # ------------------------------------------------------------------
+    # Setup
+    # ------------------------------------------------------------------
+
+    def setup_statements(self) -> List[str]:
+        """DDL for the trigger that keeps "searchVector" up to date"""
+        config = self._language_config(
+            '(SELECT s."language" FROM "ChatSession" s WHERE s."id" = NEW."sessionId")'
+        )
+        return [
+            f"""
+            CREATE OR REPLACE FUNCTION chat_message_search_vector() RETURNS trigger AS $$
+            BEGIN
+                NEW."searchVector" := to_tsvector({config}, coalesce(NEW."content", ''));
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+            """,
+            'DROP TRIGGER IF EXISTS chat_message_search_vector ON "ChatMessage"',
+            """
+            CREATE TRIGGER chat_message_search_vector
+            BEFORE INSERT OR UPDATE OF "content", "sessionId" ON "ChatMessage"
+            FOR EACH ROW EXECUTE FUNCTION chat_message_search_vector()
+            """
+        ]
+
+    def backfill_statement(self) -> str:
+        """
+        Recompute "searchVector" for up to $1 rows that don't have one yet
+        Run repeatedly until it updates 0 rows
+        """
+        config = self._language_config('s."language"')
+        return f"""
+            UPDATE "ChatMessage" m
+            SET "searchVector" = to_tsvector({config}, coalesce(m."content", ''))
+            FROM "ChatSession" s
+            WHERE s."id" = m."sessionId"
+              AND m."id" IN (
+                  SELECT "id" FROM "ChatMessage" WHERE "searchVector" IS NULL LIMIT $1
+              )
+        """
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    async def search(
+        self,
+        db,
+        user_id: str,
+        query: str,
+        limit: int,
+        after: Optional[List] = None
+    ) -> List[Dict]:
+        """
+        One page of matches, best first
+
+        Args:
+            db: Prisma client
+            user_id: Only this user's sessions are searched
+            query: websearch syntax ("quoted phrase", -exclude, or)
+            limit: Page size
+            after: (rank, id) of the last result of the previous page
+
+        Returns:
+            Rows with id, sessionId, title, role, timestamp, rank, highlight
+        """
+        sql = SEARCH_SQL.format(
+            tsquery=self._tsquery(),
+            headline_config=self._language_config('page."language"'),
+            options=HIGHLIGHT_OPTIONS,
+            cursor_filter=CURSOR_FILTER_SQL if after else ""
+        )
+        if after:
+            return await db.query_raw(sql, user_id, limit, query, str(after[0]), after[1])
+        return await db.query_raw(sql, user_id, limit, query)
+
+
+# ============================================================================
+# SINGLETON INSTANCE
+# ============================================================================
+
+_chat_search_service = None
+
+def get_chat_search_service() -> ChatSearchService:
+    """
+    Get chat search service singleton instance
+    Creates instance on first call, reuses afterwards
+    """
+    global _chat_search_service
+    if _chat_search_service is None:
+        _chat_search_service = ChatSearchService(
+            settings.chat_search_dictionaries,
+            default_dictionary=settings.chat_search_default_dictionary
+        )
+    return _chat_search_service
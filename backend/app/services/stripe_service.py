@@ -1,10 +1,18 @@
 import stripe
 from app.config import get_settings
 from app.database import get_db
+from app.services.user_cache import invalidate_user
 
 settings = get_settings()
 stripe.api_key = settings.stripe_secret_key
 
+
+def _user_changed(user_id):
+    """Drop the cached user and read them from the primary for a while"""
+    invalidate_user(user_id)
+    get_db().mark_write(user_id)
+
+
 class StripeService:
     @staticmethod
     async def create_checkout_session(user_id: str, email: str):
@@ -27,6 +35,7 @@ class StripeService:
                     where={"id": user_id},
                     data={"stripeCustomerId": customer_id}
                 )
+                _user_changed(user_id)
 
             session = stripe.checkout.Session.create(
                 customer=customer_id,
@@ -84,25 +93,28 @@ class StripeService:
                     "planType": "pro"
                 }
             )
+            _user_changed(user_id)
 
     @staticmethod
     async def _update_subscription(subscription):
         customer_id = subscription.get('customer')
         status = subscription.get('status')
         db = get_db().client
-        await db.user.update(
+        user = await db.user.update(
             where={"stripeCustomerId": customer_id},
             data={"subscriptionStatus": status}
         )
+        _user_changed(user.id if user else None)
 
     @staticmethod
     async def _cancel_subscription(subscription):
         customer_id = subscription.get('customer')
         db = get_db().client
-        await db.user.update(
+        user = await db.user.update(
             where={"stripeCustomerId": customer_id},
             data={
                 "subscriptionStatus": "canceled",
                 "planType": "free"
             }
         )
+        _user_changed(user.id if user else None)
@@ -3,10 +3,26 @@ Speech-to-Text Service
 Handles audio transcription using Google Cloud Speech-to-Text API
 Supports Nigerian and Ghanaian English accents
 """
-import base64
+import asyncio
 import json
+import math
 import httpx
+from typing import AsyncIterator, Dict, Optional
 from app.config import get_settings
+from app.services.http_clients import get_http_client, GOOGLE_STT
+from app.utils.audio_utils import (
+    AudioRejected,
+    iter_base64,
+    read_audio_upload,
+    decode_audio,
+    encode_ogg_opus,
+    to_mono,
+    pcm_bytes,
+    TARGET_SAMPLE_RATE
+)
+from app.services.audio_preprocessor import get_audio_preprocessor
+from app.utils.vad import split_on_silence
+from app.utils.audio_sniff import sniff_audio
 
 settings = get_settings()
 
@@ -19,21 +35,27 @@ class STTService:
     
     def __init__(self):
         self.api_key = settings.google_cloud_api_key
-        self.base_url = "https://speech.googleapis.com/v1/speech:recognize"
+        self.base_url = settings.google_stt_url
     
     async def transcribe_audio(
         self, 
-        audio_data: bytes, 
+        audio_data, 
         encoding: str = "WEBM_OPUS",
-        sample_rate: int = 48000
+        sample_rate: int = 48000,
+        channels: Optional[int] = None
     ) -> str:
         """
         Transcribe audio to text
         
+        The request body is streamed: the base64 "content" is encoded chunk by
+        chunk as it is sent, so no encoded or JSON copy of the audio is built.
+        
         Args:
-            audio_data: Audio file as bytes
+            audio_data: Audio file as bytes / bytearray / memoryview
             encoding: Audio encoding format (WEBM_OPUS, MP3, LINEAR16, etc.)
             sample_rate: Sample rate in Hz (8000-48000)
+            channels: Channel count from the container header; Google rejects
+                      multi-channel LINEAR16/FLAC unless it is declared
             
         Returns:
             Transcribed text string
@@ -45,45 +67,121 @@ class STTService:
         if not self.api_key:
             raise ValueError("Google Cloud API key not configured. Set GOOGLE_CLOUD_API_KEY in .env")
         
-        # Convert audio to base64 for API
-        audio_base64 = base64.b64encode(audio_data).decode('utf-8')
-        
-        # Prepare API request payload
-        payload = {
-            "config": {
-                "encoding": encoding,
-                "sampleRateHertz": sample_rate,
-                "languageCode": "en-NG",  # Nigerian English (primary)
-                "alternativeLanguageCodes": ["en-GH", "en-US"],  # Ghanaian, US fallback
-                "enableAutomaticPunctuation": True,
-                "model": "default",
-                "useEnhanced": True  # Better quality
-            },
-            "audio": {
-                "content": audio_base64
-            }
+        # Prepare API request config
+        config = {
+            "encoding": encoding,
+            "sampleRateHertz": sample_rate,
+            "languageCode": "en-NG",  # Nigerian English (primary)
+            "alternativeLanguageCodes": ["en-GH", "en-US"],  # Ghanaian, US fallback
+            "enableAutomaticPunctuation": True,
+            "model": "default",
+            "useEnhanced": True  # Better quality
         }
+        if channels and channels > 1:
+            config["audioChannelCount"] = channels  # first channel is transcribed
+        prefix, suffix = self._body_envelope(config)
+        # Known length, so the body goes out with Content-Length, not chunked
+        content_length = len(prefix) + 4 * math.ceil(len(audio_data) / 3) + len(suffix)
         
         # Make API request
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                f"{self.base_url}?key={self.api_key}",
-                json=payload
-            )
-            
-            if response.status_code != 200:
-                # Try to parse error response for better error messages
-                error_message = self._parse_api_error(response)
-                raise Exception(error_message)
-            
-            result = response.json()
-            
-            # Extract transcript from response
-            if not result.get("results"):
-                return ""  # No speech detected
+        client = get_http_client(GOOGLE_STT)
+        response = await client.post(
+            f"{self.base_url}?key={self.api_key}",
+            content=self._stream_body(prefix, audio_data, suffix),
+            headers={
+                "Content-Type": "application/json",
+                "Content-Length": str(content_length)
+            }
+        )
+        
+        if response.status_code != 200:
+            # Try to parse error response for better error messages
+            error_message = self._parse_api_error(response)
+            raise Exception(error_message)
+        
+        result = response.json()
+        
+        # Extract transcript from response (one result per stretch of speech)
+        if not result.get("results"):
+            return ""  # No speech detected
+        
+        transcript = " ".join(
+            r["alternatives"][0]["transcript"].strip()
+            for r in result["results"] if r.get("alternatives")
+        )
+        return transcript.strip()
+    
+    async def transcribe_long(self, audio_data, audio_format: str) -> Dict:
+        """
+        Transcribe a recording too long for one synchronous request
+        
+        The audio is decoded, split at silences (energy VAD) into segments
+        under the sync limit, and the segments are transcribed concurrently
+        (at most STT_SEGMENT_CONCURRENCY at once) as mono LINEAR16.
+        
+        Args:
+            audio_data: Encoded audio bytes
+            audio_format: "wav", "webm", "ogg", "mp3" or "m4a"
             
-            transcript = result["results"][0]["alternatives"][0]["transcript"]
-            return transcript.strip()
+        Returns:
+            {"transcript": full text, "duration": seconds,
+             "segments": [{"start": s, "end": s, "transcript": ...}, ...]}
+             
+        Raises:
+            AudioRejected: If the audio can't be decoded
+        """
+        samples, sample_rate = await decode_audio(audio_data, audio_format)
+        return await self.transcribe_segments(to_mono(samples), sample_rate)
+    
+    async def transcribe_segments(self, mono, sample_rate: int) -> Dict:
+        """
+        Split mono int16 PCM at silences and transcribe the segments
+        concurrently (see transcribe_long for the result format)
+        """
+        spans = split_on_silence(
+            mono,
+            sample_rate,
+            frame_ms=settings.stt_vad_frame_ms,
+            silence_db=settings.stt_vad_silence_db,
+            min_silence_ms=settings.stt_vad_min_silence_ms,
+            max_segment_seconds=settings.stt_max_segment_seconds,
+            padding_ms=settings.stt_segment_padding_ms
+        )
+        limiter = asyncio.Semaphore(settings.stt_segment_concurrency)
+        
+        async def transcribe_segment(start: int, end: int) -> str:
+            async with limiter:
+                return await self.transcribe_audio(pcm_bytes(mono[start:end]), "LINEAR16", sample_rate)
+        
+        # gather keeps the results in segment order whatever order they finish in
+        transcripts = await asyncio.gather(*(transcribe_segment(start, end) for start, end in spans))
+        segments = [
+            {
+                "start": round(start / sample_rate, 3),
+                "end": round(end / sample_rate, 3),
+                "transcript": transcript
+            }
+            for (start, end), transcript in zip(spans, transcripts)
+        ]
+        return {
+            "transcript": " ".join(t for t in transcripts if t),
+            "duration": round(len(mono) / sample_rate, 3),
+            "segments": segments,
+            "bytes_sent": sum(end - start for start, end in spans) * 2
+        }
+    
+    @staticmethod
+    def _body_envelope(config: Dict):
+        """JSON before and after the base64 audio content"""
+        prefix = json.dumps({"config": config})[:-1] + ', "audio": {"content": "'
+        return prefix.encode("utf-8"), b'"}}'
+    
+    @staticmethod
+    async def _stream_body(prefix: bytes, audio_data, suffix: bytes) -> AsyncIterator[bytes]:
+        yield prefix
+        async for encoded in iter_base64(audio_data):
+            yield encoded
+        yield suffix
     
     def _parse_api_error(self, response: httpx.Response) -> str:
         """
@@ -155,40 +253,101 @@ class STTService:
         # Fallback to raw response text
         return f"Google STT API Error: {response.text}"
     
-    async def transcribe_audio_file(self, audio_file) -> str:
+    async def transcribe_audio_file(self, audio_file, long_audio: bool = False) -> str:
         """
         Transcribe uploaded audio file (FastAPI UploadFile)
         
         Args:
             audio_file: FastAPI UploadFile object
+            long_audio: Split at silences and transcribe segments in parallel
+                        (for recordings over ~1 minute, see transcribe_long)
             
         Returns:
             Transcribed text
+            
+        Raises:
+            AudioRejected: If the upload is too big / too small / unsupported / corrupt
+        """
+        result = await self.transcribe_upload(audio_file, long_audio)
+        return result["transcript"]
+    
+    async def transcribe_upload(self, audio_file, long_audio: bool = False) -> Dict:
         """
-        # Read audio data
-        audio_data = await audio_file.read()
-        
-        # Detect encoding from content type
-        content_type = audio_file.content_type or ""
-        
-        if "webm" in content_type:
-            encoding = "WEBM_OPUS"
-            sample_rate = 48000
-        elif "mp3" in content_type or "mpeg" in content_type:
-            encoding = "MP3"
-            sample_rate = 44100
-        elif "wav" in content_type:
-            encoding = "LINEAR16"
-            sample_rate = 16000
-        elif "ogg" in content_type:
-            encoding = "OGG_OPUS"
-            sample_rate = 48000
-        else:
-            # Default to WEBM (most common from browsers)
-            encoding = "WEBM_OPUS"
-            sample_rate = 48000
-        
-        return await self.transcribe_audio(audio_data, encoding, sample_rate)
+        transcribe_audio_file, plus the preprocessing report
+        
+        When AUDIO_PREPROCESS_ENABLED and the format can be decoded here, the
+        audio is converted to 16 kHz mono LINEAR16 with silence trimmed and
+        level normalized. Compressed uploads (e.g. browser WebM/Opus) are
+        re-encoded from that as 16 kHz mono Ogg/Opus, since LINEAR16 would be
+        bigger. Whichever is smallest of PCM, Opus and the original upload is
+        sent; all-silence uploads skip the STT call entirely.
+        
+        Returns:
+            {"transcript": ..., "audio": sniffed format/rate/channels,
+             "preprocess": report dict or None} (+ "segments" in long-audio mode)
+             
+        Raises:
+            AudioRejected: Too big / too small / unsupported / corrupt
+        """
+        # Read audio data, stopping as soon as it passes MAX_AUDIO_SIZE
+        audio_data = await read_audio_upload(
+            audio_file,
+            settings.max_audio_size,
+            settings.audio_read_chunk_size
+        )
+        
+        # Identify the audio from its bytes - unsupported/corrupt uploads
+        # are rejected here, before any network call
+        info = sniff_audio(audio_data)
+        
+        preprocessor = get_audio_preprocessor()
+        if settings.audio_preprocess_enabled and preprocessor.can_decode(info):
+            pcm, report = await preprocessor.process(audio_data, info.format)
+            if len(pcm) == 0:
+                preprocessor.record_upload(report, 0)
+                return {"transcript": "", "audio": info.to_dict(), "preprocess": report}
+            if long_audio:
+                result = await self.transcribe_segments(pcm, TARGET_SAMPLE_RATE)
+                preprocessor.record_upload(report, result["bytes_sent"])
+                return {**result, "audio": info.to_dict(), "preprocess": report}
+            body, encoding = pcm_bytes(pcm), "LINEAR16"
+            if report["linear16_bytes"] >= len(audio_data) or info.encoding is None:
+                # Compressed upload (browser WebM/Opus...): PCM would be bigger,
+                # so re-encode the trimmed audio compactly instead
+                opus = await encode_ogg_opus(pcm, settings.audio_opus_bitrate)
+                if opus is not None and len(opus) < len(body):
+                    body, encoding = opus, "OGG_OPUS"
+            report["encoding"] = encoding
+            if info.encoding is not None and len(body) >= len(audio_data):
+                # Nothing saved - the original goes up untouched
+                report["encoding"] = info.encoding
+                transcript = await self.transcribe_audio(
+                    audio_data, info.encoding, info.sample_rate, info.channels
+                )
+                preprocessor.record_upload(report, len(audio_data))
+                return {"transcript": transcript, "audio": info.to_dict(), "preprocess": report}
+            transcript = await self.transcribe_audio(body, encoding, TARGET_SAMPLE_RATE)
+            preprocessor.record_upload(report, len(body))
+            return {"transcript": transcript, "audio": info.to_dict(), "preprocess": report}
+        
+        if long_audio:
+            if not preprocessor.can_decode(info):
+                raise AudioRejected(
+                    f"We no fit open {info.codec} audio for long recordings here. Send WAV abeg.",
+                    status_code=415
+                )
+            result = await self.transcribe_long(audio_data, info.format)
+            return {**result, "audio": info.to_dict(), "preprocess": None}
+        
+        if info.encoding is None:
+            raise AudioRejected(
+                f"We no fit transcribe {info.codec} audio o! Send webm, ogg (opus), mp3 or wav.",
+                status_code=415
+            )
+        transcript = await self.transcribe_audio(
+            audio_data, info.encoding, info.sample_rate, info.channels
+        )
+        return {"transcript": transcript, "audio": info.to_dict(), "preprocess": None}
 
 
 # ============================================================================
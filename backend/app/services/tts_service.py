@@ -3,8 +3,8 @@ Text-to-Speech Service
 Handles voice synthesis using ElevenLabs API
 Converts Pidgin text to natural Nigerian/Ghanaian voice
 """
-import httpx
 from app.config import get_settings
+from app.services.http_clients import get_http_client, ELEVENLABS
 
 settings = get_settings()
 
@@ -71,14 +71,14 @@ class TTSService:
         }
         
         # Make API request
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(url, headers=headers, json=payload)
-            
-            if response.status_code != 200:
-                raise Exception(f"ElevenLabs TTS API Error: {response.text}")
-            
-            # Return MP3 audio data
-            return response.content
+        client = get_http_client(ELEVENLABS)
+        response = await client.post(url, headers=headers, json=payload)
+        
+        if response.status_code != 200:
+            raise Exception(f"ElevenLabs TTS API Error: {response.text}")
+        
+        # Return MP3 audio data
+        return response.content
     
     async def get_available_voices(self) -> list:
         """
@@ -101,14 +101,14 @@ class TTSService:
             "xi-api-key": self.api_key
         }
         
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(url, headers=headers)
-            
-            if response.status_code != 200:
-                raise Exception(f"Failed to fetch voices: {response.text}")
-            
-            data = response.json()
-            return data.get("voices", [])
+        client = get_http_client(ELEVENLABS)
+        response = await client.get(url, headers=headers, timeout=10.0)
+        
+        if response.status_code != 200:
+            raise Exception(f"Failed to fetch voices: {response.text}")
+        
+        data = response.json()
+        return data.get("voices", [])
     
     async def get_voice_settings(self, voice_id: str = None) -> dict:
         """
@@ -129,13 +129,13 @@ class TTSService:
             "xi-api-key": self.api_key
         }
         
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(url, headers=headers)
-            
-            if response.status_code != 200:
-                raise Exception(f"Failed to fetch voice settings: {response.text}")
-            
-            return response.json()
+        client = get_http_client(ELEVENLABS)
+        response = await client.get(url, headers=headers, timeout=10.0)
+        
+        if response.status_code != 200:
+            raise Exception(f"Failed to fetch voice settings: {response.text}")
+        
+        return response.json()
 
 
 # ============================================================================
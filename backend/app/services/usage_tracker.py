@@ -0,0 +1,242 @@
+"""
+Usage Tracker
+In-process message/token counters from the LLM `usage` field, flushed to
+the Analytics table in batched upserts (never on the request path)
+"""
+import asyncio
+import json
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from app.config import get_settings
+from app.database import ensure_db_connection
+
+settings = get_settings()
+
+# Multi-row upsert; users deleted since the call are skipped
+UPSERT_ANALYTICS_SQL = """
+    INSERT INTO "Analytics" ("id", "userId", "totalMessages", "tokensUsed", "lastActive")
+    SELECT t."id", t."userId", t."messages", t."tokens", t."lastActive"
+    FROM unnest($1::text[], $2::text[], $3::int[], $4::int[], $5::timestamp(3)[])
+        AS t("id", "userId", "messages", "tokens", "lastActive")
+    WHERE EXISTS (SELECT 1 FROM "User" u WHERE u."id" = t."userId")
+    ON CONFLICT ("userId") DO UPDATE SET
+        "totalMessages" = "Analytics"."totalMessages" + EXCLUDED."totalMessages",
+        "tokensUsed" = "Analytics"."tokensUsed" + EXCLUDED."tokensUsed",
+        "lastActive" = GREATEST("Analytics"."lastActive", EXCLUDED."lastActive")
+"""
+
+
+def to_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Aware UTC datetime; naive values (Prisma DateTime columns) are UTC"""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+class UsageMeter:
+    """Tokens used by the upstream calls made for one request"""
+
+    def __init__(self):
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def add(self, usage: Dict):
+        self.prompt_tokens += int(usage.get("prompt_tokens") or 0)
+        self.completion_tokens += int(usage.get("completion_tokens") or 0)
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+_current_meter: ContextVar[Optional[UsageMeter]] = ContextVar("zeempo_usage_meter", default=None)
+
+
+@contextmanager
+def track_usage():
+    """
+    Collect usage reported by providers while the block runs
+    Coalesced followers and cache hits report nothing - they cost no tokens
+    """
+    meter = UsageMeter()
+    token = _current_meter.set(meter)
+    try:
+        yield meter
+    finally:
+        _current_meter.reset(token)
+
+
+def begin_usage() -> UsageMeter:
+    """
+    track_usage for async generators (SSE responses): sets the meter with no
+    reset, because a generator left suspended on disconnect may be finalized
+    in another task, where resetting the ContextVar token raises ValueError.
+    The meter stays current for the rest of the request's task.
+    """
+    meter = UsageMeter()
+    _current_meter.set(meter)
+    return meter
+
+
+def report_usage(usage: Optional[Dict]):
+    """Called by providers with a response's `usage` object"""
+    meter = _current_meter.get()
+    if meter is not None and usage:
+        meter.add(usage)
+
+
+def chunk_usage(chunk: Dict) -> Optional[Dict]:
+    """
+    `usage` from a streaming chunk: Groq sends it as x_groq.usage on the
+    last chunk, OpenAI-style servers as top-level usage
+    """
+    return chunk.get("usage") or (chunk.get("x_groq") or {}).get("usage")
+
+
+def raw_chunk_usage(data: bytes) -> Optional[Dict]:
+    """chunk_usage for passthrough bytes - only parses chunks that carry usage"""
+    if b'"usage"' not in data:
+        return None
+    try:
+        return chunk_usage(json.loads(data))
+    except ValueError:
+        return None
+
+
+class UsageTracker:
+    """
+    Aggregates per-user usage in memory and flushes it periodically
+    """
+
+    def __init__(self, flush_interval: float = 30.0, batch_size: int = 500):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._pending: Dict[str, Dict] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+        self.totals: Dict[str, Dict[str, int]] = {}
+        self.rows_flushed = 0
+        self.flush_errors = 0
+
+    def record(self, user_id: Optional[str], source: str, meter: UsageMeter, messages: int = 1):
+        """
+        Count one call (no I/O)
+
+        Args:
+            user_id: Owner of the usage, None for unauthenticated callers
+                     (counted in the process totals only)
+            source: e.g. "text_to_pidgin", "voice_agent"
+        """
+        totals = self.totals.setdefault(source, {
+            "messages": 0, "prompt_tokens": 0, "completion_tokens": 0
+        })
+        totals["messages"] += messages
+        totals["prompt_tokens"] += meter.prompt_tokens
+        totals["completion_tokens"] += meter.completion_tokens
+
+        if user_id:
+            pending = self._pending.setdefault(user_id, {"messages": 0, "tokens": 0, "last_active": None})
+            pending["messages"] += messages
+            pending["tokens"] += meter.total_tokens
+            pending["last_active"] = datetime.now(timezone.utc)
+
+    def pending_for(self, user_id: str) -> Dict:
+        """Usage counted for a user but not flushed yet"""
+        return self._pending.get(user_id) or {"messages": 0, "tokens": 0, "last_active": None}
+
+    async def flush(self):
+        """Write everything counted so far as batched upserts"""
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            # Connect first: if the database is down, nothing has been taken yet
+            db = await ensure_db_connection()
+            pending, self._pending = self._pending, {}
+            items = list(pending.items())
+            for start in range(0, len(items), self.batch_size):
+                batch = items[start:start + self.batch_size]
+                try:
+                    await db.execute_raw(
+                        UPSERT_ANALYTICS_SQL,
+                        ["c" + uuid.uuid4().hex[:24] for _ in batch],
+                        [user_id for user_id, _ in batch],
+                        [entry["messages"] for _, entry in batch],
+                        [entry["tokens"] for _, entry in batch],
+                        # Naive UTC, like every other timestamp(3) column Prisma writes
+                        [to_utc(entry["last_active"]).replace(tzinfo=None).isoformat() for _, entry in batch]
+                    )
+                    self.rows_flushed += len(batch)
+                except Exception:
+                    self.flush_errors += 1
+                    # Put the rest back (merged with anything counted since)
+                    for user_id, entry in items[start:]:
+                        self._merge(user_id, entry)
+                    raise
+
+    def _merge(self, user_id: str, entry: Dict):
+        pending = self._pending.get(user_id)
+        if pending is None:
+            self._pending[user_id] = entry
+            return
+        pending["messages"] += entry["messages"]
+        pending["tokens"] += entry["tokens"]
+        pending["last_active"] = max(pending["last_active"], entry["last_active"])
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Usage Flush Error: {str(e)}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flusher and write what's left"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            print(f"Usage Flush Error: {str(e)}")
+
+    def stats(self) -> Dict:
+        return {
+            "by_source": self.totals,
+            "pending_users": len(self._pending),
+            "rows_flushed": self.rows_flushed,
+            "flush_errors": self.flush_errors
+        }
+
+
+# ============================================================================
+# SINGLETON INSTANCE
+# ============================================================================
+
+_usage_tracker = None
+
+def get_usage_tracker() -> UsageTracker:
+    """
+    Get usage tracker singleton instance
+    Creates instance on first call, reuses afterwards
+    """
+    global _usage_tracker
+    if _usage_tracker is None:
+        _usage_tracker = UsageTracker(
+            flush_interval=settings.usage_flush_interval,
+            batch_size=settings.usage_flush_batch_size
+        )
+    return _usage_tracker
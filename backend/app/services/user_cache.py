@@ -0,0 +1,145 @@
+"""
+Authenticated User Cache
+Keeps recently seen users and decoded JWT payloads in memory so hot
+authenticated requests skip both the JWT decode and the user lookup
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from app.config import get_settings
+
+settings = get_settings()
+
+
+class UserCache:
+    """
+    Per-process TTL + LRU cache of user records keyed by user id
+
+    Anything that changes a user (Stripe webhooks, profile edits) must call
+    invalidate(); the TTL bounds staleness for changes made by other workers.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, user_id: str) -> Optional[Any]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        user, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[user_id]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return user
+
+    def set(self, user_id: str, user: Any):
+        self._entries[user_id] = (user, time.monotonic() + self.ttl)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: Optional[str]):
+        """Drop one user (no-op for unknown ids / None)"""
+        if user_id and self._entries.pop(user_id, None) is not None:
+            self.invalidations += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+class TokenCache:
+    """
+    Memoizes decoded JWT payloads until the token's own "exp"
+    Only successfully verified tokens are stored
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[dict]:
+        payload = self._entries.get(token)
+        if payload is None:
+            self.misses += 1
+            return None
+        if payload.get("exp", 0) <= time.time():
+            del self._entries[token]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(token)
+        self.hits += 1
+        return payload
+
+    def set(self, token: str, payload: dict):
+        if "exp" not in payload:
+            # Never cache a token that doesn't expire
+            return
+        self._entries[token] = payload
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+# ============================================================================
+# SINGLETON INSTANCES
+# ============================================================================
+
+_user_cache = None
+_token_cache = None
+
+def get_user_cache() -> UserCache:
+    """
+    Get user cache singleton instance
+    Creates instance on first call, reuses afterwards
+    """
+    global _user_cache
+    if _user_cache is None:
+        _user_cache = UserCache(
+            max_entries=settings.user_cache_max_entries,
+            ttl=settings.user_cache_ttl
+        )
+    return _user_cache
+
+
+def get_token_cache() -> TokenCache:
+    """
+    Get token cache singleton instance
+    Creates instance on first call, reuses afterwards
+    """
+    global _token_cache
+    if _token_cache is None:
+        _token_cache = TokenCache(max_entries=settings.token_cache_max_entries)
+    return _token_cache
+
+
+def invalidate_user(user_id: Optional[str]):
+    """Drop a changed user from the cache (call after every user update)"""
+    get_user_cache().invalidate(user_id)
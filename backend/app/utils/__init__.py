@@ -1,11 +1,35 @@
 """
 Utilities Package
-Helper functions for audio processing and validation
+Helper functions for audio processing, validation, VAD, SSE and pagination
 """
-from .audio_utils import validate_audio_file, get_audio_format, audio_bytes_to_io
+from .audio_utils import (
+    AudioRejected,
+    validate_audio_file,
+    read_audio_upload,
+    iter_base64,
+    decode_audio,
+    get_audio_format,
+    audio_bytes_to_io
+)
+from .sse import SSEByteParser, sse_data, chat_completion_chunk
+from .pagination import encode_cursor, decode_cursor
+from .vad import split_on_silence
+from .audio_sniff import AudioInfo, sniff_audio
 
 __all__ = [
+    'AudioRejected',
     'validate_audio_file',
+    'read_audio_upload',
+    'iter_base64',
+    'decode_audio',
     'get_audio_format',
-    'audio_bytes_to_io'
+    'audio_bytes_to_io',
+    'SSEByteParser',
+    'sse_data',
+    'chat_completion_chunk',
+    'encode_cursor',
+    'decode_cursor',
+    'split_on_silence',
+    'AudioInfo',
+    'sniff_audio'
 ]
\ No newline at end of file
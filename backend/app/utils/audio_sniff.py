@@ -0,0 +1,278 @@
+"""
+Audio Format Sniffing
+Identifies WebM/Ogg/MP3/WAV/M4A uploads from their magic bytes and reads
+the real sample rate / channel count from the container headers, so bad
+uploads are rejected before any upstream call
+"""
+import struct
+from typing import Optional, Tuple
+from app.utils.audio_utils import AudioRejected
+
+# Sample rates Google accepts for Opus (must match the stream)
+OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+
+MP3_SAMPLE_RATES = {
+    3: (44100, 48000, 32000),  # MPEG 1
+    2: (22050, 24000, 16000),  # MPEG 2
+    0: (11025, 12000, 8000)    # MPEG 2.5
+}
+
+# EBML element ids (Matroska / WebM)
+EBML_HEADER = 0x1A45DFA3
+EBML_DOCTYPE = 0x4282
+SEGMENT = 0x18538067
+TRACKS = 0x1654AE6B
+TRACK_ENTRY = 0xAE
+TRACK_TYPE = 0x83
+CODEC_ID = 0x86
+AUDIO = 0xE1
+SAMPLING_FREQUENCY = 0xB5
+CHANNELS = 0x9F
+CLUSTER = 0x1F43B675
+EBML_MASTERS = (SEGMENT, TRACKS, TRACK_ENTRY, AUDIO)
+
+HEADER_BYTES = 64 * 1024  # all parsing happens within the first 64KB
+
+
+class AudioInfo:
+    """
+    What the bytes say the upload is
+
+    encoding is the Google STT encoding to send it as, or None when the
+    codec can't be sent as-is (M4A/AAC, Vorbis) and has to be decoded first
+    """
+
+    def __init__(
+        self,
+        audio_format: str,
+        codec: str,
+        encoding: Optional[str],
+        sample_rate: Optional[int] = None,
+        channels: Optional[int] = None
+    ):
+        self.format = audio_format
+        self.codec = codec
+        self.encoding = encoding
+        self.sample_rate = sample_rate
+        self.channels = channels
+
+    def to_dict(self):
+        return {
+            "format": self.format,
+            "codec": self.codec,
+            "encoding": self.encoding,
+            "sample_rate": self.sample_rate,
+            "channels": self.channels
+        }
+
+
+def _corrupt(audio_format: str, reason: str) -> AudioRejected:
+    return AudioRejected(f"Dis {audio_format} file don spoil o! ({reason})", status_code=415)
+
+
+# ============================================================================
+# WAV
+# ============================================================================
+
+def _sniff_wav(data: bytes) -> AudioInfo:
+    offset = 12
+    info = None
+    while offset + 8 <= len(data):
+        chunk_id, size = struct.unpack_from("<4sI", data, offset)
+        body = offset + 8
+        if chunk_id == b"fmt ":
+            if size < 16 or body + 16 > len(data):
+                raise _corrupt("WAV", "short fmt chunk")
+            format_tag, channels, sample_rate, _, _, bits = struct.unpack_from("<HHIIHH", data, body)
+            if format_tag == 0xFFFE and size >= 40 and body + 26 <= len(data):
+                # WAVE_FORMAT_EXTENSIBLE: the real tag starts the SubFormat GUID
+                format_tag = struct.unpack_from("<H", data, body + 24)[0]
+            if channels == 0 or sample_rate == 0:
+                raise _corrupt("WAV", "zero channels or sample rate")
+            if format_tag == 1 and bits == 16:
+                info = AudioInfo("wav", "pcm_s16le", "LINEAR16", sample_rate, channels)
+            elif format_tag == 7 and bits == 8:
+                info = AudioInfo("wav", "mulaw", "MULAW", sample_rate, channels)
+            else:
+                info = AudioInfo("wav", f"wav_{format_tag}_{bits}bit", None, sample_rate, channels)
+        elif chunk_id == b"data":
+            if info is None:
+                raise _corrupt("WAV", "data before fmt")
+            return info
+        offset = body + size + (size & 1)
+    raise _corrupt("WAV", "no fmt/data chunk")
+
+
+# ============================================================================
+# OGG
+# ============================================================================
+
+def _sniff_ogg(data: bytes) -> AudioInfo:
+    # First page carries exactly the codec's identification header
+    if len(data) < 28:
+        raise _corrupt("Ogg", "truncated page")
+    segments = data[26]
+    packet_start = 27 + segments
+    packet_size = sum(data[27:packet_start])
+    packet = data[packet_start:packet_start + packet_size]
+    if len(packet) < packet_size or packet_size == 0:
+        raise _corrupt("Ogg", "truncated first packet")
+
+    if packet.startswith(b"OpusHead") and len(packet) >= 19:
+        channels = packet[9]
+        input_rate = struct.unpack_from("<I", packet, 12)[0]
+        # Opus always decodes at 48 kHz; the header records the source rate
+        sample_rate = input_rate if input_rate in OPUS_SAMPLE_RATES else 48000
+        return AudioInfo("ogg", "opus", "OGG_OPUS", sample_rate, channels)
+    if packet.startswith(b"\x01vorbis") and len(packet) >= 16:
+        channels = packet[11]
+        sample_rate = struct.unpack_from("<I", packet, 12)[0]
+        return AudioInfo("ogg", "vorbis", None, sample_rate, channels)
+    raise AudioRejected("Dis Ogg audio codec we no support o!", status_code=415)
+
+
+# ============================================================================
+# WEBM (EBML)
+# ============================================================================
+
+def _read_vint(data: bytes, offset: int, keep_marker: bool) -> Tuple[int, int]:
+    """EBML variable-length integer -> (value, length); value -1 = unknown size"""
+    if offset >= len(data):
+        raise IndexError
+    first = data[offset]
+    length = 1
+    while length <= 8 and not first & (0x80 >> (length - 1)):
+        length += 1
+    if length > 8 or offset + length > len(data):
+        raise IndexError
+    value = first if keep_marker else first & (0xFF >> length)
+    for byte in data[offset + 1:offset + length]:
+        value = (value << 8) | byte
+    if not keep_marker and value == (1 << (7 * length)) - 1:
+        value = -1  # all ones: size unknown (live recordings, e.g. MediaRecorder)
+    return value, length
+
+
+def _ebml_elements(data: bytes, start: int, end: int):
+    """Yield (id, body_start, body_end) for the elements between start and end"""
+    offset = start
+    while offset < end:
+        element_id, id_length = _read_vint(data, offset, keep_marker=True)
+        size, size_length = _read_vint(data, offset + id_length, keep_marker=False)
+        body = offset + id_length + size_length
+        body_end = end if size < 0 else min(body + size, end)
+        yield element_id, body, body_end
+        if size < 0:
+            return
+        offset = body + size
+
+
+def _find_audio_track(data: bytes, start: int, end: int, track: dict) -> Optional[dict]:
+    for element_id, body, body_end in _ebml_elements(data, start, end):
+        if element_id == CLUSTER:
+            return None  # media data starts - no more headers
+        if element_id in EBML_MASTERS:
+            if element_id == TRACK_ENTRY:
+                track = {}
+            found = _find_audio_track(data, body, body_end, track)
+            if found is not None:
+                return found
+            if element_id == TRACK_ENTRY and track.get("type") == 2:
+                return track
+        elif element_id == TRACK_TYPE:
+            track["type"] = int.from_bytes(data[body:body_end], "big")
+        elif element_id == CODEC_ID:
+            track["codec"] = data[body:body_end].rstrip(b"\0").decode("ascii", "replace")
+        elif element_id == SAMPLING_FREQUENCY:
+            raw = data[body:body_end]
+            track["sample_rate"] = int(struct.unpack(">f" if len(raw) == 4 else ">d", raw)[0])
+        elif element_id == CHANNELS:
+            track["channels"] = int.from_bytes(data[body:body_end], "big")
+    return None
+
+
+def _sniff_webm(data: bytes) -> AudioInfo:
+    try:
+        elements = _ebml_elements(data, 0, len(data))
+        element_id, body, body_end = next(elements)
+        doc_type = None
+        for child_id, child_body, child_end in _ebml_elements(data, body, body_end):
+            if child_id == EBML_DOCTYPE:
+                doc_type = data[child_body:child_end].decode("ascii", "replace")
+        if doc_type not in ("webm", "matroska"):
+            raise _corrupt("WebM", f"doctype {doc_type}")
+        track = None
+        for element_id, body, body_end in elements:
+            if element_id == SEGMENT:
+                track = _find_audio_track(data, body, body_end, {})
+                break
+    except (IndexError, StopIteration, struct.error):
+        raise _corrupt("WebM", "truncated header")
+    if track is None:
+        raise _corrupt("WebM", "no audio track")
+
+    codec = track.get("codec", "")
+    sample_rate = track.get("sample_rate") or 48000
+    if codec == "A_OPUS":
+        if sample_rate not in OPUS_SAMPLE_RATES:
+            sample_rate = 48000
+        return AudioInfo("webm", "opus", "WEBM_OPUS", sample_rate, track.get("channels", 1))
+    return AudioInfo("webm", codec.lower(), None, sample_rate, track.get("channels", 1))
+
+
+# ============================================================================
+# MP3 / M4A
+# ============================================================================
+
+def _sniff_mp3(data) -> AudioInfo:
+    """data is the whole upload: an ID3 tag (cover art) can outgrow HEADER_BYTES"""
+    start = 0
+    if bytes(data[:3]) == b"ID3":
+        if len(data) < 10:
+            raise _corrupt("MP3", "truncated ID3 tag")
+        # Synchsafe size: 7 bits per byte
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        start = 10 + size
+    # First frame header (allow a little junk/padding before it)
+    window = bytes(data[start:start + 4096 + 3])
+    for offset in range(len(window) - 3):
+        if window[offset] == 0xFF and window[offset + 1] & 0xE0 == 0xE0:
+            version = (window[offset + 1] >> 3) & 0x3
+            layer = (window[offset + 1] >> 1) & 0x3
+            rate_index = (window[offset + 2] >> 2) & 0x3
+            bitrate_index = window[offset + 2] >> 4
+            if version != 1 and layer == 1 and rate_index != 3 and bitrate_index not in (0, 15):
+                channels = 1 if window[offset + 3] >> 6 == 3 else 2
+                return AudioInfo("mp3", "mp3", "MP3", MP3_SAMPLE_RATES[version][rate_index], channels)
+    raise _corrupt("MP3", "no MPEG layer III frame")
+
+
+def sniff_audio(data) -> AudioInfo:
+    """
+    Identify an upload from its bytes (the client's MIME type is ignored)
+
+    Args:
+        data: The audio bytes (only the first 64KB are looked at, plus the
+              first frame after a larger MP3 ID3 tag)
+
+    Returns:
+        AudioInfo with format, codec, STT encoding, sample rate, channels
+
+    Raises:
+        AudioRejected: 415 if the format is unsupported or the header is corrupt
+    """
+    head = bytes(data[:HEADER_BYTES])
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return _sniff_wav(head)
+    if head[:4] == b"OggS":
+        return _sniff_ogg(head)
+    if head[:4] == b"\x1a\x45\xdf\xa3":
+        return _sniff_webm(head)
+    if head[4:8] == b"ftyp":
+        return AudioInfo("m4a", "aac", None)
+    if head[:3] == b"ID3" or (len(head) > 1 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0):
+        return _sniff_mp3(data)
+    raise AudioRejected(
+        "Audio format no correct o! We support: webm, wav, mp3, ogg, m4a.",
+        status_code=415
+    )
@@ -2,31 +2,56 @@
 Audio Utility Functions
 Helper functions for audio file validation and processing
 """
+import asyncio
+import base64
 import io
-from typing import Tuple
+import shutil
+import time
+import wave
+from typing import AsyncIterator, Dict, Optional, Tuple
+import numpy as np
+from app.utils.vad import frame_levels
 
+# Bytes per base64 step - a multiple of 3 so chunks encode without padding
+BASE64_CHUNK_SIZE = 3 * 16384
 
-def validate_audio_file(content_type: str, file_size: int, max_size: int = 10_000_000) -> Tuple[bool, str]:
+# What preprocess_pcm produces: 16 kHz mono LINEAR16
+TARGET_SAMPLE_RATE = 16000
+
+
+class AudioRejected(ValueError):
+    """
+    Audio refused before any upstream call
+    The message is user-facing; routes turn this into an HTTPException
+    """
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def validate_audio_file(content_type: str, file_size: Optional[int], max_size: int = 10_000_000) -> Tuple[bool, str]:
     """
     Validate uploaded audio file
     
     Args:
         content_type: MIME type of the file
-        file_size: Size of file in bytes
+        file_size: Size of file in bytes, or None to skip the size checks
+                   (read_audio_upload enforces them while reading)
         max_size: Maximum allowed size in bytes (default 10MB)
         
     Returns:
         Tuple of (is_valid: bool, error_message: str)
         If valid, error_message is empty string
     """
-    # Check file size
-    if file_size > max_size:
-        max_mb = max_size / 1_000_000
-        return False, f"File too big o! Maximum size na {max_mb}MB. Reduce am small."
-    
-    # Check if file size is reasonable (at least 1KB)
-    if file_size < 1000:
-        return False, "File too small o! Make sure say you don record something."
+    if file_size is not None:
+        # Check file size
+        if file_size > max_size:
+            return False, file_too_big_message(max_size)
+        
+        # Check if file size is reasonable (at least 1KB)
+        if file_size < 1000:
+            return False, FILE_TOO_SMALL_MESSAGE
     
     # Extract base content type (remove codec info if present)
     # e.g., "audio/webm;codecs=opus" -> "audio/webm"
@@ -50,6 +75,261 @@ def validate_audio_file(content_type: str, file_size: int, max_size: int = 10_00
     return True, ""
 
 
+FILE_TOO_SMALL_MESSAGE = "File too small o! Make sure say you don record something."
+
+
+def file_too_big_message(max_size: int) -> str:
+    max_mb = max_size / 1_000_000
+    return f"File too big o! Maximum size na {max_mb}MB. Reduce am small."
+
+
+async def read_audio_upload(audio_file, max_size: int, chunk_size: int = 65536) -> bytearray:
+    """
+    Read an UploadFile in chunks, enforcing max_size as bytes arrive
+    
+    The declared size is not trusted: reading stops as soon as the limit is
+    passed, and the data is collected into a single buffer (one copy).
+    
+    Args:
+        audio_file: FastAPI UploadFile object
+        max_size: Maximum allowed size in bytes
+        chunk_size: Bytes per read
+        
+    Returns:
+        The audio bytes
+        
+    Raises:
+        AudioRejected: 413 if too big, 400 if too small
+    """
+    data = bytearray()
+    while True:
+        chunk = await audio_file.read(chunk_size)
+        if not chunk:
+            break
+        if len(data) + len(chunk) > max_size:
+            raise AudioRejected(file_too_big_message(max_size), status_code=413)
+        data += chunk
+    if len(data) < 1000:
+        raise AudioRejected(FILE_TOO_SMALL_MESSAGE)
+    return data
+
+
+async def iter_base64(audio_data, chunk_size: int = BASE64_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """
+    Base64-encode audio piece by piece (for streamed JSON request bodies)
+    Slices a memoryview, so only one encoded chunk exists at a time
+    
+    Args:
+        audio_data: bytes / bytearray / memoryview
+        chunk_size: Raw bytes per encoded piece (a multiple of 3)
+    """
+    view = memoryview(audio_data)
+    for start in range(0, len(view), chunk_size):
+        yield base64.b64encode(view[start:start + chunk_size])
+
+
+def pcm_bytes(samples: np.ndarray) -> memoryview:
+    """Raw LINEAR16 bytes of an int16 array, without copying"""
+    return memoryview(np.ascontiguousarray(samples)).cast("B")
+
+
+def to_mono(samples: np.ndarray) -> np.ndarray:
+    """Average (frames, channels) int16 down to one channel"""
+    if samples.shape[1] == 1:
+        return samples[:, 0]
+    return samples.mean(axis=1).astype(np.int16)
+
+
+def decode_wav(audio_data) -> Tuple[np.ndarray, int]:
+    """
+    Decode 16-bit PCM WAV
+    
+    Returns:
+        (int16 samples shaped (frames, channels), sample_rate)
+        
+    Raises:
+        AudioRejected: If it isn't a 16-bit PCM WAV
+    """
+    try:
+        with wave.open(io.BytesIO(audio_data)) as wav:
+            if wav.getsampwidth() != 2:
+                raise AudioRejected("Only 16-bit WAV we fit hear o!", status_code=415)
+            channels = wav.getnchannels()
+            sample_rate = wav.getframerate()
+            # Streamed WAVs (e.g. from ffmpeg) carry a bogus length - read to the end
+            frames = wav.readframes(wav.getnframes())
+    except (wave.Error, EOFError) as e:
+        raise AudioRejected(f"Dis WAV file don spoil o: {str(e)}", status_code=415)
+    samples = np.frombuffer(frames[:len(frames) - len(frames) % (2 * channels)], dtype="<i2")
+    return samples.reshape(-1, channels), sample_rate
+
+
+def ffmpeg_available() -> bool:
+    """Compressed formats (WebM/Ogg/MP3/M4A) are decoded by the ffmpeg binary"""
+    return shutil.which("ffmpeg") is not None
+
+
+async def decode_audio(audio_data, audio_format: str) -> Tuple[np.ndarray, int]:
+    """
+    Decode an upload to int16 PCM
+    
+    Args:
+        audio_data: Encoded audio bytes
+        audio_format: "wav", "webm", "ogg", "mp3" or "m4a"
+        
+    Returns:
+        (int16 samples shaped (frames, channels), sample_rate)
+        
+    Raises:
+        AudioRejected: If the audio can't be decoded here
+    """
+    if audio_format == "wav":
+        return decode_wav(audio_data)
+    if not ffmpeg_available():
+        raise AudioRejected(
+            f"We no fit open {audio_format} audio for long recordings here. Send WAV abeg.",
+            status_code=415
+        )
+    process = await asyncio.create_subprocess_exec(
+        "ffmpeg", "-hide_banner", "-loglevel", "error",
+        "-i", "pipe:0", "-f", "wav", "-acodec", "pcm_s16le", "pipe:1",
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    output, errors = await process.communicate(bytes(audio_data))
+    if process.returncode != 0:
+        raise AudioRejected(
+            f"Dis audio don spoil o: {errors.decode(errors='replace').strip()}",
+            status_code=415
+        )
+    return decode_wav(output)
+
+
+async def encode_ogg_opus(samples: np.ndarray, bitrate: int = 24000) -> Optional[bytes]:
+    """
+    Encode 16 kHz mono int16 PCM as Ogg/Opus (speech-tuned) for upload to STT
+    Much smaller than LINEAR16 - used when the upload itself was compressed
+    
+    Returns:
+        Ogg/Opus bytes, or None if ffmpeg is missing or can't encode it
+    """
+    if not ffmpeg_available():
+        return None
+    process = await asyncio.create_subprocess_exec(
+        "ffmpeg", "-hide_banner", "-loglevel", "error",
+        "-f", "s16le", "-ar", str(TARGET_SAMPLE_RATE), "-ac", "1", "-i", "pipe:0",
+        "-c:a", "libopus", "-b:a", str(bitrate), "-application", "voip",
+        "-f", "ogg", "pipe:1",
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    output, errors = await process.communicate(bytes(pcm_bytes(samples)))
+    if process.returncode != 0:
+        print(f"Opus Encode Error: {errors.decode(errors='replace').strip()}")
+        return None
+    return output
+
+
+# ============================================================================
+# PREPROCESSING (CPU-bound - run in a process pool, see audio_preprocessor)
+# ============================================================================
+
+def lowpass_kernel(cutoff: float, taps: int = 63) -> np.ndarray:
+    """
+    Windowed-sinc FIR low-pass filter
+    cutoff is a fraction of the sample rate (0 < cutoff < 0.5)
+    """
+    n = np.arange(taps) - (taps - 1) / 2
+    kernel = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(taps)
+    return kernel / kernel.sum()
+
+
+def resample(samples: np.ndarray, sample_rate: int, target_rate: int = TARGET_SAMPLE_RATE) -> np.ndarray:
+    """
+    Resample float mono audio
+    Low-passes below the new Nyquist before downsampling (no aliasing);
+    integer ratios decimate, others interpolate linearly
+    """
+    if sample_rate == target_rate or len(samples) == 0:
+        return samples
+    n_out = int(round(len(samples) * target_rate / sample_rate))
+    if sample_rate > target_rate:
+        samples = np.convolve(samples, lowpass_kernel(0.45 * target_rate / sample_rate), mode="same")
+        if sample_rate % target_rate == 0:
+            return samples[::sample_rate // target_rate][:n_out]
+    positions = np.arange(n_out) * (sample_rate / target_rate)
+    return np.interp(positions, np.arange(len(samples)), samples)
+
+
+def trim_silence(
+    samples: np.ndarray,
+    sample_rate: int,
+    silence_db: float = -40.0,
+    padding_ms: int = 200,
+    frame_ms: int = 30
+) -> np.ndarray:
+    """Drop leading/trailing frames quieter than silence_db (keeps padding_ms)"""
+    frame_size = max(1, int(sample_rate * frame_ms / 1000))
+    voiced = np.flatnonzero(frame_levels(samples, frame_size) > silence_db)
+    if len(voiced) == 0:
+        return samples[:0]
+    pad = int(padding_ms / frame_ms)
+    start = max(0, (voiced[0] - pad) * frame_size)
+    end = min(len(samples), (voiced[-1] + 1 + pad) * frame_size)
+    return samples[start:end]
+
+
+def normalize(samples: np.ndarray, target_peak_db: float = -1.0, max_gain_db: float = 20.0) -> Tuple[np.ndarray, float]:
+    """
+    Scale float audio (int16 range) so its peak sits at target_peak_db
+    Gain is capped so near-silent recordings don't become loud noise
+    
+    Returns:
+        (scaled samples, gain applied in dB)
+    """
+    peak = float(np.max(np.abs(samples))) if len(samples) else 0.0
+    if peak == 0.0:
+        return samples, 0.0
+    gain = min(32767 * 10 ** (target_peak_db / 20) / peak, 10 ** (max_gain_db / 20))
+    return samples * gain, 20 * np.log10(gain)
+
+
+def preprocess_pcm(
+    samples: np.ndarray,
+    sample_rate: int,
+    silence_db: float = -40.0,
+    padding_ms: int = 200,
+    target_peak_db: float = -1.0,
+    max_gain_db: float = 20.0
+) -> Tuple[np.ndarray, Dict]:
+    """
+    Downmix, resample to 16 kHz, trim silence and normalize level
+    
+    Args:
+        samples: int16 samples shaped (frames, channels)
+        sample_rate: Input sample rate
+        
+    Returns:
+        (16 kHz mono int16 samples - empty if it was all silence, report dict)
+    """
+    started = time.process_time()
+    mono = samples.astype(np.float32).mean(axis=1)
+    resampled = resample(mono, sample_rate)
+    trimmed = trim_silence(resampled, TARGET_SAMPLE_RATE, silence_db, padding_ms)
+    leveled, gain_db = normalize(trimmed, target_peak_db, max_gain_db)
+    output = np.clip(np.round(leveled), -32768, 32767).astype(np.int16)
+    return output, {
+        "input_sample_rate": sample_rate,
+        "input_channels": samples.shape[1],
+        "input_seconds": round(len(samples) / sample_rate, 3),
+        "output_seconds": round(len(output) / TARGET_SAMPLE_RATE, 3),
+        "gain_db": round(float(gain_db), 2),
+        "cpu_ms": round((time.process_time() - started) * 1000, 2)
+    }
+
+
 def get_audio_format(content_type: str) -> str:
     """
     Get audio format string from content type
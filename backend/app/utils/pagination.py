@@ -0,0 +1,40 @@
+"""
+Pagination Utilities
+Opaque keyset cursors for list endpoints
+"""
+import base64
+import json
+from typing import List
+
+
+def encode_cursor(*values) -> str:
+    """
+    Encode the sort key of the last row on a page as an opaque cursor
+    e.g. encode_cursor("2024-05-01T10:00:00+00:00", "clx...") -> "WyIy..."
+    """
+    raw = json.dumps(list(values), separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List:
+    """
+    Decode a cursor made by encode_cursor
+
+    Args:
+        cursor: Cursor string from a previous page
+        size: Number of sort key values expected
+
+    Returns:
+        List of the sort key values
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    return values
@@ -0,0 +1,70 @@
+"""
+Server-Sent Events Utilities
+Byte-level SSE parsing for upstream LLM streams - no str decode,
+no per-token dict round trip
+"""
+import json
+import time
+from typing import List
+
+DONE = b"[DONE]"
+
+
+class SSEByteParser:
+    """
+    Incremental parser for "data:" lines of an SSE byte stream
+
+    Feed it raw network chunks (which may split lines anywhere) and get
+    back the payload bytes of every complete data line. OpenAI-style LLM
+    streams put one JSON chunk per data line, so multi-line data fields
+    are returned line by line.
+    """
+
+    def __init__(self):
+        self._buffer = b""
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        """
+        Add bytes from the network
+
+        Returns:
+            Payloads of the data lines completed by this chunk
+            e.g. b'{"choices": ...}' or b'[DONE]'
+        """
+        if self._buffer:
+            chunk = self._buffer + chunk
+        lines = chunk.split(b"\n")
+        self._buffer = lines.pop()
+
+        payloads = []
+        for line in lines:
+            if line.startswith(b"data:"):
+                data = line[5:]
+                if data[:1] == b" ":
+                    data = data[1:]
+                if data[-1:] == b"\r":
+                    data = data[:-1]
+                payloads.append(data)
+        return payloads
+
+
+def sse_data(payload: bytes) -> bytes:
+    """Frame a payload as one SSE event"""
+    return b"data: " + payload + b"\n\n"
+
+
+def chat_completion_chunk(content: str, model: str, chunk_id: str = "chatcmpl-zeempo") -> bytes:
+    """Build one OpenAI-style chat.completion.chunk payload"""
+    return json.dumps({
+        "id": chunk_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "delta": {"content": content},
+                "finish_reason": None
+            }
+        ]
+    }).encode("utf-8")
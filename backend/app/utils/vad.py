@@ -0,0 +1,85 @@
+"""
+Voice Activity Detection
+Energy-based (frame RMS) splitting of PCM audio at silences, vectorized
+with NumPy, for transcribing long recordings in parallel segments
+"""
+from typing import List, Tuple
+import numpy as np
+
+
+def frame_levels(samples: np.ndarray, frame_size: int) -> np.ndarray:
+    """RMS level of each frame in dBFS (a trailing partial frame is padded)"""
+    n_frames = -(-len(samples) // frame_size)
+    padded = np.zeros(n_frames * frame_size, dtype=np.float32)
+    padded[:len(samples)] = samples
+    frames = padded.reshape(n_frames, frame_size) / 32768.0
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    return 20.0 * np.log10(rms + 1e-10)
+
+
+def split_on_silence(
+    samples: np.ndarray,
+    sample_rate: int,
+    frame_ms: int = 30,
+    silence_db: float = -40.0,
+    min_silence_ms: int = 300,
+    max_segment_seconds: float = 55.0,
+    padding_ms: int = 150
+) -> List[Tuple[int, int]]:
+    """
+    Split mono int16 PCM into speech segments
+
+    Segments are separated by silences (frames below silence_db) of at
+    least min_silence_ms; leading/trailing silence is dropped. Segments
+    longer than max_segment_seconds are cut again at their quietest frame.
+
+    Args:
+        samples: Mono int16 samples
+        sample_rate: Samples per second
+        padding_ms: Silence kept around each segment so words aren't clipped
+
+    Returns:
+        (start_sample, end_sample) pairs in order; empty if all silence
+    """
+    if len(samples) == 0:
+        return []
+    frame_size = max(1, int(sample_rate * frame_ms / 1000))
+    levels = frame_levels(samples, frame_size)
+    voiced = levels > silence_db
+    if not voiced.any():
+        return []
+
+    # Runs of silent frames: +1 where a run starts, -1 just after it ends
+    edges = np.diff(np.concatenate(([0], (~voiced).astype(np.int8), [0])))
+    run_starts = np.flatnonzero(edges == 1)
+    run_ends = np.flatnonzero(edges == -1)
+    min_silence = max(1, int(min_silence_ms / frame_ms))
+    # Silence at either end always splits, however short
+    keep = (
+        (run_ends - run_starts >= min_silence)
+        | (run_starts == 0)
+        | (run_ends == len(levels))
+    )
+    run_starts, run_ends = run_starts[keep], run_ends[keep]
+
+    # Speech = the gaps between the kept silences
+    speech_starts = np.concatenate(([0], run_ends))
+    speech_ends = np.concatenate((run_starts, [len(levels)]))
+    nonempty = speech_ends > speech_starts
+    speech_starts, speech_ends = speech_starts[nonempty], speech_ends[nonempty]
+
+    max_frames = max(2, int(max_segment_seconds * 1000 / frame_ms))
+    pad = int(padding_ms / frame_ms)
+    total = len(samples)
+    segments = []
+    for start, end in zip(speech_starts.tolist(), speech_ends.tolist()):
+        # Pad into the surrounding silence, but never across a forced cut
+        start_sample = max(0, (start - pad) * frame_size)
+        # Too long for one request: cut at the quietest frame in the back half
+        while end - start > max_frames:
+            window = levels[start + max_frames // 2:start + max_frames]
+            cut = start + max_frames // 2 + int(np.argmin(window))
+            segments.append((start_sample, cut * frame_size))
+            start, start_sample = cut, cut * frame_size
+        segments.append((start_sample, min(total, (end + pad) * frame_size)))
+    return segments
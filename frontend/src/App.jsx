@@ -2,13 +2,20 @@
  * Zeempo - Text-to-Pidgin Conversation
  * Type your message and get Pidgin English responses
  */
-import React, { useState, useRef, useEffect } from 'react';
+import React, { useState, useRef, useEffect, useLayoutEffect } from 'react';
 import ApiService from './services/api';
 // eslint-disable-next-line no-unused-vars
 import { motion, AnimatePresence } from 'framer-motion';
 import { HiPlus, HiChatBubbleLeftRight, HiTrash, HiXMark, HiBars3, HiMicrophone, HiPaperAirplane, HiCog6Tooth, HiArrowLeftOnRectangle, HiUserCircle, HiSun, HiMoon } from 'react-icons/hi2';
 import { VoiceAgent } from './components/VoiceAgent';
 
+// Server message -> chat bubble
+const toUiMessage = (m) => ({
+  text: m.content,
+  type: m.role === 'assistant' ? 'ai' : 'user',
+  timestamp: m.timestamp
+});
+
 function App() {
   const [isProcessing, setIsProcessing] = useState(false);
   const [error, setError] = useState('');
@@ -24,8 +31,18 @@ function App() {
   const [isListening, setIsListening] = useState(false);
   const [user, setUser] = useState(null);
   const [isDarkMode, setIsDarkMode] = useState(false);
+  const [sessionsCursor, setSessionsCursor] = useState(null);
+  const [loadingSessions, setLoadingSessions] = useState(false);
+  const [olderCursor, setOlderCursor] = useState(null);
+  const [loadingOlder, setLoadingOlder] = useState(false);
   
   const messagesEndRef = useRef(null);
+  const messagesContainerRef = useRef(null);
+  const scrollAnchorRef = useRef(null); // scrollHeight before older messages were prepended
+  const lastScrollTopRef = useRef(0);
+  const activeChatRef = useRef(null);
+  const loadingOlderRef = useRef(false); // scroll events can fire before state updates
+  const loadingSessionsRef = useRef(false);
 
   // Load saved data on mount
   useEffect(() => {
@@ -55,25 +72,55 @@ function App() {
     initApp();
   }, []);
 
+  // First page of the sidebar (also used to refresh it)
   const fetchSessions = async () => {
     try {
-      const sessions = await ApiService.getChatSessions();
+      const { sessions, nextCursor } = await ApiService.getChatSessions();
       setChatHistory(sessions);
+      setSessionsCursor(nextCursor);
     } catch (err) {
       console.error("Failed to fetch sessions:", err);
     }
   };
 
+  // Older sessions load a page at a time as the sidebar is scrolled down
+  const loadMoreSessions = async () => {
+    if (!sessionsCursor || loadingSessionsRef.current) return;
+    loadingSessionsRef.current = true;
+    setLoadingSessions(true);
+    try {
+      const { sessions, nextCursor } = await ApiService.getChatSessions(sessionsCursor);
+      setChatHistory(prev => {
+        // A yarn updated since page one moves to the top - don't list it twice
+        const seen = new Set(prev.map(chat => chat.id));
+        return [...prev, ...sessions.filter(chat => !seen.has(chat.id))];
+      });
+      setSessionsCursor(nextCursor);
+    } catch (err) {
+      console.error("Failed to fetch more sessions:", err);
+    } finally {
+      loadingSessionsRef.current = false;
+      setLoadingSessions(false);
+    }
+  };
+
+  const handleSessionsScroll = (e) => {
+    const { scrollTop, scrollHeight, clientHeight } = e.currentTarget;
+    if (scrollHeight - scrollTop - clientHeight < 120) {
+      loadMoreSessions();
+    }
+  };
+
   const loadChat = async (sessionId) => {
     setIsProcessing(true);
     setCurrentChatId(sessionId);
+    activeChatRef.current = sessionId;
+    setOlderCursor(null);
     try {
+      // Newest page only - older pages load as the user scrolls up
       const history = await ApiService.getChatHistory(sessionId);
-      setMessages(history.messages.map(m => ({
-        text: m.content,
-        type: m.role === 'assistant' ? 'ai' : 'user',
-        timestamp: m.timestamp
-      })));
+      setMessages(history.messages.map(toUiMessage));
+      setOlderCursor(history.nextCursor);
     } catch (err) {
       console.error("Load yarn error:", err);
       setError("I no fit load dis yarn.");
@@ -82,6 +129,35 @@ function App() {
     }
   };
 
+  const loadOlderMessages = async () => {
+    if (!olderCursor || loadingOlderRef.current || !currentChatId) return;
+    const sessionId = currentChatId;
+    loadingOlderRef.current = true;
+    setLoadingOlder(true);
+    try {
+      const page = await ApiService.getChatHistory(sessionId, olderCursor);
+      if (activeChatRef.current !== sessionId) return; // switched yarns meanwhile
+      scrollAnchorRef.current = messagesContainerRef.current?.scrollHeight ?? null;
+      setMessages(prev => [...page.messages.map(toUiMessage), ...prev]);
+      setOlderCursor(page.nextCursor);
+    } catch (err) {
+      console.error("Load older messages error:", err);
+      setError("I no fit load di older messages.");
+    } finally {
+      loadingOlderRef.current = false;
+      setLoadingOlder(false);
+    }
+  };
+
+  const handleMessagesScroll = (e) => {
+    const { scrollTop } = e.currentTarget;
+    // Only when the user scrolls up near the top, not during auto-scroll down
+    if (scrollTop < 80 && scrollTop < lastScrollTopRef.current) {
+      loadOlderMessages();
+    }
+    lastScrollTopRef.current = scrollTop;
+  };
+
   // Apply dark mode class to html element
   useEffect(() => {
     if (isDarkMode) {
@@ -93,8 +169,15 @@ function App() {
     }
   }, [isDarkMode]);
 
-  // Auto-scroll to bottom
-  useEffect(() => {
+  // Auto-scroll to bottom, except when older messages were prepended:
+  // then keep the view where it was
+  useLayoutEffect(() => {
+    const container = messagesContainerRef.current;
+    if (scrollAnchorRef.current !== null && container) {
+      container.scrollTop += container.scrollHeight - scrollAnchorRef.current;
+      scrollAnchorRef.current = null;
+      return;
+    }
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
   }, [messages]);
 
@@ -115,6 +198,8 @@ function App() {
   // Start new chat
   const startNewChat = () => {
     setCurrentChatId(null);
+    activeChatRef.current = null;
+    setOlderCursor(null);
     setMessages([]);
     setError('');
   };
@@ -125,8 +210,11 @@ function App() {
     setUser(null);
     setIsLoggedIn(false);
     setChatHistory([]);
+    setSessionsCursor(null);
     setMessages([]);
     setCurrentChatId(null);
+    activeChatRef.current = null;
+    setOlderCursor(null);
   };
 
   // Voice Speaking Functionality (TTS)
@@ -233,6 +321,7 @@ function App() {
       // Always fetch sessions to update sidebar (order, title, etc)
       if (!currentChatId && data.session_id) {
         setCurrentChatId(data.session_id);
+        activeChatRef.current = data.session_id;
       }
       fetchSessions();
 
@@ -376,7 +465,7 @@ function App() {
             </div>
 
             {/* Chat History */}
-            <div className="flex-1 overflow-y-auto p-4 space-y-2">
+            <div className="flex-1 overflow-y-auto p-4 space-y-2" onScroll={handleSessionsScroll}>
               <h3 className="text-[11px] font-bold text-slate-500 dark:text-slate-400 uppercase tracking-[0.1em] mb-4 px-2">
                 {targetLanguage === 'pidgin' ? 'History' : 'Historia'}
               </h3>
@@ -418,6 +507,15 @@ function App() {
                       </div>
                     </motion.div>
                   ))}
+                  {sessionsCursor && (
+                    <button
+                      onClick={loadMoreSessions}
+                      disabled={loadingSessions}
+                      className="w-full py-2 text-[11px] font-bold text-slate-500 dark:text-slate-400 uppercase tracking-[0.1em] hover:text-emerald-600 dark:hover:text-emerald-400 disabled:opacity-50"
+                    >
+                      {loadingSessions ? 'Loading...' : 'Load older yarns'}
+                    </button>
+                  )}
                 </div>
               )}
             </div>
@@ -528,7 +626,11 @@ function App() {
         </header>
 
         {/* Messages */}
-        <div className="flex-1 overflow-y-auto p-8 bg-[#f8fafc]/50 dark:bg-slate-950/50">
+        <div
+          ref={messagesContainerRef}
+          onScroll={handleMessagesScroll}
+          className="flex-1 overflow-y-auto p-8 bg-[#f8fafc]/50 dark:bg-slate-950/50"
+        >
           {messages.length === 0 ? (
             <div className="h-full flex flex-col items-center justify-center max-w-2xl mx-auto text-center">
               <motion.div 
@@ -580,6 +682,17 @@ function App() {
             </div>
           ) : (
             <div className="max-w-4xl mx-auto space-y-8">
+              {olderCursor && (
+                <div className="flex justify-center">
+                  <button
+                    onClick={loadOlderMessages}
+                    disabled={loadingOlder}
+                    className="text-[11px] font-bold text-emerald-600 dark:text-emerald-400 uppercase tracking-widest hover:underline disabled:opacity-50"
+                  >
+                    {loadingOlder ? 'Loading...' : 'Load earlier messages'}
+                  </button>
+                </div>
+              )}
               {messages.map((msg, idx) => (
                 <motion.div
                   initial={{ opacity: 0, y: 10 }}
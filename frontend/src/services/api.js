@@ -101,30 +101,45 @@ class ApiService {
   }
 
   /**
-   * Chat: Get all sessions
+   * Chat: Get sessions, most recently updated first
+   * Returns { sessions, nextCursor }; pass nextCursor back for the next
+   * page (null on the last page)
    */
-  async getChatSessions() {
-    const response = await fetch(`${API_BASE_URL}/api/chats`, {
+  async getChatSessions(cursor = null) {
+    const url = cursor
+      ? `${API_BASE_URL}/api/chats?cursor=${encodeURIComponent(cursor)}`
+      : `${API_BASE_URL}/api/chats`;
+
+    const response = await fetch(url, {
       headers: this.getHeaders(),
     });
 
     if (!response.ok) {
       console.error('Failed to fetch yarns', response.status);
-      return []; // Return empty array instead of throwing
+      return { sessions: [], nextCursor: null }; // Empty page instead of throwing
     }
 
     try {
-      return await response.json();
+      return {
+        sessions: await response.json(),
+        nextCursor: response.headers.get('X-Next-Cursor'),
+      };
     } catch {
-      return [];
+      return { sessions: [], nextCursor: null };
     }
   }
 
   /**
    * Chat: Get session history
+   * Returns the newest page of messages; pass nextCursor back to get the
+   * page of older messages before it (null when there are none)
    */
-  async getChatHistory(sessionId) {
-    const response = await fetch(`${API_BASE_URL}/api/chats/${sessionId}`, {
+  async getChatHistory(sessionId, cursor = null) {
+    const url = cursor
+      ? `${API_BASE_URL}/api/chats/${sessionId}?cursor=${encodeURIComponent(cursor)}`
+      : `${API_BASE_URL}/api/chats/${sessionId}`;
+
+    const response = await fetch(url, {
       headers: this.getHeaders(),
     });
 
@@ -132,7 +147,8 @@ class ApiService {
       throw new Error('Failed to fetch yarn history');
     }
 
-    return await response.json();
+    const data = await response.json();
+    return { ...data, nextCursor: response.headers.get('X-Next-Cursor') };
   }
 
   /**
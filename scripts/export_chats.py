@@ -0,0 +1,133 @@
+"""
+Export chat history as NDJSON (optionally gzip-compressed)
+
+Streams every ChatSession followed by its ChatMessages in fixed memory.
+Progress is checkpointed next to the output file; re-running the same
+command resumes from the last checkpoint instead of starting over.
+
+Usage:
+    python scripts/export_chats.py --user-id <id> -o user.ndjson
+    python scripts/export_chats.py --all -o all-chats.ndjson.gz
+    python scripts/export_chats.py --all -o all-chats.ndjson.gz --restart
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import sys
+from pathlib import Path
+from dotenv import load_dotenv
+
+# Load environment variables from the backend .env file
+backend_dir = Path(__file__).parent.parent / 'backend'
+load_dotenv(backend_dir / '.env')
+
+# Add the backend directory to the Python path
+sys.path.append(str(backend_dir))
+
+from app.config import get_settings
+from app.database import get_db
+from app.services.export_service import ChatExporter, ExportCheckpoint, ndjson_line
+
+settings = get_settings()
+
+
+class ExportWriter:
+    """
+    Output file that can be cut back to the last checkpoint
+
+    Gzip output is written as one gzip member per checkpoint, so the file
+    is always valid up to the recorded offset and resuming just truncates
+    to it and appends a new member (multi-member gzip is standard).
+    """
+
+    def __init__(self, path: Path, compress: bool, offset: int):
+        self.path = path
+        self.compress = compress
+        self.raw = open(path, "ab")
+        self.raw.truncate(offset)
+        self.raw.seek(offset)
+        self.out = self._open_member()
+
+    def _open_member(self):
+        return gzip.GzipFile(fileobj=self.raw, mode="wb") if self.compress else self.raw
+
+    def write(self, data: bytes):
+        self.out.write(data)
+
+    def commit(self) -> int:
+        """Make everything written so far durable; returns the file offset"""
+        if self.compress:
+            self.out.close()  # ends the member, leaves self.raw open
+        self.raw.flush()
+        os.fsync(self.raw.fileno())
+        offset = self.raw.tell()
+        if self.compress:
+            self.out = self._open_member()
+        return offset
+
+    def close(self):
+        if self.compress:
+            self.out.close()
+        self.raw.close()
+
+
+def save_checkpoint(path: Path, checkpoint: ExportCheckpoint, offset: int, records: int, done: bool = False):
+    """Write the checkpoint file atomically"""
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps({
+        "checkpoint": checkpoint.to_dict(),
+        "offset": offset,
+        "records": records,
+        "done": done
+    }))
+    os.replace(tmp, path)
+
+
+async def export_chats(args):
+    output = Path(args.output)
+    checkpoint_path = Path(args.checkpoint or str(output) + ".checkpoint.json")
+    compress = args.gzip or output.suffix == ".gz"
+
+    checkpoint, offset, records = None, 0, 0
+    if checkpoint_path.exists() and not args.restart:
+        state = json.loads(checkpoint_path.read_text())
+        if state.get("done"):
+            print(f"✅ Export already complete ({state['records']} records). Use --restart to redo it.")
+            return
+        checkpoint = ExportCheckpoint.from_dict(state["checkpoint"])
+        offset, records = state["offset"], state["records"]
+        print(f"↩️  Resuming after {records} records (offset {offset})")
+
+    db = get_db()
+    await db.connect()
+    writer = ExportWriter(output, compress, offset)
+    exporter = ChatExporter(db.client, batch_size=args.batch_size)
+
+    try:
+        async for record in exporter.records(args.user_id, checkpoint):
+            writer.write(ndjson_line(record))
+            records += 1
+            if records % args.checkpoint_every == 0:
+                save_checkpoint(checkpoint_path, exporter.checkpoint, writer.commit(), records)
+                print(f"   {records} records...")
+        save_checkpoint(checkpoint_path, exporter.checkpoint, writer.commit(), records, done=True)
+        print(f"✅ Exported {records} records to {output}")
+    finally:
+        writer.close()
+        await db.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export chat history as NDJSON")
+    scope = parser.add_mutually_exclusive_group(required=True)
+    scope.add_argument("--user-id", help="Export one user's sessions")
+    scope.add_argument("--all", action="store_true", help="Export every user's sessions")
+    parser.add_argument("-o", "--output", required=True, help="Output file (.gz = gzip)")
+    parser.add_argument("--gzip", action="store_true", help="Gzip output even without .gz suffix")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <output>.checkpoint.json)")
+    parser.add_argument("--restart", action="store_true", help="Ignore any checkpoint and start over")
+    parser.add_argument("--batch-size", type=int, default=settings.chat_export_batch_size)
+    parser.add_argument("--checkpoint-every", type=int, default=settings.chat_export_checkpoint_every)
+    asyncio.run(export_chats(parser.parse_args()))
@@ -0,0 +1,61 @@
+"""
+Set up full-text search for chat history
+
+Installs the trigger that fills ChatMessage."searchVector" using the
+dictionaries in CHAT_SEARCH_DICTIONARIES, then backfills existing rows in
+batches. Safe to re-run (e.g. after changing the dictionaries, pass
+--rebuild to recompute every row).
+
+Run after `prisma db push` (which creates the column and GIN index):
+    python scripts/setup_chat_search.py [--rebuild] [--batch-size 5000]
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+from dotenv import load_dotenv
+
+# Load environment variables from the backend .env file
+backend_dir = Path(__file__).parent.parent / 'backend'
+load_dotenv(backend_dir / '.env')
+
+# Add the backend directory to the Python path
+sys.path.append(str(backend_dir))
+
+from app.database import get_db
+from app.services.search_service import get_chat_search_service
+
+
+async def setup_chat_search(rebuild: bool, batch_size: int):
+    db = get_db()
+    await db.connect()
+    client = db.client
+    search = get_chat_search_service()
+
+    try:
+        print(f"🔎 Dictionaries: {search.dictionaries} (default: {search.default_dictionary})")
+        for statement in search.setup_statements():
+            await client.execute_raw(statement)
+        print("✅ Search trigger installed")
+
+        if rebuild:
+            await client.execute_raw('UPDATE "ChatMessage" SET "searchVector" = NULL')
+
+        total = 0
+        while True:
+            updated = await client.execute_raw(search.backfill_statement(), batch_size)
+            if not updated:
+                break
+            total += updated
+            print(f"   indexed {total} messages...")
+        print(f"✅ Backfill done ({total} messages)")
+    finally:
+        await db.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Set up chat full-text search")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute every message's search vector")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows per backfill batch")
+    args = parser.parse_args()
+    asyncio.run(setup_chat_search(args.rebuild, args.batch_size))
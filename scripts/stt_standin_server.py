@@ -0,0 +1,65 @@
+"""
+Local stand-in for Google's speech:recognize endpoint
+
+Accepts the same request body as STTService sends and answers with a fake
+transcript after a delay proportional to the audio length, so long-audio
+mode (segmenting + concurrent transcription) can be exercised offline.
+
+Usage:
+    python scripts/stt_standin_server.py [port] [seconds_per_audio_second]
+
+Then point the backend at it:
+    GOOGLE_STT_URL=http://127.0.0.1:8090/v1/speech:recognize GOOGLE_CLOUD_API_KEY=standin
+"""
+import asyncio
+import base64
+import sys
+import time
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+PORT = int(sys.argv[1]) if len(sys.argv) > 1 else 8090
+SECONDS_PER_AUDIO_SECOND = float(sys.argv[2]) if len(sys.argv) > 2 else 0.1
+
+app = FastAPI(title="STT stand-in")
+in_flight = 0
+max_in_flight = 0
+
+
+@app.post("/v1/speech:recognize")
+async def recognize(request: Request):
+    global in_flight, max_in_flight
+    body = await request.json()
+    config = body.get("config", {})
+    try:
+        audio = base64.b64decode(body["audio"]["content"], validate=True)
+    except Exception as e:
+        return JSONResponse(
+            status_code=400,
+            content={"error": {"code": 400, "status": "INVALID_ARGUMENT", "message": f"Invalid audio content: {e}"}}
+        )
+
+    if config.get("encoding") == "LINEAR16":
+        seconds = len(audio) / 2 / config.get("sampleRateHertz", 16000)
+    else:
+        seconds = len(audio) / 4000  # ~32 kbps Opus
+
+    in_flight += 1
+    max_in_flight = max(max_in_flight, in_flight)
+    started = time.time()
+    try:
+        await asyncio.sleep(seconds * SECONDS_PER_AUDIO_SECOND)
+    finally:
+        in_flight -= 1
+    print(f"{seconds:6.2f}s of audio, answered in {time.time() - started:.2f}s (max in flight: {max_in_flight})")
+
+    return {
+        "results": [{
+            "alternatives": [{"transcript": f"[{seconds:.2f}s of speech]", "confidence": 0.9}]
+        }]
+    }
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="127.0.0.1", port=PORT, log_level="warning")
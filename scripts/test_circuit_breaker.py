@@ -0,0 +1,112 @@
+"""
+Test script for circuit breaker probe handling
+
+A half-open probe that ends in anything other than an UpstreamError
+(cancellation, throttle rejection, malformed response) must not leave the
+breaker stuck half-open: the next call after the reset timeout probes again.
+The same outcomes on a closed breaker (client disconnects, local throttling)
+must not count as upstream failures.
+
+Usage:
+    python scripts/test_circuit_breaker.py
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# Add the backend directory to the Python path
+backend_dir = Path(__file__).parent.parent / 'backend'
+sys.path.append(str(backend_dir))
+
+from app.services.resilience import ResilientCaller, UpstreamError, CircuitOpenError
+from app.services.admission import AdmissionRejected
+
+
+def open_breaker(caller: ResilientCaller):
+    """Force the breaker open with an already elapsed reset timeout"""
+    breaker = caller.breaker
+    breaker.reset_timeout = 0.0
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    assert breaker.state == breaker.OPEN
+
+
+async def probe_then_recover(name: str, failing_probe) -> bool:
+    caller = ResilientCaller(name)
+    caller.max_retries = 0
+    open_breaker(caller)
+
+    # Goes through as the half-open probe, then fails without an UpstreamError
+    await failing_probe(caller)
+    breaker = caller.breaker
+    if breaker.state == breaker.HALF_OPEN and breaker._probe_in_flight:
+        print(f"❌ {name}: breaker stuck half-open with a probe in flight")
+        return False
+
+    async def ok():
+        return "ok"
+
+    try:
+        result = await caller.call(ok)
+    except CircuitOpenError as e:
+        print(f"❌ {name}: next call rejected: {e}")
+        return False
+    print(f"✅ {name}: next call probed again -> {result}, state {breaker.state}")
+    return breaker.state == breaker.CLOSED
+
+
+def raising(error):
+    async def probe(caller: ResilientCaller):
+        async def fn():
+            raise error
+        try:
+            await caller.call(fn)
+        except type(error):
+            pass
+    return probe
+
+
+async def cancelled(caller: ResilientCaller):
+    async def fn():
+        await asyncio.sleep(10)
+    task = asyncio.ensure_future(caller.call(fn))
+    await asyncio.sleep(0.01)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+async def closed_stays_closed(name: str, failing_call) -> bool:
+    caller = ResilientCaller(name)
+    caller.max_retries = 0
+    breaker = caller.breaker
+    # More than enough to trip the breaker if they were counted
+    for _ in range(breaker.failure_threshold * 2):
+        try:
+            await failing_call(caller)
+        except CircuitOpenError:
+            break
+    if breaker.state != breaker.CLOSED or breaker.failures:
+        print(f"❌ {name}: breaker {breaker.state} with {breaker.failures} failures")
+        return False
+    print(f"✅ {name}: breaker still closed, no failures counted")
+    return True
+
+
+async def test_circuit_breaker():
+    cases = {
+        "probe_cancelled": cancelled,
+        "probe_throttled": raising(AdmissionRejected("busy", status_code=429)),
+        "probe_bad_response": raising(KeyError("choices")),
+        "probe_upstream_error": raising(UpstreamError("boom", retryable=True))
+    }
+    results = [await probe_then_recover(name, probe) for name, probe in cases.items()]
+    results.append(await closed_stays_closed("closed_cancelled", cancelled))
+    results.append(await closed_stays_closed(
+        "closed_throttled", raising(AdmissionRejected("busy", status_code=503))
+    ))
+    print("\n✅ All probes recovered" if all(results) else "\n❌ Some probes got stuck")
+    return all(results)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if asyncio.run(test_circuit_breaker()) else 1)
@@ -0,0 +1,78 @@
+"""
+Test script for long-audio transcription
+
+Builds a synthetic recording (tone bursts separated by pauses), then runs
+STTService.transcribe_long against the STT stand-in server.
+
+Usage:
+    python scripts/stt_standin_server.py &
+    python scripts/test_long_audio.py [minutes] [wav_file]
+"""
+import asyncio
+import io
+import os
+import sys
+import time
+import wave
+from pathlib import Path
+import numpy as np
+
+# Talk to the local stand-in unless told otherwise
+os.environ.setdefault("GOOGLE_STT_URL", "http://127.0.0.1:8090/v1/speech:recognize")
+os.environ.setdefault("GOOGLE_CLOUD_API_KEY", "standin")
+
+# Add the backend directory to the Python path
+backend_dir = Path(__file__).parent.parent / 'backend'
+sys.path.append(str(backend_dir))
+
+from app.services.stt_service import STTService
+from app.config import get_settings
+
+
+def synthetic_recording(minutes: float, sample_rate: int = 16000) -> bytes:
+    """WAV with 2-12s 'utterances' separated by 0.4-1.5s pauses"""
+    rng = np.random.default_rng(7)
+    total = int(minutes * 60 * sample_rate)
+    parts = []
+    length = 0
+    while length < total:
+        speech = int(rng.uniform(2, 12) * sample_rate)
+        t = np.arange(speech) / sample_rate
+        tone = 0.3 * np.sin(2 * np.pi * rng.uniform(150, 300) * t) * (1 + 0.5 * np.sin(2 * np.pi * 3 * t))
+        pause = int(rng.uniform(0.4, 1.5) * sample_rate)
+        noise = rng.normal(0, 0.001, pause)
+        parts += [tone, noise]
+        length += speech + pause
+    samples = (np.concatenate(parts)[:total] * 32767).astype(np.int16)
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+
+async def test_long_audio():
+    minutes = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    if len(sys.argv) > 2:
+        audio = Path(sys.argv[2]).read_bytes()
+    else:
+        audio = synthetic_recording(minutes)
+
+    settings = get_settings()
+    print(f"🎙️  {len(audio) / 1_000_000:.1f}MB of audio -> {settings.google_stt_url}")
+    print(f"   concurrency: {settings.stt_segment_concurrency}, max segment: {settings.stt_max_segment_seconds}s")
+
+    started = time.time()
+    result = await STTService().transcribe_long(audio, "wav")
+    elapsed = time.time() - started
+
+    for segment in result["segments"]:
+        print(f"   {segment['start']:8.2f}s - {segment['end']:8.2f}s  {segment['transcript']}")
+    print(f"\n✅ {len(result['segments'])} segments, {result['duration']:.0f}s of audio in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(test_long_audio())